@@ -0,0 +1,140 @@
+# C:\wai-ui\backend\asset_store.py
+# 콘텐츠 주소 기반(content-addressed) 자산 저장소
+# - 업로드 중에 SHA-256 을 같이 계산 → objects/ab/cd/<sha256> 에 한 번만 저장
+# - 파일명 → 해시 매핑은 자산 카탈로그(catalog.py)에 기록 (같은 내용을 다른 이름으로 올려도 사본 없음)
+# - 같은 이름에 다른 내용이 올라오면 덮어쓰지 않고 "이름 (1).mp4" 처럼 새 이름을 부여
+# - 업로드 전 사전 확인: 전체 해시로 이미 있는 내용인지 판별
+#   (앞/뒤 N MB 해시 + 크기는 후보 찾기만, 연결은 전체 해시가 같을 때만)
+
+import hashlib
+import os
+import tempfile
+
+OBJECTS_DIR_NAME = "objects"
+TMP_DIR_NAME = ".tmp"
+HASH_READ_SIZE = 1024 * 1024
+DEFAULT_SAMPLE_SIZE = 4 * 1024 * 1024     # 빠른 지문(head/tail) 기본 샘플 크기
+
+
+class IngestWriter:
+    # 임시 파일에 기록하면서 해시/크기를 함께 계산
+    def __init__(self, tmp_dir):
+        fd, self.tmp_path = tempfile.mkstemp(dir=tmp_dir, suffix=".part")
+        self._file = os.fdopen(fd, "wb")
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, data):
+        self._hash.update(data)
+        self._file.write(data)
+        self.size += len(data)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def abort(self):
+        self.close()
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+    @property
+    def sha256(self):
+        return self._hash.hexdigest()
+
+
+def hash_file(path):
+    h = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_READ_SIZE):
+            h.update(chunk)
+            size += len(chunk)
+    return h.hexdigest(), size
+
+
+def head_tail_fingerprint(path, size, sample_size=DEFAULT_SAMPLE_SIZE):
+    # sha256(앞 N 바이트 + 뒤 N 바이트), 두 구간은 겹치지 않음 (작은 파일은 전체)
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        h.update(f.read(min(sample_size, size)))
+        tail_start = max(sample_size, size - sample_size)
+        if tail_start < size:
+            f.seek(tail_start)
+            h.update(f.read(size - tail_start))
+    return h.hexdigest()
+
+
+class AssetStore:
+    def __init__(self, upload_dir, catalog):
+        self.upload_dir = upload_dir
+        self.catalog = catalog
+        self.objects_dir = os.path.join(upload_dir, OBJECTS_DIR_NAME)
+        self.tmp_dir = os.path.join(upload_dir, TMP_DIR_NAME)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        self._fingerprints = {}
+
+    def object_path(self, sha256):
+        # 해시 앞 2+2 글자로 폴더 분산 (한 폴더에 파일이 수만 개 쌓이지 않도록)
+        return os.path.join(self.objects_dir, sha256[:2], sha256[2:4], sha256)
+
+    def has_object(self, sha256):
+        return os.path.exists(self.object_path(sha256))
+
+    def open_writer(self):
+        return IngestWriter(self.tmp_dir)
+
+    def commit(self, writer, name, description=None, folder_id="all"):
+        writer.close()
+        return self._store(writer.tmp_path, writer.sha256, writer.size, name, description, folder_id)
+
+    def ingest_file(self, path, name, description=None, folder_id="all"):
+        # 이미 디스크에 있는 파일(이어받기 세션 결과 등)을 해시 후 저장소로 이동
+        sha256, size = hash_file(path)
+        return self._store(path, sha256, size, name, description, folder_id)
+
+    def _store(self, src_path, sha256, size, name, description, folder_id):
+        dest_path = self.object_path(sha256)
+        deduplicated = os.path.exists(dest_path)
+        if deduplicated:
+            # 이미 있는 내용 → 새 사본을 만들지 않고 버림
+            os.remove(src_path)
+        else:
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            os.replace(src_path, dest_path)
+
+        asset = self.catalog.add_asset(name, sha256, size, description, folder_id)
+        return dict(asset, deduplicated=deduplicated)
+
+    def link(self, name, sha256, description=None, size=None, folder_id="all"):
+        # 본문 전송 없이 이미 저장된 내용에 이름만 연결 (사전 확인 성공 시)
+        path = self.object_path(sha256)
+        if not os.path.exists(path):
+            return None
+        actual_size = os.path.getsize(path)
+        if size is not None and size != actual_size:
+            return None
+        asset = self.catalog.add_asset(name, sha256, actual_size, description, folder_id)
+        return dict(asset, deduplicated=True)
+
+    def find_by_fingerprint(self, size, fingerprint, sample_size=DEFAULT_SAMPLE_SIZE):
+        # 크기가 같은 객체만 후보 → 후보별 지문은 한 번 계산 후 메모리 캐시
+        # 지문이 같아도 가운데 내용은 다를 수 있으므로 돌려주는 해시는 후보 (전체 sha256 확인 전에는 link 하지 않음)
+        for sha256 in self.catalog.hashes_with_size(size):
+            key = (sha256, sample_size)
+            if key not in self._fingerprints:
+                path = self.object_path(sha256)
+                if not os.path.exists(path):
+                    continue
+                self._fingerprints[key] = head_tail_fingerprint(path, size, sample_size)
+            if self._fingerprints[key] == fingerprint:
+                return sha256
+        return None
+
+    def lookup(self, name):
+        return self.catalog.get_by_name(name)
+
+    def resolve_path(self, name):
+        entry = self.lookup(name)
+        return self.object_path(entry["hash"]) if entry else None
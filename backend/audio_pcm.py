@@ -0,0 +1,52 @@
+# C:\wai-ui\backend\audio_pcm.py
+# ffmpeg 으로 오디오를 모노 16bit PCM 으로 디코드해서 고정 크기 블록 단위로 흘려보냄
+# - 파일 전체를 메모리에 올리지 않음 (한 시간짜리 녹음도 메모리 사용량 일정)
+# - 파형 피크(peaks.py) / 무음 감지 등 오디오 분석 작업이 공통으로 사용
+
+import sys
+from array import array
+
+import ffmpeg
+
+READ_BATCH_BLOCKS = 256            # 파이프에서 한 번에 읽는 블록 수
+
+
+def iter_pcm_blocks(src_path, sample_rate, block_size):
+    # 길이가 block_size 인 array('h') 를 순서대로 반환 (마지막 블록만 짧을 수 있음)
+    process = (
+        ffmpeg
+        .input(src_path)
+        .output("pipe:", format="s16le", acodec="pcm_s16le", ac=1, ar=sample_rate, vn=None)
+        .global_args("-nostdin", "-loglevel", "error")
+        .run_async(pipe_stdout=True, pipe_stderr=True)
+    )
+    block_bytes = block_size * 2
+    pending = b""
+    try:
+        while True:
+            chunk = process.stdout.read(block_bytes * READ_BATCH_BLOCKS)
+            if not chunk:
+                break
+            data = pending + chunk
+            usable = len(data) - len(data) % block_bytes
+            pending = data[usable:]
+            for offset in range(0, usable, block_bytes):
+                yield to_samples(data[offset:offset + block_bytes])
+        if len(pending) >= 2:
+            yield to_samples(pending[:len(pending) - len(pending) % 2])
+
+        stderr = process.stderr.read()
+        if process.wait() != 0:
+            raise ffmpeg.Error("ffmpeg", b"", stderr)
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+
+
+def to_samples(data):
+    samples = array("h")
+    samples.frombytes(data)
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples
@@ -0,0 +1,161 @@
+# C:\wai-ui\backend\bench_upload.py
+# 업로드 동시성 벤치마크
+# - 여러 개의 /api/upload 요청을 동시에 보내면서 총 처리량(MB/s)을 측정하고,
+# - 그동안 '/' 헬스체크 응답 지연(ms)을 계속 재서 이벤트 루프가 막히는지 확인한다.
+#
+# 사용법 (backend 폴더에서):
+#   python bench_upload.py                       # 임시 폴더에 uvicorn 을 띄워서 측정
+#   python bench_upload.py --url http://127.0.0.1:8001 --uploads 8 --size-mb 64
+
+import argparse
+import http.client
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+BOUNDARY = "----wai-bench-boundary"
+
+
+def upload_once(url, filename, payload, description="bench"):
+    # 멀티파트 본문을 조각으로 나눠 전송 (payload 는 모든 업로드가 공유 → 메모리 복제 없음)
+    parsed = urllib.parse.urlparse(url)
+    head = (
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="description"\r\n\r\n{description}\r\n'
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: application/octet-stream\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{BOUNDARY}--\r\n".encode()
+
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=600)
+    conn.putrequest("POST", "/api/upload")
+    conn.putheader("Content-Type", f"multipart/form-data; boundary={BOUNDARY}")
+    conn.putheader("Content-Length", str(len(head) + len(payload) + len(tail)))
+    conn.endheaders()
+    conn.send(head)
+    view = memoryview(payload)
+    for i in range(0, len(payload), 1024 * 1024):
+        conn.send(view[i:i + 1024 * 1024])
+    conn.send(tail)
+    resp = conn.getresponse()
+    resp.read()
+    conn.close()
+    return resp.status
+
+
+def probe_health(url, stop_event, latencies, interval):
+    parsed = urllib.parse.urlparse(url)
+    while not stop_event.is_set():
+        conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+        started = time.perf_counter()
+        conn.request("GET", "/")
+        conn.getresponse().read()
+        latencies.append((time.perf_counter() - started) * 1000)
+        conn.close()
+        stop_event.wait(interval)
+
+
+def summarize(label, latencies):
+    if not latencies:
+        print(f"  {label}: (측정값 없음)")
+        return
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"  {label}: n={len(ordered)}  p50={statistics.median(ordered):.1f}ms"
+        f"  p95={p95:.1f}ms  max={ordered[-1]:.1f}ms"
+    )
+
+
+def wait_until_up(url, timeout=20):
+    parsed = urllib.parse.urlparse(url)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=2)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server did not start: {url}")
+
+
+def run(url, uploads, size_mb, interval):
+    payload = os.urandom(size_mb * 1024 * 1024)
+
+    # 1) 부하 없는 상태의 헬스체크 지연
+    idle = []
+    stop = threading.Event()
+    prober = threading.Thread(target=probe_health, args=(url, stop, idle, interval))
+    prober.start()
+    time.sleep(1.0)
+    stop.set()
+    prober.join()
+
+    # 2) 동시 업로드 중 헬스체크 지연 + 업로드 처리량
+    loaded = []
+    stop = threading.Event()
+    prober = threading.Thread(target=probe_health, args=(url, stop, loaded, interval))
+    statuses = []
+    workers = [
+        threading.Thread(target=lambda i=i: statuses.append(upload_once(url, f"bench_{i}.bin", payload)))
+        for i in range(uploads)
+    ]
+    prober.start()
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+    stop.set()
+    prober.join()
+
+    total_mb = uploads * size_mb
+    print(f"📊 동시 업로드 {uploads}개 x {size_mb}MB → {total_mb}MB / {elapsed:.2f}s = {total_mb / elapsed:.1f} MB/s")
+    print(f"   응답 코드: {sorted(set(statuses))}")
+    print("🩺 '/' 헬스체크 지연")
+    summarize("idle  ", idle)
+    summarize("upload", loaded)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WAI backend upload benchmark")
+    parser.add_argument("--url", help="이미 실행 중인 서버 주소 (생략 시 임시 uvicorn 실행)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--uploads", type=int, default=8)
+    parser.add_argument("--size-mb", type=int, default=32)
+    parser.add_argument("--interval", type=float, default=0.02, help="헬스체크 간격(초)")
+    args = parser.parse_args()
+
+    if args.url:
+        run(args.url, args.uploads, args.size_mb, args.interval)
+        return
+
+    # uploaded_files/ 가 실제 작업 폴더를 더럽히지 않도록 임시 폴더에서 서버 실행
+    url = f"http://127.0.0.1:{args.port}"
+    with tempfile.TemporaryDirectory(prefix="wai-bench-") as workdir:
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "--app-dir", BACKEND_DIR, "server:app",
+             "--port", str(args.port), "--log-level", "warning"],
+            cwd=workdir,
+        )
+        try:
+            wait_until_up(url)
+            run(url, args.uploads, args.size_mb, args.interval)
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
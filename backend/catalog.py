@@ -0,0 +1,361 @@
+# C:\wai-ui\backend\catalog.py
+# 자산 카탈로그 (SQLite, WAL 모드)
+# - 파일명/해시/종류/크기/길이/해상도/폴더/추가일을 한 곳에 기록
+# - AssetManagerModal 의 filteredAssets / toggleSort 에 맞춘 목록 조회
+#   (종류 + 폴더 + 검색어, 이름/추가일 정렬, 커서 기반 페이지네이션)
+# - os.listdir 없이 인덱스로 바로 조회하므로 자산이 수만 개가 되어도 일정한 속도
+
+import base64
+import json
+import mimetypes
+import os
+import time
+import uuid
+
+from storage import LocalConnection
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS assets (
+    id          TEXT PRIMARY KEY,
+    hash        TEXT NOT NULL,
+    name        TEXT NOT NULL UNIQUE,
+    type        TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    duration    REAL,
+    resolution  TEXT,
+    folder_id   TEXT NOT NULL DEFAULT 'all',
+    description TEXT,
+    date_added  INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_assets_type_name ON assets (type, name COLLATE NOCASE, id);
+CREATE INDEX IF NOT EXISTS idx_assets_type_date ON assets (type, date_added, id);
+CREATE INDEX IF NOT EXISTS idx_assets_folder_name ON assets (type, folder_id, name COLLATE NOCASE, id);
+CREATE INDEX IF NOT EXISTS idx_assets_folder_date ON assets (type, folder_id, date_added, id);
+CREATE INDEX IF NOT EXISTS idx_assets_hash ON assets (hash);
+CREATE INDEX IF NOT EXISTS idx_assets_size ON assets (size);
+
+-- 미디어 분석 결과 (내용 해시 기준, 같은 내용이면 한 번만 분석)
+CREATE TABLE IF NOT EXISTS media_info (
+    hash           TEXT PRIMARY KEY,
+    status         TEXT NOT NULL,
+    codec          TEXT,
+    width          INTEGER,
+    height         INTEGER,
+    fps            REAL,
+    duration       REAL,
+    audio_codec    TEXT,
+    audio_channels INTEGER,
+    sample_rate    INTEGER,
+    bitrate        INTEGER,
+    error          TEXT,
+    updated_at     INTEGER NOT NULL
+);
+"""
+
+MEDIA_FIELDS = (
+    "codec", "width", "height", "fps", "duration",
+    "audio_codec", "audio_channels", "sample_rate", "bitrate",
+)
+
+# 정렬 키 → (ORDER BY 식, 컬럼, 커서 비교 자리표시자)
+# 커서 비교는 "(컬럼, id) > (? COLLATE NOCASE, ?)" 형태여야 인덱스 탐색(seek)으로 처리됨
+SORT_COLUMNS = {
+    "name": ("name COLLATE NOCASE", "name", "? COLLATE NOCASE"),
+    "date": ("date_added", "date_added", "?"),
+}
+
+
+def guess_asset_type(name):
+    # 프론트엔드 탭 구분(video / sound / image)에 맞춤
+    mime = mimetypes.guess_type(name)[0] or ""
+    if mime.startswith("video/"):
+        return "video"
+    if mime.startswith("audio/"):
+        return "sound"
+    if mime.startswith("image/"):
+        return "image"
+    return "other"
+
+
+def encode_cursor(value, asset_id):
+    raw = json.dumps([value, asset_id], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def decode_cursor(cursor):
+    try:
+        value, asset_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return value, asset_id
+    except (ValueError, TypeError):
+        raise ValueError("invalid cursor")
+
+
+def original_preview_src(sha256):
+    return f"/api/preview/{sha256}"
+
+
+def row_to_asset(row, preview_src=original_preview_src):
+    asset = {
+        "id": row["id"],
+        "hash": row["hash"],
+        "name": row["name"],
+        "type": row["type"],
+        "size": row["size"],
+        "duration": row["duration"],
+        "resolution": row["resolution"],
+        "folderId": row["folder_id"],
+        "description": row["description"],
+        "dateAdded": row["date_added"],
+        "src": f"/api/objects/{row['hash']}",
+    }
+    if row["type"] == "video":
+        # 재생용 주소: 프록시가 준비되면 프록시(/api/proxies), 아니면 원본(/api/preview)
+        # 주소마다 내용이 바뀌지 않으므로 재생 중인 Range 요청이 다른 파일을 받지 않음
+        asset["previewSrc"] = preview_src(row["hash"])
+    return asset
+
+
+def row_to_media(row):
+    if row is None:
+        return {"status": "none"}
+    media = {field: row[field] for field in MEDIA_FIELDS}
+    media["status"] = row["status"]
+    media["error"] = row["error"]
+    return media
+
+
+class AssetCatalog:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = LocalConnection(db_path)
+        self._listeners = []
+        self._preview_src = original_preview_src
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+
+    def add_listener(self, listener):
+        # listener(event, asset) — event: "added" / "updated"
+        self._listeners.append(listener)
+
+    def set_preview_resolver(self, preview_src):
+        # preview_src(sha256) → 영상 자산의 previewSrc (프록시 변환기가 등록)
+        self._preview_src = preview_src
+
+    def _row_to_asset(self, row):
+        return row_to_asset(row, self._preview_src)
+
+    def _notify(self, event, asset):
+        for listener in self._listeners:
+            try:
+                listener(event, asset)
+            except Exception as e:
+                print(f"❌ 카탈로그 이벤트 처리 실패 ({event}): {e}")
+
+    def add_asset(self, name, sha256, size, description=None, folder_id="all", asset_type=None,
+                  date_added=None):
+        # 같은 이름 + 같은 내용 → 기존 행 / 같은 이름 + 다른 내용 → "이름 (n).확장자" 로 새 행
+        conn = self._conn()
+        base, ext = os.path.splitext(name)
+        added = False
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            candidate = name
+            n = 1
+            while True:
+                row = conn.execute("SELECT * FROM assets WHERE name = ?", (candidate,)).fetchone()
+                if row is None or row["hash"] == sha256:
+                    break
+                candidate = f"{base} ({n}){ext}"
+                n += 1
+            if row is None:
+                asset_id = uuid.uuid4().hex
+                conn.execute(
+                    "INSERT INTO assets (id, hash, name, type, size, folder_id, description, date_added)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (asset_id, sha256, candidate, asset_type or guess_asset_type(candidate), size,
+                     folder_id or "all", description, date_added or int(time.time() * 1000)),
+                )
+                row = conn.execute("SELECT * FROM assets WHERE id = ?", (asset_id,)).fetchone()
+                added = True
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        asset = self._row_to_asset(row)
+        if added:
+            self._notify("added", asset)
+        return asset
+
+    def get(self, asset_id):
+        row = self._conn().execute("SELECT * FROM assets WHERE id = ?", (asset_id,)).fetchone()
+        return self._row_to_asset(row) if row else None
+
+    def get_by_name(self, name):
+        row = self._conn().execute("SELECT * FROM assets WHERE name = ?", (name,)).fetchone()
+        return self._row_to_asset(row) if row else None
+
+    def hashes_with_size(self, size):
+        rows = self._conn().execute("SELECT DISTINCT hash FROM assets WHERE size = ?", (size,))
+        return [r["hash"] for r in rows]
+
+    def update_asset(self, asset_id, **fields):
+        columns = {"folderId": "folder_id", "name": "name", "description": "description"}
+        sets = [(columns[k], v) for k, v in fields.items() if k in columns and v is not None]
+        if sets:
+            self._conn().execute(
+                f"UPDATE assets SET {', '.join(c + ' = ?' for c, _ in sets)} WHERE id = ?",
+                [v for _, v in sets] + [asset_id],
+            )
+        asset = self.get(asset_id)
+        if sets and asset:
+            self._notify("updated", asset)
+        return asset
+
+    def has_media_info(self, sha256):
+        row = self._conn().execute(
+            "SELECT 1 FROM media_info WHERE hash = ? AND status IN ('ready', 'error')", (sha256,)
+        ).fetchone()
+        return row is not None
+
+    def mark_media_pending(self, sha256):
+        self._conn().execute(
+            "INSERT INTO media_info (hash, status, updated_at) VALUES (?, 'pending', ?)"
+            " ON CONFLICT(hash) DO UPDATE SET status = 'pending', error = NULL, updated_at = excluded.updated_at",
+            (sha256, int(time.time() * 1000)),
+        )
+
+    def set_media_info(self, sha256, info):
+        conn = self._conn()
+        values = [info.get(field) for field in MEDIA_FIELDS]
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                f"INSERT OR REPLACE INTO media_info (hash, status, {', '.join(MEDIA_FIELDS)}, updated_at)"
+                f" VALUES (?, 'ready', {', '.join('?' for _ in MEDIA_FIELDS)}, ?)",
+                [sha256] + values + [int(time.time() * 1000)],
+            )
+            # 목록/정렬에 쓰이는 대표 값은 assets 행에도 반영
+            resolution = f"{info['width']}x{info['height']}" if info.get("width") else None
+            conn.execute(
+                "UPDATE assets SET duration = ?, resolution = COALESCE(?, resolution) WHERE hash = ?",
+                (info.get("duration"), resolution, sha256),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self.notify_hash(sha256)
+
+    def notify_hash(self, sha256, event="updated"):
+        # 같은 내용을 가리키는 모든 자산에 변경 알림 (미디어 정보 / 프록시 준비 등)
+        for row in self._conn().execute("SELECT * FROM assets WHERE hash = ?", (sha256,)).fetchall():
+            self._notify(event, self._row_to_asset(row))
+
+    def set_media_error(self, sha256, message):
+        self._conn().execute(
+            "UPDATE media_info SET status = 'error', error = ?, updated_at = ? WHERE hash = ?",
+            (message, int(time.time() * 1000), sha256),
+        )
+
+    def hashes_needing_probe(self, asset_types):
+        placeholders = ", ".join("?" for _ in asset_types)
+        rows = self._conn().execute(
+            f"SELECT DISTINCT a.hash FROM assets a LEFT JOIN media_info m ON m.hash = a.hash"
+            f" WHERE a.type IN ({placeholders}) AND (m.hash IS NULL OR m.status = 'pending')",
+            list(asset_types),
+        )
+        return [r["hash"] for r in rows]
+
+    def media_by_type(self, asset_type):
+        # 분석이 끝난 특정 종류 자산의 미디어 정보 (해시 → 정보)
+        rows = self._conn().execute(
+            "SELECT * FROM media_info WHERE status = 'ready'"
+            " AND hash IN (SELECT hash FROM assets WHERE type = ?)",
+            (asset_type,),
+        )
+        return {r["hash"]: row_to_media(r) for r in rows}
+
+    def get_with_media(self, asset_ids):
+        # 여러 자산의 카탈로그 행 + 미디어 정보를 한 번에 조회
+        if not asset_ids:
+            return {}
+        conn = self._conn()
+        placeholders = ", ".join("?" for _ in asset_ids)
+        assets = [
+            self._row_to_asset(r) for r in
+            conn.execute(f"SELECT * FROM assets WHERE id IN ({placeholders})", list(asset_ids))
+        ]
+        media_by_hash = self.media_for_hashes({a["hash"] for a in assets})
+        return {a["id"]: dict(a, media=media_by_hash[a["hash"]]) for a in assets}
+
+    def media_for_hashes(self, hashes):
+        # 해시 → 미디어 정보 (분석 기록이 없으면 {"status": "none"})
+        hashes = list(hashes)
+        media_by_hash = {h: row_to_media(None) for h in hashes}
+        if hashes:
+            placeholders = ", ".join("?" for _ in hashes)
+            rows = self._conn().execute(f"SELECT * FROM media_info WHERE hash IN ({placeholders})", hashes)
+            for row in rows:
+                media_by_hash[row["hash"]] = row_to_media(row)
+        return media_by_hash
+
+    def list_assets(self, asset_type=None, folder_id=None, query=None, sort="name",
+                    ascending=True, limit=DEFAULT_PAGE_SIZE, cursor=None):
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"unknown sort: {sort}")
+        sort_expr, sort_column, placeholder = SORT_COLUMNS[sort]
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        where, params = [], []
+        if asset_type:
+            where.append("type = ?")
+            params.append(asset_type)
+        if folder_id and folder_id != "all":
+            where.append("folder_id = ?")
+            params.append(folder_id)
+        if query:
+            where.append("name LIKE ? ESCAPE '\\'")
+            escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            params.append(f"%{escaped}%")
+
+        count_sql = "SELECT COUNT(*) FROM assets" + (" WHERE " + " AND ".join(where) if where else "")
+        total = self._conn().execute(count_sql, params).fetchone()[0] if cursor is None else None
+
+        # 키셋 페이지네이션: (정렬값, id) 가 직전 페이지 마지막 행보다 뒤인 것부터
+        if cursor is not None:
+            value, asset_id = decode_cursor(cursor)
+            op = ">" if ascending else "<"
+            where.append(f"({sort_column}, id) {op} ({placeholder}, ?)")
+            params.extend([value, asset_id])
+
+        direction = "ASC" if ascending else "DESC"
+        sql = "SELECT * FROM assets"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {sort_expr} {direction}, id {direction} LIMIT ?"
+        rows = self._conn().execute(sql, params + [limit + 1]).fetchall()
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = encode_cursor(last[sort_column], last["id"])
+        return {
+            "items": [self._row_to_asset(r) for r in rows],
+            "nextCursor": next_cursor,
+            "total": total,
+        }
+
+    def folder_counts(self, asset_type=None):
+        sql = "SELECT folder_id, COUNT(*) AS n FROM assets"
+        params = []
+        if asset_type:
+            sql += " WHERE type = ?"
+            params.append(asset_type)
+        sql += " GROUP BY folder_id"
+        counts = {r["folder_id"]: r["n"] for r in self._conn().execute(sql, params)}
+        counts["all"] = sum(counts.values())
+        return counts
@@ -0,0 +1,20 @@
+# C:\wai-ui\backend\disk_io.py
+# 업로드 디스크 쓰기 전용 스레드 풀
+# - async 엔드포인트에서 open/write/close 를 직접 호출하면 느린 디스크 하나가
+#   uvicorn 이벤트 루프 전체(다른 모든 요청)를 멈추게 하므로 여기로 넘긴다.
+# - 각 업로드는 직전 쓰기가 끝나야 다음 청크를 읽으므로 자연스럽게 backpressure 가 걸린다.
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# 동시에 디스크에 쓰는 스레드 수 (환경변수로 조정 가능)
+DISK_IO_WORKERS = int(os.environ.get("WAI_DISK_IO_WORKERS", "4"))
+
+_executor = ThreadPoolExecutor(max_workers=DISK_IO_WORKERS, thread_name_prefix="wai-disk-io")
+
+
+async def run_io(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
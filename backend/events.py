@@ -0,0 +1,101 @@
+# C:\wai-ui\backend\events.py
+# 실시간 알림 채널 (Server-Sent Events, 하나의 스트림에 여러 종류 이벤트)
+# - 작업 진행률 / 완료, 자산 카탈로그 변경, 업로드 진행률을 열려 있는 모든 화면에 전달 → 폴링 불필요
+# - 구독자마다 "키 → 최신 이벤트" 로 합치기(coalescing): 같은 작업의 진행률이 쏟아져도
+#   FLUSH_INTERVAL 마다 마지막 상태 하나만 전송 → 시끄러운 작업이 스트림을 막지 않음
+# - 워커 스레드에서 publish 해도 이벤트 루프로 안전하게 넘김 (call_soon_threadsafe)
+
+import asyncio
+import json
+from collections import OrderedDict
+
+FLUSH_INTERVAL = 0.25              # 같은 구독자에게 보내는 최소 간격(초)
+HEARTBEAT_INTERVAL = 15            # 연결 유지용 주석 전송 간격(초)
+MAX_PENDING_KEYS = 1000            # 이보다 많이 밀리면 버리고 resync 이벤트 한 번만 전송
+
+
+class Subscriber:
+    def __init__(self, topics=None):
+        self.topics = set(topics) if topics else None
+        self.pending = OrderedDict()    # key → (topic, data)
+        self.overflowed = False
+        self.wakeup = asyncio.Event()
+
+    def put(self, topic, key, data):
+        if self.topics is not None and topic not in self.topics:
+            return
+        if key in self.pending:
+            # 아직 보내지 않은 같은 키의 이벤트는 최신 값으로 교체 (순서는 처음 자리 유지)
+            self.pending[key] = (topic, data)
+        elif len(self.pending) >= MAX_PENDING_KEYS:
+            self.pending.clear()
+            self.overflowed = True
+        else:
+            self.pending[key] = (topic, data)
+        self.wakeup.set()
+
+    def drain(self):
+        events = list(self.pending.values())
+        self.pending.clear()
+        self.wakeup.clear()
+        if self.overflowed:
+            # 밀린 이벤트를 버렸으니 클라이언트가 목록을 다시 불러오도록 알림
+            self.overflowed = False
+            events.insert(0, ("resync", {}))
+        return events
+
+
+def format_event(topic, data, event_id):
+    return f"id: {event_id}\nevent: {topic}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+class EventHub:
+    def __init__(self):
+        self._loop = None
+        self._subscribers = set()
+        self._next_id = 0
+
+    def attach(self, loop):
+        # 서버 시작 시(lifespan) 이벤트 루프 연결
+        self._loop = loop
+
+    def publish(self, topic, key, data):
+        # 어느 스레드에서든 호출 가능, 구독자가 없으면 아무 일도 하지 않음
+        if self._loop is None or not self._subscribers:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._dispatch, topic, key, data)
+        except RuntimeError:
+            pass    # 서버 종료 중 (루프 닫힘)
+
+    def _dispatch(self, topic, key, data):
+        for subscriber in self._subscribers:
+            subscriber.put(topic, key, data)
+
+    def on_catalog_event(self, event, asset):
+        self.publish("asset", f"asset:{asset['id']}", {"event": event, "asset": asset})
+
+    def on_job_event(self, job):
+        self.publish("job", f"job:{job['id']}", job)
+
+    async def stream(self, request, topics=None):
+        subscriber = Subscriber(topics)
+        self._subscribers.add(subscriber)
+        try:
+            yield "retry: 3000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    await asyncio.wait_for(subscriber.wakeup.wait(), HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                # 잠깐 모았다가 한 번에 전송 → 그 사이 같은 키의 이벤트는 합쳐짐
+                await asyncio.sleep(FLUSH_INTERVAL)
+                chunks = []
+                for topic, data in subscriber.drain():
+                    self._next_id += 1
+                    chunks.append(format_event(topic, data, self._next_id))
+                if chunks:
+                    yield "".join(chunks)
+        finally:
+            self._subscribers.discard(subscriber)
@@ -0,0 +1,612 @@
+# C:\wai-ui\backend\export.py
+# 타임라인 → MP4 내보내기 (app-root.js 의 clips / tracks / canvasBoxes 를 그대로 받아 서버에서 렌더링)
+# - 타임라인을 ffmpeg 필터 그래프로 변환: 검정 배경 위에 트랙 순서(아래 트랙 → 위 트랙), 그 위에 캔버스 박스를 overlay
+# - 출력을 SEGMENT_SECONDS 단위의 독립 구간으로 나눠 구간마다 별도 ffmpeg 프로세스로 동시에 인코딩 (SEGMENT_WORKERS = 코어 수)
+# - 오디오는 전체 길이를 한 번에 믹스 (구간 경계에서 AAC 프라이밍 틈이 생기지 않도록)
+# - 구간 / 오디오 결과는 영향을 주는 모든 입력의 해시로 캐시 (cache/segments/ab/<해시>.mp4)
+#   → 자막 한 단어만 고쳐 다시 내보내면 그 자막이 보이는 구간만 다시 인코딩
+#   캐시는 SEGMENT_CACHE_MAX_BYTES 를 넘으면 가장 오래 쓰지 않은(mtime) 파일부터 정리 (사용할 때마다 mtime 갱신)
+# - 마지막에 concat demuxer 로 구간 영상 + 오디오를 재인코딩 없이(-c copy) 이어 붙임 → uploaded_files/exports/<작업 id>.mp4
+
+import hashlib
+import json
+import math
+import os
+import re
+import shutil
+import subprocess
+import threading
+import time
+from collections import Counter
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from urllib.parse import unquote
+
+import ffmpeg
+
+from ffmpeg_run import run_ffmpeg
+from jobs import PRIORITY_NORMAL, JobCancelled, JobFailed
+
+EXPORT_WORKERS = int(os.environ.get("WAI_EXPORT_WORKERS", "1"))
+SEGMENT_WORKERS = int(os.environ.get("WAI_EXPORT_SEGMENT_WORKERS", str(os.cpu_count() or 1)))
+EXPORT_FONT_FILE = os.environ.get("WAI_EXPORT_FONT_FILE")
+EXPORTS_DIR_NAME = "exports"
+SEGMENTS_DIR_NAME = os.path.join("cache", "segments")
+SEGMENT_CACHE_VERSION = 1          # 렌더링 방식이 바뀌면 올려서 기존 캐시 무효화
+SEGMENT_SECONDS = 10
+SEGMENT_CACHE_MAX_BYTES = int(float(os.environ.get("WAI_SEGMENT_CACHE_GB", "20")) * 1024 ** 3)
+CACHE_MIN_AGE_SECONDS = 3600       # 최근에 쓴 캐시 파일은 한도를 넘어도 남김 (렌더링 / 연결 중인 구간 보호)
+CACHE_PRUNE_INTERVAL = 60          # 캐시 폴더 전체를 훑는 최소 간격(초)
+DEFAULT_FPS = 30
+MAX_FPS = 60
+MAX_CANVAS_SIDE = 4096
+ENCODER_SETTINGS = {"vcodec": "libx264", "preset": "medium", "crf": 20, "pix_fmt": "yuv420p"}
+AUDIO_SAMPLE_RATE = 48000
+AUDIO_BITRATE = "192k"
+AUDIO_PROGRESS_WEIGHT = 0.05       # 전체 진행률에서 오디오 믹스가 차지하는 비율
+TEXT_PADDING = 20                  # PreviewCanvas.textContentStyle 의 padding
+
+SOURCE_PATTERN = re.compile(r"/api/(objects|preview|proxies|files)/([^/?#]+)")
+HEX_COLOR_PATTERN = re.compile(r"#(?:[0-9a-fA-F]{3}|[0-9a-fA-F]{6}|[0-9a-fA-F]{8})")
+
+_filter_cache = {}
+
+
+class TimelineError(ValueError):
+    pass
+
+
+def touch(path):
+    # 캐시 적중 → mtime 갱신 (정리 순서에서 뒤로)
+    try:
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+
+
+def prune_cache(root, max_bytes, min_age=CACHE_MIN_AGE_SECONDS):
+    # 캐시 폴더를 max_bytes 이하로: 가장 오래 쓰지 않은 파일부터 삭제 (최근 min_age 초 안에 쓴 파일은 남김)
+    files = []
+    total = 0
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(dirpath, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+    if total <= max_bytes:
+        return 0
+    cutoff = time.time() - min_age
+    removed = 0
+    for mtime, size, path in sorted(files):
+        if total <= max_bytes or mtime > cutoff:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def has_filter(name):
+    # 설치된 ffmpeg 빌드에 필터가 있는지 (drawtext 는 libfreetype 빌드에만 있음)
+    if name not in _filter_cache:
+        try:
+            listing = subprocess.run(["ffmpeg", "-hide_banner", "-filters"], capture_output=True, text=True).stdout
+        except OSError:
+            listing = ""
+        _filter_cache[name] = re.search(rf"^\s*\S+\s+{re.escape(name)}\s", listing, re.MULTILINE) is not None
+    return _filter_cache[name]
+
+
+def ffmpeg_color(value):
+    # CSS 색상 중 ffmpeg 가 그대로 읽을 수 있는 #hex 만 사용, transparent 등은 None
+    if isinstance(value, str) and HEX_COLOR_PATTERN.fullmatch(value):
+        return value
+    return None
+
+
+def number(value, what):
+    # 타임라인의 숫자 값 ("1.5" 같은 문자열 허용), 숫자가 아니면 TimelineError → 400 (500 이 아니라)
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        raise TimelineError(f"{what} must be a number, got {value!r}")
+    if not math.isfinite(result):
+        raise TimelineError(f"{what} must be finite, got {value!r}")
+    return result
+
+
+def even(value, what="size"):
+    return max(2, int(round(number(value, what) / 2)) * 2)
+
+
+def compile_timeline(timeline, resolve_source, fps=DEFAULT_FPS):
+    # 브라우저 타임라인 상태 → 렌더링 계획 (JSON 으로 작업 payload 에 저장)
+    # resolve_source(src) → (해시, 파일 경로, 미디어 정보) 또는 None
+    canvas = timeline.get("canvasSize") or {}
+    width, height = even(canvas.get("w") or 1920, "canvasSize.w"), even(canvas.get("h") or 1080, "canvasSize.h")
+    if width > MAX_CANVAS_SIDE or height > MAX_CANVAS_SIDE:
+        raise TimelineError(f"canvas must be at most {MAX_CANVAS_SIDE}px per side")
+    if not 1 <= fps <= MAX_FPS:
+        raise TimelineError(f"fps must be in [1, {MAX_FPS}]")
+
+    track_order = {}
+    hidden_tracks = set()
+    for index, track in enumerate(timeline.get("tracks") or []):
+        track_order[track.get("id")] = index
+        if track.get("isHidden"):
+            hidden_tracks.add(track.get("id"))
+
+    layers = []
+    audio = []
+    warnings = []
+    clips = []
+    for c in timeline.get("clips") or []:
+        if not isinstance(c, dict):
+            raise TimelineError(f"clip must be an object, got {c!r}")
+        if c.get("trackId") not in track_order or c.get("trackId") in hidden_tracks:
+            continue
+        what = f"clip {c.get('id')}"
+        start = max(0.0, number(c.get("start") or 0, f"{what} start"))
+        length = number(c.get("duration") or 0, f"{what} duration")
+        if length > 0:
+            clips.append((c, start, length))
+    # activeClipBoxes 와 같은 순서: 목록 앞쪽 트랙이 위 → 아래 트랙부터 그림
+    clips.sort(key=lambda item: (-track_order[item[0]["trackId"]], item[1]))
+    for clip, start, length in clips:
+        clip_type = clip.get("type")
+        if clip_type not in ("video", "image", "sound"):
+            continue
+        what = f"clip {clip.get('id')}"
+        end = start + length
+        offset = max(0.0, number(clip.get("startOffset") or 0, f"{what} startOffset"))
+        speed = number(clip.get("playbackSpeed") or 1, f"{what} playbackSpeed")
+        if speed <= 0:
+            raise TimelineError(f"{what} playbackSpeed must be > 0")
+        volume = number(clip.get("volume") if clip.get("volume") is not None else 100, f"{what} volume")
+        source = resolve_source(clip.get("src") or "")
+        if source is None:
+            raise TimelineError(f"clip {clip.get('id')} has no server-side source: {clip.get('src')!r}")
+        sha256, path, media = source
+        if clip_type in ("video", "image"):
+            layers.append({
+                "start": start, "end": end, "x": 0, "y": 0, "w": width, "h": height,
+                "background": None, "text": None,
+                "media": {"type": clip_type, "hash": sha256, "path": path, "offset": offset, "speed": speed, "fit": "contain"},
+            })
+        has_audio = clip_type == "sound" or (clip_type == "video" and media.get("audio_codec"))
+        if has_audio and not clip.get("isMuted") and volume > 0:
+            audio.append({
+                "hash": sha256, "path": path, "start": start, "end": end,
+                "offset": offset, "speed": speed, "volume": volume,
+            })
+
+    duration = max([layer["end"] for layer in layers] + [a["end"] for a in audio] + [0.0])
+    if duration <= 0:
+        raise TimelineError("timeline is empty")
+
+    # 캔버스 박스는 클립보다 위 (allVisibleBoxes), 박스끼리는 zIndex 순
+    boxes = []
+    for b in timeline.get("canvasBoxes") or []:
+        if not isinstance(b, dict):
+            raise TimelineError(f"canvas box must be an object, got {b!r}")
+        if not b.get("isHidden"):
+            boxes.append((number(b.get("zIndex") or 0, f"box {b.get('id')} zIndex"), b))
+    boxes.sort(key=lambda item: item[0])
+    for _, box in boxes:
+        what = f"box {box.get('id')}"
+        layer = {
+            "start": 0.0, "end": duration,
+            "x": int(round(number(box.get("x") or 0, f"{what} x"))), "y": int(round(number(box.get("y") or 0, f"{what} y"))),
+            "w": even(box.get("w") or 2, f"{what} w"), "h": even(box.get("h") or 2, f"{what} h"),
+            "background": ffmpeg_color(box.get("layerBgColor")), "media": None, "text": None,
+        }
+        if box.get("mediaType") in ("video", "image") and box.get("mediaSrc"):
+            source = resolve_source(box["mediaSrc"])
+            if source is None:
+                raise TimelineError(f"box {box.get('id')} has no server-side source: {box['mediaSrc']!r}")
+            sha256, path, _ = source
+            layer["media"] = {
+                "type": box["mediaType"], "hash": sha256, "path": path, "offset": 0.0, "speed": 1.0,
+                "fit": box.get("mediaFit") or "contain",
+            }
+        text = (box.get("textContent") or "").strip() if box.get("rowType") == "TXT" else ""
+        if text:
+            if has_filter("drawtext"):
+                layer["text"] = dict(box.get("textStyle") or {}, content=text)
+            else:
+                warnings.append(f"box {box.get('id')}: text skipped (ffmpeg built without drawtext)")
+        if layer["background"] or layer["media"] or layer["text"]:
+            layers.append(layer)
+
+    frames = math.ceil(duration * fps - 1e-6)
+    return {
+        "width": width, "height": height, "fps": fps, "duration": round(duration, 3), "frames": frames,
+        "layers": layers, "audio": audio, "warnings": warnings,
+    }
+
+
+def split_segments(plan, segment_seconds=SEGMENT_SECONDS):
+    # 프레임 경계에 맞춘 [시작 프레임, 끝 프레임) 목록
+    step = max(1, round(segment_seconds * plan["fps"]))
+    return [(first, min(first + step, plan["frames"])) for first in range(0, plan["frames"], step)]
+
+
+def fit_media(stream, fit, w, h):
+    if fit == "cover":
+        return stream.filter("scale", w, h, force_original_aspect_ratio="increase").filter("crop", w, h)
+    if fit == "fill":
+        return stream.filter("scale", w, h)
+    return (
+        stream
+        .filter("scale", w, h, force_original_aspect_ratio="decrease")
+        .filter("pad", w, h, "(ow-iw)/2", "(oh-ih)/2", color="black")
+    )
+
+
+def draw_text(stream, layer, enable):
+    style = layer["text"]
+    align = style.get("textAlign") or "center"
+    v_align = style.get("vAlign") or "middle"
+    left, top = layer["x"] + TEXT_PADDING, layer["y"] + TEXT_PADDING
+    right, bottom = layer["x"] + layer["w"] - TEXT_PADDING, layer["y"] + layer["h"] - TEXT_PADDING
+    x = {"left": f"{left}", "right": f"{right}-text_w"}.get(align, f"{left}+({right - left}-text_w)/2")
+    y = {"top": f"{top}", "bottom": f"{bottom}-text_h"}.get(v_align, f"{top}+({bottom - top}-text_h)/2")
+    font_size = style.get("fontSize") or 48
+    options = {
+        "text": style["content"], "expansion": "none", "x": x, "y": y, "enable": enable,
+        "fontsize": font_size, "fontcolor": ffmpeg_color(style.get("fillColor")) or "white",
+        "line_spacing": int(font_size * ((style.get("lineHeight") or 1.4) - 1)),
+    }
+    if EXPORT_FONT_FILE:
+        options["fontfile"] = EXPORT_FONT_FILE
+    elif style.get("fontFamily"):
+        options["font"] = style["fontFamily"].split(",")[0].strip().strip("'\"")
+    if style.get("strokeWidth"):
+        options["borderw"] = style["strokeWidth"]
+        options["bordercolor"] = ffmpeg_color(style.get("strokeColor")) or "black"
+    shadow = style.get("shadow")
+    if shadow:
+        options["shadowx"] = shadow.get("offsetX") or 0
+        options["shadowy"] = shadow.get("offsetY") or 0
+        options["shadowcolor"] = ffmpeg_color(shadow.get("color")) or "black"
+    return stream.filter("drawtext", **options)
+
+
+def segment_layers(plan, first_frame, end_frame):
+    # 구간과 겹치는 레이어를 구간 시작 기준 시간으로 정규화 (렌더링 입력이자 캐시 키의 재료)
+    fps = plan["fps"]
+    t0, t1 = first_frame / fps, end_frame / fps
+    layers = []
+    for layer in plan["layers"]:
+        a, b = max(layer["start"], t0), min(layer["end"], t1)
+        if b <= a:
+            continue
+        media = layer["media"]
+        if media:
+            if media["type"] == "image":
+                media = dict(media, seek=0.0, speed=1.0)
+            else:
+                media = dict(media, seek=round(media["offset"] + (a - layer["start"]) * media["speed"], 6))
+            media.pop("offset")
+        layers.append(dict(layer, start=round(a - t0, 6), end=round(b - t0, 6), media=media))
+    return layers
+
+
+def segment_key(plan, layers, frames, encoder=ENCODER_SETTINGS, output_options=None):
+    # 구간 결과에 영향을 주는 모든 입력의 해시: 레이어(원본 내용 해시 / 위치 / 박스 설정 / 텍스트) + 캔버스 + 인코더 설정
+    # 파일 경로는 빼고 내용 해시만 사용 → 같은 내용이면 다른 이름으로 올려도 캐시 적중
+    description = {
+        "version": SEGMENT_CACHE_VERSION,
+        "encoder": dict(encoder, **(output_options or {})),
+        "width": plan["width"], "height": plan["height"], "fps": plan["fps"], "frames": frames,
+        "layers": [
+            dict(layer, media={k: v for k, v in layer["media"].items() if k != "path"} if layer["media"] else None)
+            for layer in layers
+        ],
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def media_source(layer, fps):
+    # 레이어 미디어 → 박스 크기에 맞춘 영상 (시간 위치는 호출하는 쪽에서 setpts 로 지정)
+    media = layer["media"]
+    length = layer["end"] - layer["start"]
+    if media["type"] == "image":
+        source = ffmpeg.input(media["path"], loop=1, framerate=fps, t=length).video
+    else:
+        speed = media["speed"]
+        source = ffmpeg.input(media["path"], ss=f"{media['seek']:.6f}", t=f"{length * speed:.6f}").video
+        source = source.filter("setpts", f"(PTS-STARTPTS)/{speed}")
+    source = fit_media(source.filter("fps", fps), media["fit"], layer["w"], layer["h"])
+    return source.filter("setsar", 1)
+
+
+def source_signature(layer):
+    return json.dumps([layer["media"], layer["end"] - layer["start"], layer["w"], layer["h"]], sort_keys=True)
+
+
+class SharedSources:
+    # ffmpeg-python 은 인자가 같은 입력 / 필터를 한 노드로 합침
+    # → 같은 원본 체인을 여러 번 쓰면 split(asplit) 으로 갈라서 하나씩 나눠 줌
+    def __init__(self, signatures, split_filter):
+        self._uses = Counter(signatures)
+        self._split_filter = split_filter
+        self._shared = {}
+
+    def get(self, signature, build):
+        if self._uses[signature] <= 1:
+            return build()
+        node, used = self._shared.get(signature) or (build().filter_multi_output(self._split_filter), 0)
+        self._shared[signature] = (node, used + 1)
+        return node.stream(used)
+
+
+def build_segment(plan, layers, frames, dest_path, threads=0, encoder=ENCODER_SETTINGS, output_options=None):
+    # 한 구간의 필터 그래프: 검정 배경(color) 위에 구간과 겹치는 레이어를 순서대로 overlay
+    fps = plan["fps"]
+    sources = SharedSources([source_signature(layer) for layer in layers if layer["media"]], "split")
+    base = ffmpeg.input(f"color=c=black:s={plan['width']}x{plan['height']}:r={fps}:d={frames / fps}", f="lavfi").video
+    for layer in layers:
+        a, b = layer["start"], layer["end"]
+        enable = f"between(t,{a:.6f},{b:.6f})"
+        if layer["background"]:
+            base = base.filter(
+                "drawbox", layer["x"], layer["y"], layer["w"], layer["h"], layer["background"], t="fill", enable=enable,
+            )
+        if layer["media"]:
+            source = sources.get(source_signature(layer), lambda: media_source(layer, fps))
+            source = source.filter("setpts", f"PTS-STARTPTS+{a:.6f}/TB")
+            base = ffmpeg.overlay(base, source, x=layer["x"], y=layer["y"], eof_action="pass")
+        if layer["text"]:
+            base = draw_text(base, layer, enable)
+    options = dict(encoder, **(output_options or {"format": "mp4"}))
+    return base.output(dest_path, r=fps, **options, **{"frames:v": frames, "threads": threads})
+
+
+def audio_key(plan):
+    clips = [{k: v for k, v in clip.items() if k != "path"} for clip in plan["audio"]]
+    description = {
+        "version": SEGMENT_CACHE_VERSION, "frames": plan["frames"], "fps": plan["fps"], "clips": clips,
+        "sampleRate": AUDIO_SAMPLE_RATE, "bitrate": AUDIO_BITRATE,
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def tempo_filters(stream, speed):
+    # atempo 한 번에 0.5~2.0 배만 확실히 지원 → 범위를 넘으면 여러 번 연결
+    while speed > 2.0:
+        stream = stream.filter("atempo", 2.0)
+        speed /= 2.0
+    while speed < 0.5:
+        stream = stream.filter("atempo", 0.5)
+        speed /= 0.5
+    if abs(speed - 1.0) > 1e-6:
+        stream = stream.filter("atempo", speed)
+    return stream
+
+
+def audio_source(clip):
+    stream = ffmpeg.input(
+        clip["path"], ss=f"{clip['offset']:.6f}", t=f"{(clip['end'] - clip['start']) * clip['speed']:.6f}",
+    ).audio
+    return (
+        tempo_filters(stream, clip["speed"])
+        .filter("aresample", AUDIO_SAMPLE_RATE)
+        .filter("aformat", channel_layouts="stereo")
+        .filter("volume", clip["volume"] / 100)
+    )
+
+
+def audio_signature(clip):
+    source = {k: v for k, v in clip.items() if k not in ("start", "end")}
+    return json.dumps([source, clip["end"] - clip["start"]], sort_keys=True)
+
+
+def build_audio(plan, dest_path):
+    # 모든 오디오 클립을 타임라인 위치로 지연시켜 한 번에 믹스 (볼륨 100 = 원음)
+    duration = plan["frames"] / plan["fps"]
+    sources = SharedSources([audio_signature(clip) for clip in plan["audio"]], "asplit")
+    tracks = []
+    for clip in plan["audio"]:
+        stream = sources.get(audio_signature(clip), lambda: audio_source(clip))
+        tracks.append(stream.filter("adelay", f"{int(round(clip['start'] * 1000))}", all=1))
+    if not tracks:
+        mixed = ffmpeg.input(f"anullsrc=r={AUDIO_SAMPLE_RATE}:cl=stereo", f="lavfi").audio
+    elif len(tracks) == 1:
+        mixed = tracks[0]
+    else:
+        mixed = ffmpeg.filter(tracks, "amix", inputs=len(tracks), duration="longest", normalize=0)
+    mixed = mixed.filter("apad", whole_dur=f"{duration:.6f}").filter("atrim", 0, f"{duration:.6f}")
+    return mixed.output(dest_path, format="mp4", acodec="aac", audio_bitrate=AUDIO_BITRATE, ar=AUDIO_SAMPLE_RATE)
+
+
+class PartProgress:
+    # 동시에 도는 ffmpeg 여러 개의 진행률을 작업 하나의 진행률로 합침 (run_ffmpeg 에 job 대신 전달)
+    def __init__(self, job, weights, abort):
+        self._job = job
+        self._weights = weights
+        self._done = [0.0] * len(weights)
+        self._total = sum(weights) or 1
+        self._abort = abort
+        self._lock = threading.Lock()
+
+    def part(self, index):
+        return ProgressPart(self, index)
+
+    def update(self, index, fraction):
+        with self._lock:
+            self._done[index] = max(0.0, min(1.0, fraction)) * self._weights[index]
+            total = sum(self._done)
+        self._job.set_progress(total / self._total)
+
+    def check_cancelled(self):
+        # 다른 구간이 실패하면 나머지 구간도 바로 중단
+        if self._abort.is_set():
+            raise JobCancelled()
+        self._job.check_cancelled()
+
+
+class ProgressPart:
+    # run_ffmpeg 가 쓰는 job 인터페이스 (set_progress / check_cancelled) 중 구간 하나 몫
+    def __init__(self, progress, index):
+        self._progress = progress
+        self._index = index
+
+    def set_progress(self, fraction, force=False):
+        self._progress.update(self._index, fraction)
+
+    def check_cancelled(self):
+        self._progress.check_cancelled()
+
+
+def render_parallel(job, tasks, workers):
+    # tasks: (stream_spec, 임시 경로, 최종 경로, 길이(초), 진행률 가중치) 목록
+    # 한 풀에서 동시에 실행, 하나라도 실패하면 나머지도 중단 / 끝난 것은 최종 경로로 옮김
+    if not tasks:
+        return
+    abort = threading.Event()
+    progress = PartProgress(job, [task[4] for task in tasks], abort)
+
+    def render(index, spec, tmp_path, dest_path, duration):
+        run_ffmpeg(spec, progress.part(index), duration)
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        os.replace(tmp_path, dest_path)
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(render, i, *task[:4]) for i, task in enumerate(tasks)]
+        done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+        if any(f.exception() for f in done):
+            abort.set()
+            for future in pending:
+                future.cancel()
+            wait(futures)
+        for future in futures:
+            if not future.cancelled() and future.exception() and not isinstance(future.exception(), JobCancelled):
+                raise future.exception()
+    job.check_cancelled()
+
+
+class TimelineExporter:
+    def __init__(self, upload_dir, catalog, asset_store, job_queue, workers=EXPORT_WORKERS):
+        self.exports_dir = os.path.join(upload_dir, EXPORTS_DIR_NAME)
+        self.segments_dir = os.path.join(upload_dir, SEGMENTS_DIR_NAME)
+        self.catalog = catalog
+        self.asset_store = asset_store
+        self.job_queue = job_queue
+        self._last_prune = 0.0
+        # 같은 타임라인으로 다시 돌려도 결과가 같으므로 재시도하지 않음
+        # 작업 기록이 지워지면(보관 기간 만료 / DELETE) 결과 MP4 도 삭제 → 주소 없는 파일이 남지 않음
+        job_queue.register("export", self._run, max_attempts=1, concurrency=workers, cleanup=self.remove_output)
+
+    def output_path(self, export_id):
+        return os.path.join(self.exports_dir, f"{export_id}.mp4")
+
+    def remove_output(self, export_id):
+        try:
+            os.remove(self.output_path(export_id))
+        except FileNotFoundError:
+            pass
+
+    def segment_path(self, key, suffix):
+        return os.path.join(self.segments_dir, key[:2], key + suffix)
+
+    def prune_segments(self):
+        # 내보내기 / 미리보기가 구간을 새로 만든 뒤 호출 (CACHE_PRUNE_INTERVAL 에 한 번만 실제로 훑음)
+        now = time.monotonic()
+        if now - self._last_prune < CACHE_PRUNE_INTERVAL:
+            return
+        self._last_prune = now
+        removed = prune_cache(self.segments_dir, SEGMENT_CACHE_MAX_BYTES)
+        if removed:
+            print(f"🧹 구간 캐시 정리: {removed}개 삭제")
+
+    def resolve_source(self, src):
+        # 클립 src (/api/objects|preview|proxies/<sha256>, /api/files/<이름>) → (해시, 원본 경로, 미디어 정보)
+        match = SOURCE_PATTERN.search(src)
+        if not match:
+            return None
+        kind, value = match.groups()
+        if kind == "files":
+            # 브라우저가 만든 주소는 퍼센트 인코딩 ("내 영상.mp4" → %EB%82%B4%20...) → 카탈로그 이름으로 되돌림
+            entry = self.asset_store.lookup(unquote(value))
+            sha256 = entry["hash"] if entry else None
+        else:
+            sha256 = value
+        if not sha256 or not self.asset_store.has_object(sha256):
+            return None
+        media = self.catalog.media_for_hashes([sha256])[sha256]
+        return sha256, self.asset_store.object_path(sha256), media
+
+    def compile(self, timeline, fps=DEFAULT_FPS):
+        return compile_timeline(timeline, self.resolve_source, fps)
+
+    def submit(self, plan, name=None):
+        job, _ = self.job_queue.enqueue("export", {"plan": plan, "name": name}, priority=PRIORITY_NORMAL)
+        return job
+
+    def _run(self, job):
+        plan = job.payload["plan"]
+        work_dir = os.path.join(self.exports_dir, f"{job.id}.parts")
+        os.makedirs(work_dir, exist_ok=True)
+        segments = split_segments(plan)
+        workers = max(1, min(SEGMENT_WORKERS, len(segments) + 1))
+        threads = max(1, (os.cpu_count() or 1) // workers)
+
+        # 캐시에 없는 구간 / 오디오만 렌더링 목록에 넣음 (작업 폴더에 쓴 뒤 캐시로 옮김)
+        segment_paths = []
+        tasks = []
+        for first, end in segments:
+            layers = segment_layers(plan, first, end)
+            path = self.segment_path(segment_key(plan, layers, end - first), ".mp4")
+            segment_paths.append(path)
+            if os.path.exists(path):
+                touch(path)
+            elif path not in (t[2] for t in tasks):
+                tmp_path = os.path.join(work_dir, os.path.basename(path))
+                spec = build_segment(plan, layers, end - first, tmp_path, threads)
+                tasks.append((spec, tmp_path, path, (end - first) / plan["fps"], end - first))
+        audio_path = self.segment_path(audio_key(plan), ".m4a")
+        if os.path.exists(audio_path):
+            touch(audio_path)
+        else:
+            tmp_path = os.path.join(work_dir, os.path.basename(audio_path))
+            tasks.append((build_audio(plan, tmp_path), tmp_path, audio_path, plan["frames"] / plan["fps"],
+                          plan["frames"] * AUDIO_PROGRESS_WEIGHT))
+        rendered = sum(1 for task in tasks if task[2].endswith(".mp4"))
+
+        try:
+            render_parallel(job, tasks, workers)
+
+            # 구간 영상 이어 붙이기 + 오디오 입히기 (재인코딩 없음)
+            list_path = os.path.join(work_dir, "segments.txt")
+            with open(list_path, "w", encoding="utf-8") as f:
+                for path in segment_paths:
+                    f.write(f"file '{os.path.abspath(path)}'\n")
+            dest_path = self.output_path(job.id)
+            tmp_path = os.path.join(work_dir, "output.mp4")
+            video = ffmpeg.input(list_path, f="concat", safe=0).video
+            sound = ffmpeg.input(audio_path).audio
+            run_ffmpeg(ffmpeg.output(video, sound, tmp_path, format="mp4", c="copy", movflags="+faststart"), job)
+            os.replace(tmp_path, dest_path)
+        except ffmpeg.Error as e:
+            message = e.stderr.decode("utf-8", "replace")[-500:]
+            print(f"❌ 내보내기 실패: {job.id}")
+            raise JobFailed(message)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        self.prune_segments()
+
+        print(f"🎞️ 내보내기 완료: {job.id} ({plan['duration']}s, 구간 {len(segments)}개 중 {rendered}개 인코딩)")
+        return {
+            "src": f"/api/exports/{job.id}/file",
+            "duration": plan["duration"],
+            "segments": len(segments),
+            "segmentsRendered": rendered,
+            "warnings": plan["warnings"],
+        }
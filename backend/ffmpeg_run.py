@@ -0,0 +1,54 @@
+# C:\wai-ui\backend\ffmpeg_run.py
+# 작업 큐에서 ffmpeg 실행 (진행률 보고 + 취소 시 프로세스 종료)
+# - "-progress pipe:2" 로 0.5초마다 out_time 을 받아 작업 진행률로 반영
+# - 그 외 로그 줄은 on_line 콜백으로 넘기고(장면 점수 등), 마지막 몇 줄은 실패 메시지로 보관
+
+import re
+from collections import deque
+
+import ffmpeg
+
+PROGRESS_LINE_PATTERN = re.compile(r"^[a-z0-9_]+=\S*$")
+DURATION_PATTERN = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+ERROR_TAIL_LINES = 20
+
+
+def parse_duration(line):
+    match = DURATION_PATTERN.search(line)
+    if not match:
+        return None
+    h, m, s = match.groups()
+    return int(h) * 3600 + int(m) * 60 + float(s)
+
+
+def run_ffmpeg(stream_spec, job=None, duration=None, on_line=None):
+    # duration 을 모르면 입력 헤더의 "Duration:" 줄에서 읽음 (첫 번째 입력 기준)
+    process = (
+        stream_spec
+        .global_args("-nostdin", "-progress", "pipe:2", "-nostats")
+        .run_async(pipe_stderr=True, overwrite_output=True)
+    )
+    tail = deque(maxlen=ERROR_TAIL_LINES)
+    try:
+        for raw_line in process.stderr:
+            line = raw_line.decode("utf-8", "replace").rstrip()
+            if PROGRESS_LINE_PATTERN.match(line):
+                key, _, value = line.partition("=")
+                if key == "out_time_us" and job is not None and duration and value.isdigit():
+                    job.set_progress(int(value) / 1e6 / duration)
+            else:
+                tail.append(line)
+                if duration is None:
+                    duration = parse_duration(line)
+                if on_line is not None:
+                    on_line(line)
+            if job is not None:
+                job.check_cancelled()
+        process.wait()
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+    if process.returncode != 0:
+        raise ffmpeg.Error("ffmpeg", b"", "\n".join(tail).encode("utf-8"))
+    return duration
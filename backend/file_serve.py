@@ -0,0 +1,43 @@
+# C:\wai-ui\backend\file_serve.py
+# 업로드된 자산 파일 내려주기
+# - HTTP Range / If-Range 는 Starlette FileResponse 가 처리 → <video> 가 전체를 받지 않고 원하는 위치로 seek
+# - ETag(내용 해시) / If-None-Match → 304 재검증은 여기서
+# - 파일 읽기는 anyio 스레드 풀 (업로드 쓰기 전용 disk_io 풀과 경쟁하지 않음),
+#   서버가 ASGI "http.response.pathsend" 를 지원하면 전체 전송은 서버가 직접 파일을 보냄
+
+import mimetypes
+import os
+from urllib.parse import quote
+
+from fastapi.responses import FileResponse, Response
+
+READ_CHUNK_SIZE = 256 * 1024
+
+
+class AssetFileResponse(FileResponse):
+    chunk_size = READ_CHUNK_SIZE
+
+
+def etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def file_response(request, path, etag, filename, cache_control="no-cache"):
+    stat_result = os.stat(path)
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Cache-Control": cache_control,
+        "Content-Disposition": f"inline; filename*=UTF-8''{quote(filename)}",
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    # If-Range 가 이 ETag 와 다르면 (클라이언트 사본과 내용이 다르면) FileResponse 가 Range 를 무시하고 전체 전송
+    return AssetFileResponse(path, headers=headers, media_type=media_type, stat_result=stat_result)
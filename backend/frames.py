@@ -0,0 +1,248 @@
+# C:\wai-ui\backend\frames.py
+# 임의 위치 프레임 서버 (스크럽 미리보기: <video> seek 대신 t 초의 프레임을 JPEG 한 장으로)
+# - 자산마다 ffmpeg 디코더 프로세스 하나를 열어 두고 마지막 위치 근처를 유지
+#   → 요청 위치가 조금 앞이면 다시 seek 하지 않고 그대로 읽어 나감, 멀리 뛰거나 뒤로 가면 그 위치에서 새로 시작
+# - 디코더 출력은 fps 필터로 고정 간격(프레임 번호 = round(t * fps))에 맞춤 → 프레임 번호만으로 캐시 / 위치 계산
+# - 최근 프레임은 전체 바이트 수 한도(FRAME_CACHE_BYTES)의 LRU 캐시에 보관
+# - 스크럽 방향으로 미리 디코드(prefetch): 앞으로 가면 이어서, 뒤로 가면 바로 앞 구간을 백그라운드에서
+# - 프록시가 있으면 프록시에서 디코드 (540p, 짧은 GOP → seek 이 빠름)
+
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import ffmpeg
+
+FRAME_CACHE_BYTES = int(os.environ.get("WAI_FRAME_CACHE_MB", "256")) * 1024 * 1024
+MAX_DECODERS = int(os.environ.get("WAI_FRAME_DECODERS", "4"))
+PREFETCH_WORKERS = 2
+DEFAULT_FRAME_WIDTH = 640
+MIN_FRAME_WIDTH = 64
+MAX_FRAME_WIDTH = 1920
+DEFAULT_FPS = 30
+MAX_FPS = 60
+FORWARD_READ_SECONDS = 2.0         # 이 범위 안의 앞쪽 위치는 seek 없이 읽어서 도달
+PREFETCH_SECONDS = 1.0             # 스크럽 방향으로 미리 디코드할 길이
+JPEG_QUALITY = 5                   # ffmpeg -q:v (2 최고 ~ 31 최저)
+READ_CHUNK_SIZE = 64 * 1024
+
+JPEG_END = b"\xff\xd9"
+
+
+class FrameDecoder:
+    # 한 위치에서 시작해 앞으로만 읽는 ffmpeg 디코더 (MJPEG 이미지 스트림을 파이프로 받음)
+    def __init__(self, path, fps, width, start_index):
+        self.path = path
+        self.next_index = start_index
+        self.lock = threading.Lock()
+        self.closed = False
+        self._buffer = b""
+        self._process = (
+            ffmpeg
+            .input(path, ss=f"{start_index / fps:.6f}")
+            .video
+            .filter("fps", fps)
+            .filter("scale", width, -2)
+            .output("pipe:", format="image2pipe", vcodec="mjpeg", **{"q:v": JPEG_QUALITY})
+            .global_args("-nostdin", "-loglevel", "error")
+            .run_async(pipe_stdout=True)
+        )
+
+    def read_frame(self):
+        # 다음 프레임 (번호, JPEG 바이트), 파일 끝이면 None
+        while True:
+            end = self._buffer.find(JPEG_END, 2)
+            if end != -1:
+                frame, self._buffer = self._buffer[:end + 2], self._buffer[end + 2:]
+                index = self.next_index
+                self.next_index += 1
+                return index, frame
+            chunk = self._process.stdout.read1(READ_CHUNK_SIZE)
+            if not chunk:
+                return None
+            self._buffer += chunk
+
+    def close(self):
+        # 다른 스레드가 읽는 중이면 그 프레임까지 기다렸다가 종료
+        with self.lock:
+            self.closed = True
+            if self._process.poll() is None:
+                self._process.kill()
+            self._process.wait()
+            self._process.stdout.close()
+
+
+class FrameCache:
+    # 전체 바이트 수로 크기를 제한하는 LRU
+    def __init__(self, max_bytes=FRAME_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            frame = self._frames.get(key)
+            if frame is not None:
+                self._frames.move_to_end(key)
+            return frame
+
+    def put(self, key, frame):
+        with self._lock:
+            old = self._frames.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._frames[key] = frame
+            self.size += len(frame)
+            while self.size > self.max_bytes and self._frames:
+                _, evicted = self._frames.popitem(last=False)
+                self.size -= len(evicted)
+
+    def stats(self):
+        with self._lock:
+            return {"frames": len(self._frames), "bytes": self.size, "maxBytes": self.max_bytes}
+
+
+def frame_width(width):
+    return max(MIN_FRAME_WIDTH, min(MAX_FRAME_WIDTH, int(width))) // 2 * 2
+
+
+class FrameServer:
+    def __init__(self, max_bytes=FRAME_CACHE_BYTES, max_decoders=MAX_DECODERS):
+        self.cache = FrameCache(max_bytes)
+        self.max_decoders = max_decoders
+        self._decoders = OrderedDict()      # (해시, 폭) → FrameDecoder, 오래 안 쓴 것부터 닫음
+        self._last_index = {}               # (해시, 폭) → 마지막 요청 프레임 (스크럽 방향 판단)
+        self._generation = {}               # (해시, 폭) → 요청 번호, 새 요청이 오면 진행 중인 prefetch 중단
+        self._lock = threading.Lock()
+        self._prefetch = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="wai-frame-prefetch")
+
+    def get_frame(self, sha256, path, t, width=DEFAULT_FRAME_WIDTH, fps=None, duration=None):
+        # 반환: (실제 프레임 시각, JPEG 바이트) - 파일 끝을 넘으면 마지막 프레임
+        fps = min(MAX_FPS, fps or DEFAULT_FPS)
+        width = frame_width(width)
+        index = max(0, round(t * fps))
+        if duration:
+            index = min(index, max(0, int(duration * fps) - 1))
+        stream_key = (sha256, width)
+        with self._lock:
+            previous = self._last_index.get(stream_key)
+            self._last_index[stream_key] = index
+            generation = self._generation.get(stream_key, 0) + 1
+            self._generation[stream_key] = generation
+
+        frame = self.cache.get((sha256, width, index))
+        if frame is None:
+            # 뒤로 스크럽 중이면 요청 위치 바로 앞 구간부터 디코드 → seek 한 번으로 다음 몇 요청까지 캐시에 채움
+            backward = previous is not None and index < previous
+            start = max(0, index - int(PREFETCH_SECONDS * fps)) if backward else index
+            index, frame = self._decode(stream_key, path, fps, index, start)
+        if frame is not None and previous is not None and index != previous:
+            self._prefetch.submit(self._run_prefetch, stream_key, path, fps, index, index > previous, generation)
+        return index / fps, frame
+
+    def _decoder_for(self, stream_key, path, fps, index, start):
+        # 요청 위치에 앞으로 읽어서 닿을 수 있는 디코더를 재사용, 아니면 그 위치에서 새로 시작
+        # 내보낸 디코더의 close() 는 그 디코더를 읽는 중인 스레드를 기다리므로 전역 락 밖에서
+        evicted = []
+        with self._lock:
+            decoder = self._decoders.get(stream_key)
+            reusable = (
+                decoder is not None and decoder.path == path
+                and decoder.next_index <= index <= decoder.next_index + FORWARD_READ_SECONDS * fps
+            )
+            if not reusable:
+                if decoder is not None:
+                    evicted.append(self._decoders.pop(stream_key))
+                decoder = FrameDecoder(path, fps, stream_key[1], start)
+                self._decoders[stream_key] = decoder
+                while len(self._decoders) > self.max_decoders:
+                    evicted.append(self._decoders.popitem(last=False)[1])
+            self._decoders.move_to_end(stream_key)
+        for old in evicted:
+            old.close()
+        return decoder
+
+    def _decode(self, stream_key, path, fps, index, start=None):
+        sha256, width = stream_key
+        decoder = self._decoder_for(stream_key, path, fps, index, index if start is None else start)
+        last = (index, None)
+        with decoder.lock:
+            if decoder.closed:
+                # 기다리는 동안 다른 요청이 디코더를 교체함 → 새 디코더로 다시
+                return self._decode(stream_key, path, fps, index)
+            while True:
+                # prefetch 가 먼저 읽었을 수 있으니 캐시부터 확인
+                frame = self.cache.get((sha256, width, index))
+                if frame is not None:
+                    return index, frame
+                if decoder.next_index > index:
+                    break
+                result = decoder.read_frame()
+                if result is None:
+                    break
+                self.cache.put((sha256, width, result[0]), result[1])
+                last = result
+                if result[0] == index:
+                    return result
+        if last[1] is None and decoder.next_index > index:
+            # 다른 요청이 이 위치를 지나쳐 읽었는데 캐시에서 밀려난 경우 → 그 위치에서 다시 시작
+            with self._lock:
+                stale = self._decoders.get(stream_key) is decoder
+                if stale:
+                    self._decoders.pop(stream_key)
+            if stale:
+                decoder.close()
+            return self._decode(stream_key, path, fps, index)
+        return last
+
+    def _run_prefetch(self, stream_key, path, fps, index, forward, generation):
+        sha256, width = stream_key
+        count = int(PREFETCH_SECONDS * fps)
+        if forward:
+            wanted = range(index + 1, index + 1 + count)
+            decoder = self._decoders.get(stream_key)
+            if decoder is None or decoder.path != path or decoder.next_index != index + 1:
+                return
+        else:
+            # 뒤로 스크럽: 캐시에 없는 바로 앞 구간을 별도 디코더로 한 번에 (공유 디코더 위치는 건드리지 않음)
+            # 구간 길이가 정해져 있으므로 새 요청이 와도 끝까지 채움 (곧 그 구간을 요청할 가능성이 큼)
+            end = index
+            while end > 0 and self.cache.get((sha256, width, end - 1)) is not None and index - end < 2 * count:
+                end -= 1
+            first = max(0, end - count)
+            if first >= end or index - end >= 2 * count:
+                return
+            wanted = range(first, end)
+            decoder = FrameDecoder(path, fps, width, first)
+        try:
+            for wanted_index in wanted:
+                if forward and self._generation.get(stream_key) != generation:
+                    return
+                if forward:
+                    with decoder.lock:
+                        if decoder.closed or decoder.next_index != wanted_index:
+                            return
+                        result = decoder.read_frame()
+                else:
+                    result = decoder.read_frame()
+                if result is None:
+                    return
+                self.cache.put((sha256, width, result[0]), result[1])
+        finally:
+            if not forward:
+                decoder.close()
+
+    def stats(self):
+        with self._lock:
+            decoders = len(self._decoders)
+        return dict(self.cache.stats(), decoders=decoders)
+
+    def close(self):
+        self._prefetch.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            decoders = list(self._decoders.values())
+            self._decoders.clear()
+        for decoder in decoders:
+            decoder.close()
@@ -0,0 +1,267 @@
+# C:\wai-ui\backend\image_gen.py
+# 이미지 생성 (클립박스 generate-image / 전체 IMG)
+# - 클립박스 클립 목록을 한 번에 받아 클립마다 (프롬프트, 스타일, 화면 비율) 이미지 하나씩 → 모든 클립 이미지 슬롯을 한 번에 채움
+# - 엔진별 작업 종류(image:dalle / image:midjourney / image:stable)로 작업 큐에 넣어 엔진마다 동시 호출 수 제한
+# - 같은 (엔진, 프롬프트, 스타일, 비율, 품질) 요청은 작업 key 로 합쳐 생성 중이면 한 번만 호출
+#   결과는 그 해시로 디스크 캐시 (cache/images/ab/<해시>.json → 자산 해시), 생성된 이미지는 일반 자산으로 저장
+# - 외부 엔진 호출은 키 풀(key_pool)이 키를 골라 줌 → 키별 속도 제한 / 할당량 초과 시 다른 키로
+# - fake 엔진: 네트워크 없이 키 해시 색의 PNG 를 만듦 (WAI_IMAGE_FAKE=1 이면 모든 엔진을 fake 로)
+#   register_engine() 으로 다른 엔진(테스트용 등)을 끼워 넣을 수 있음
+
+import base64
+import hashlib
+import json
+import os
+import struct
+import zlib
+
+import requests
+
+from jobs import PRIORITY_NORMAL, JobFailed
+from key_pool import raise_for_key_errors
+from storage import read_result, write_result
+
+IMAGES_DIR_NAME = os.path.join("cache", "images")
+IMAGE_CACHE_VERSION = 1
+IMAGE_CONCURRENCY = {
+    "dalle": int(os.environ.get("WAI_IMAGE_CONCURRENCY_DALLE", "2")),
+    "midjourney": int(os.environ.get("WAI_IMAGE_CONCURRENCY_MIDJOURNEY", "1")),
+    "stable": int(os.environ.get("WAI_IMAGE_CONCURRENCY_STABLE", "2")),
+    "fake": 2,
+}
+USE_FAKE = os.environ.get("WAI_IMAGE_FAKE") == "1"
+IMAGE_MAX_ATTEMPTS = 3             # 429 / 5xx / 네트워크 오류는 작업 큐가 지수 백오프로 재시도
+REQUEST_TIMEOUT = 180
+MAX_PROMPT_LENGTH = 4000
+MAX_BATCH_CLIPS = 500
+
+# 클립박스 ASPECT_RATIOS / IMAGE_STYLES 와 같은 값
+ASPECT_RATIOS = {"9:16": (1080, 1920), "16:9": (1920, 1080), "1:1": (1080, 1080), "4:5": (1080, 1350)}
+STYLE_PROMPTS = {
+    "ghibli": "Studio Ghibli style, hand-drawn animation",
+    "realistic": "photorealistic, natural lighting",
+    "anime": "anime style illustration",
+    "watercolor": "watercolor painting",
+    "cinematic": "cinematic film still, dramatic lighting",
+}
+
+OPENAI_IMAGE_MODEL = os.environ.get("WAI_OPENAI_IMAGE_MODEL", "dall-e-3")
+STABILITY_ENDPOINT = "https://api.stability.ai/v2beta/stable-image/generate/core"
+FAKE_LONG_SIDE = 512
+
+
+class ImageGenError(Exception):
+    pass
+
+
+class ImageRequestError(Exception):
+    # 잘못된 요청 (엔진 / 스타일 / 비율 / 프롬프트 길이) → 400
+    pass
+
+
+def raise_for_status(response, engine):
+    # 429 / 5xx 는 일시적 → 재시도, 나머지 4xx 는 다시 해도 같으므로 실패
+    if response.status_code == 429 or response.status_code >= 500:
+        raise ImageGenError(f"{engine} image HTTP {response.status_code}")
+    if response.status_code >= 400:
+        raise JobFailed(f"{engine} image HTTP {response.status_code}: {response.text[:300]}")
+
+
+def styled_prompt(request):
+    style = STYLE_PROMPTS.get(request["style"])
+    return f"{request['prompt']}, {style}" if style else request["prompt"]
+
+
+class DalleEngine:
+    id = "dalle"
+    service = "openai"             # 키 풀 서비스 id (키가 등록되지 않았으면 env_key 환경 변수 키 사용)
+    env_key = "WAI_OPENAI_API_KEY"
+
+    def generate(self, request, key):
+        w, h = ASPECT_RATIOS[request["aspectRatio"]]
+        size = "1024x1024" if w == h else ("1792x1024" if w > h else "1024x1792")
+        response = requests.post(
+            "https://api.openai.com/v1/images/generations", timeout=REQUEST_TIMEOUT,
+            headers={"Authorization": f"Bearer {key}"},
+            json={
+                "model": OPENAI_IMAGE_MODEL, "prompt": styled_prompt(request), "n": 1, "size": size,
+                "quality": "hd" if request["quality"] == "hd" else "standard", "response_format": "b64_json",
+            },
+        )
+        raise_for_key_errors(response)
+        raise_for_status(response, self.id)
+        return base64.b64decode(response.json()["data"][0]["b64_json"]), ".png"
+
+
+class MidjourneyEngine:
+    id = "midjourney"
+    service = None
+
+    def generate(self, request, key=None):
+        # 공개 API 가 없음 → 설정 화면에서 선택은 가능하지만 서버 생성은 지원하지 않음
+        raise JobFailed("midjourney has no public API; choose dalle or stable")
+
+
+class StableEngine:
+    id = "stable"
+    service = "stability"
+    env_key = "WAI_STABILITY_API_KEY"
+
+    def generate(self, request, key):
+        response = requests.post(
+            STABILITY_ENDPOINT, timeout=REQUEST_TIMEOUT,
+            headers={"Authorization": f"Bearer {key}", "Accept": "image/*"},
+            files={"none": ("", "")},
+            data={"prompt": styled_prompt(request), "aspect_ratio": request["aspectRatio"], "output_format": "png"},
+        )
+        raise_for_key_errors(response)
+        raise_for_status(response, self.id)
+        return response.content, ".png"
+
+
+def png_bytes(width, height, rgb):
+    # 단색 PNG (외부 라이브러리 없이)
+    def chunk(tag, data):
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xffffffff)
+    row = b"\x00" + bytes(rgb) * width
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(row * height))
+        + chunk(b"IEND", b"")
+    )
+
+
+class FakeEngine:
+    # 오프라인 개발 / 테스트용: 요청 비율의 단색 PNG (색은 요청 해시로 정해짐 → 같은 요청이면 같은 이미지)
+    id = "fake"
+    service = None
+
+    def generate(self, request, key=None):
+        w, h = ASPECT_RATIOS[request["aspectRatio"]]
+        scale = FAKE_LONG_SIDE / max(w, h)
+        digest = hashlib.sha256(json.dumps(request, sort_keys=True).encode("utf-8")).digest()
+        return png_bytes(round(w * scale), round(h * scale), digest[:3]), ".png"
+
+
+ENGINES = {}
+
+
+def register_engine(engine, concurrency=None):
+    # 엔진 추가 / 교체 (ImageGenerator 를 만들기 전에 호출해야 작업 종류가 등록됨)
+    # 엔진에 service 가 있으면 키 풀의 키로 generate(request, key) 호출, 없으면 generate(request)
+    ENGINES[engine.id] = engine
+    if concurrency is not None or engine.id not in IMAGE_CONCURRENCY:
+        IMAGE_CONCURRENCY[engine.id] = concurrency or 1
+
+
+for _engine in (DalleEngine(), MidjourneyEngine(), StableEngine(), FakeEngine()):
+    register_engine(_engine)
+
+
+def resolve_request(settings, clip):
+    # 클립박스 전역 이미지 설정(settings.image) + 클립 프롬프트 → 생성 요청
+    parts = ((settings.get("defaultPrefix") or "").strip(), (clip.get("imagePrompt") or "").strip())
+    prompt = " ".join(part for part in parts if part)
+    return {
+        "engine": "fake" if USE_FAKE else settings.get("engine") or "dalle",
+        "prompt": prompt,
+        "style": settings.get("style") or "ghibli",
+        "aspectRatio": settings.get("aspectRatio") or "9:16",
+        "quality": settings.get("quality") or "hd",
+    }
+
+
+def image_key(request):
+    description = dict(request, version=IMAGE_CACHE_VERSION)
+    return hashlib.sha256(json.dumps(description, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class ImageGenerator:
+    def __init__(self, upload_dir, asset_store, key_pool, job_queue):
+        self.images_dir = os.path.join(upload_dir, IMAGES_DIR_NAME)
+        self.asset_store = asset_store
+        self.key_pool = key_pool
+        self.job_queue = job_queue
+        for engine, concurrency in IMAGE_CONCURRENCY.items():
+            job_queue.register(f"image:{engine}", self._run, max_attempts=IMAGE_MAX_ATTEMPTS, concurrency=concurrency)
+
+    def _base_path(self, key):
+        return os.path.join(self.images_dir, key[:2], key)
+
+    def get_result(self, key):
+        # 캐시된 결과 (자산이 지워졌으면 없는 것으로)
+        result = read_result(self._base_path(key))
+        if result is None or not self.asset_store.has_object(result["hash"]):
+            return None
+        return result
+
+    def submit_batch(self, clips, settings):
+        # 반환: 클립 순서대로 {clipId, status: ready | pending | skipped, ...}
+        if len(clips) > MAX_BATCH_CLIPS:
+            raise ImageRequestError(f"at most {MAX_BATCH_CLIPS} clips per request")
+        items = []
+        for clip in clips:
+            if not (clip.get("imagePrompt") or "").strip():
+                items.append((clip, None))
+                continue
+            request = resolve_request(settings, clip)
+            if request["engine"] not in ENGINES:
+                raise ImageRequestError(f"unknown image engine: {request['engine']!r}")
+            if request["aspectRatio"] not in ASPECT_RATIOS:
+                raise ImageRequestError(f"aspectRatio must be one of {', '.join(ASPECT_RATIOS)}")
+            if len(request["prompt"]) > MAX_PROMPT_LENGTH:
+                raise ImageRequestError(f"clip {clip.get('id')}: prompt longer than {MAX_PROMPT_LENGTH} characters")
+            items.append((clip, request))
+
+        results = []
+        for clip, request in items:
+            if request is None:
+                results.append({"clipId": clip.get("id"), "status": "skipped"})
+                continue
+            key = image_key(request)
+            cached = self.get_result(key)
+            if cached is not None:
+                results.append(dict(cached, clipId=clip.get("id"), status="ready"))
+                continue
+            # 같은 요청이 이미 대기 / 생성 중이면 그 작업을 공유 (엔진 호출 한 번)
+            job, _ = self.job_queue.enqueue(
+                f"image:{request['engine']}", {"key": key, "request": request},
+                key=f"image:{key}", priority=PRIORITY_NORMAL,
+            )
+            results.append({"clipId": clip.get("id"), "key": key, "status": "pending", "jobId": job["id"]})
+        return results
+
+    def _run(self, job):
+        key, request = job.payload["key"], job.payload["request"]
+        cached = self.get_result(key)
+        if cached is not None:
+            return cached
+        engine = ENGINES[request["engine"]]
+        try:
+            if engine.service is None:
+                data, ext = engine.generate(request)
+            else:
+                data, ext = self.key_pool.call(
+                    engine.service, lambda key: engine.generate(request, key),
+                    fallback_key=os.environ.get(engine.env_key), job=job,
+                )
+        except requests.RequestException as e:
+            raise ImageGenError(f"{request['engine']} image request failed: {e}")
+        job.check_cancelled()
+
+        writer = self.asset_store.open_writer()
+        try:
+            writer.write(data)
+        except BaseException:
+            writer.abort()
+            raise
+        asset = self.asset_store.commit(writer, f"IMG_{key[:12]}{ext}", request["prompt"][:200])
+        result = {"key": key, "hash": asset["hash"], "assetId": asset["id"], "src": f"/api/objects/{asset['hash']}"}
+
+        write_result(
+            self._base_path(key),
+            dict(result, engine=engine.id, style=request["style"], aspectRatio=request["aspectRatio"]),
+        )
+        print(f"🖼️ 이미지 생성 완료: {engine.id} {request['style']} {request['aspectRatio']} → {asset['name']}")
+        return result
@@ -0,0 +1,484 @@
+# C:\wai-ui\backend\jobs.py
+# 영속 작업 큐 (SQLite, WAL 모드) + 워커 풀
+# - 미디어 분석 / 썸네일 / 파형 / 무음 / 장면 / 프록시 / 내보내기 / TTS / 이미지 생성 등 오래 걸리는 작업을
+#   요청 경로 밖에서 실행
+# - 우선순위(높을수록 먼저), 같은 key 의 대기/실행 중 작업은 하나만 (다시 넣으면 우선순위만 올림)
+# - 종류별 동시 실행 수 제한 (예: 프록시 변환은 1개씩) → 무거운 작업이 가벼운 작업을 막지 않음
+# - 지금 실행할 수 없는 작업(API 키 토큰 대기 등)은 워커를 잡지 않고 정한 시각으로 미룸 (JobDeferred)
+# - 실패 시 지수 백오프로 재시도, 취소(대기 중은 즉시 / 실행 중은 작업이 확인하는 시점에 중단)
+# - 서버가 죽었다 다시 뜨면 실행 중이던 작업을 다시 대기열로 (crash recovery)
+#   시도 횟수를 다 쓴 작업은 failed → 프로세스를 죽이는 작업(ffmpeg OOM 등)이 재시작마다 반복되지 않음
+# - 워커는 스레드: 실제 무거운 일은 ffmpeg 등 외부 프로세스가 하므로 GIL 에 막히지 않음
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from storage import LocalConnection
+
+JOB_WORKERS = int(os.environ.get("WAI_JOB_WORKERS", "4"))
+DEFAULT_MAX_ATTEMPTS = 3
+RETRY_BASE_SECONDS = 2
+RETRY_MAX_SECONDS = 300
+PROGRESS_INTERVAL = 0.25           # 진행률 기록 / 알림 최소 간격(초)
+IDLE_WAIT_SECONDS = 5.0            # 할 일이 없는 워커가 다시 확인하기까지 최대 대기
+STATUS_WRITE_ATTEMPTS = 3          # 작업 상태 기록이 실패(database is locked 등)하면 다시 시도하는 횟수
+STATUS_WRITE_RETRY_SECONDS = 1
+FINISHED_RETENTION_DAYS = 7
+DEFAULT_LIST_LIMIT = 50
+MAX_LIST_LIMIT = 500
+
+PRIORITY_LOW = 0
+PRIORITY_NORMAL = 10
+PRIORITY_HIGH = 20
+
+ACTIVE_STATUSES = ("queued", "running")
+FINISHED_STATUSES = ("done", "failed", "cancelled")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id               TEXT PRIMARY KEY,
+    kind             TEXT NOT NULL,
+    key              TEXT,
+    payload          TEXT NOT NULL,
+    status           TEXT NOT NULL,
+    priority         INTEGER NOT NULL DEFAULT 0,
+    attempts         INTEGER NOT NULL DEFAULT 0,
+    max_attempts     INTEGER NOT NULL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    progress         REAL,
+    result           TEXT,
+    error            TEXT,
+    run_after        INTEGER NOT NULL,
+    created_at       INTEGER NOT NULL,
+    started_at       INTEGER,
+    finished_at      INTEGER,
+    updated_at       INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs (status, priority DESC, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_kind ON jobs (kind, created_at);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_active_key ON jobs (key) WHERE status IN ('queued', 'running');
+"""
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobFailed(Exception):
+    # 다시 해도 같은 결과인 실패 (손상된 파일 등) → 재시도 없이 failed
+    pass
+
+
+class JobDeferred(Exception):
+    # 지금은 실행할 수 없음 (API 키 토큰 대기 등) → 워커를 잡고 기다리지 않고 delay 초 뒤 다시 대기열로
+    # 시도 횟수는 쓰지 않음
+    def __init__(self, delay):
+        super().__init__(f"deferred {delay:.1f}s")
+        self.delay = delay
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def row_to_job(row):
+    return {
+        "id": row["id"],
+        "kind": row["kind"],
+        "key": row["key"],
+        "status": row["status"],
+        "priority": row["priority"],
+        "attempts": row["attempts"],
+        "maxAttempts": row["max_attempts"],
+        "cancelRequested": bool(row["cancel_requested"]),
+        "progress": row["progress"],
+        "result": json.loads(row["result"]) if row["result"] else None,
+        "error": row["error"],
+        "payload": json.loads(row["payload"]),
+        "runAfter": row["run_after"],
+        "createdAt": row["created_at"],
+        "startedAt": row["started_at"],
+        "finishedAt": row["finished_at"],
+    }
+
+
+class Job:
+    # 작업 함수에 넘겨주는 실행 정보 (payload / 진행률 보고 / 취소 확인)
+    def __init__(self, queue, row):
+        self._queue = queue
+        self.id = row["id"]
+        self.kind = row["kind"]
+        self.payload = json.loads(row["payload"])
+        self.attempt = row["attempts"]
+        self._last_progress = 0.0
+
+    @property
+    def cancelled(self):
+        return self._queue.is_cancel_requested(self.id)
+
+    def check_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled()
+
+    def set_progress(self, fraction, force=False):
+        # 너무 자주 기록하지 않도록 PROGRESS_INTERVAL 간격으로만 반영
+        now = time.monotonic()
+        if not force and now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        self._queue.set_progress(self.id, max(0.0, min(1.0, fraction)))
+
+
+class JobQueue:
+    def __init__(self, db_path, workers=JOB_WORKERS):
+        self.db_path = db_path
+        self.workers = workers
+        self._conn = LocalConnection(db_path)
+        self._handlers = {}         # kind → (handler, max_attempts, concurrency)
+        self._running = {}          # kind → 실행 중 개수
+        self._cleanups = {}         # kind → cleanup(job_id), 작업 기록을 지울 때 결과 파일 정리
+        self._cancel_requested = set()
+        self._listeners = []
+        self._wakeup = threading.Condition()
+        self._started = False
+        self._conn().executescript(SCHEMA)
+
+    def add_listener(self, listener):
+        # listener(job) — 상태 / 진행률이 바뀔 때마다 호출 (워커 스레드에서)
+        self._listeners.append(listener)
+
+    def _notify(self, job_id):
+        if not self._listeners:
+            return
+        job = self.get(job_id)
+        for listener in self._listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                print(f"❌ 작업 이벤트 처리 실패 ({job_id}): {e}")
+
+    def register(self, kind, handler, max_attempts=DEFAULT_MAX_ATTEMPTS, concurrency=None, cleanup=None):
+        # handler(job) → 결과(dict, JSON 저장) 또는 None, 예외 발생 시 재시도
+        # cleanup(job_id) → 작업 기록이 지워질 때(보관 기간 만료 / delete) 작업이 남긴 파일 정리
+        self._handlers[kind] = (handler, max_attempts, concurrency)
+        self._running.setdefault(kind, 0)
+        if cleanup is not None:
+            self._cleanups[kind] = cleanup
+
+    def _cleanup(self, kind, job_id):
+        cleanup = self._cleanups.get(kind)
+        if cleanup is None:
+            return
+        try:
+            cleanup(job_id)
+        except Exception as e:
+            print(f"❌ 작업 결과 정리 실패 ({kind} {job_id[:8]}): {e}")
+
+    def start(self):
+        # 서버 시작 시 한 번: 중단된 작업 복구 + 오래된 완료 기록 정리 + 워커 시작
+        if self._started:
+            return
+        self._started = True
+        conn = self._conn()
+        now = now_ms()
+        conn.execute(
+            "UPDATE jobs SET status = 'cancelled', finished_at = ?, updated_at = ?"
+            " WHERE status IN ('queued', 'running') AND cancel_requested = 1",
+            (now, now),
+        )
+        interrupted = conn.execute(
+            "UPDATE jobs SET status = 'failed', error = 'interrupted by server restart', finished_at = ?,"
+            " updated_at = ? WHERE status = 'running' AND attempts >= max_attempts",
+            (now, now),
+        ).rowcount
+        recovered = conn.execute(
+            "UPDATE jobs SET status = 'queued', run_after = ?, updated_at = ? WHERE status = 'running'",
+            (now, now),
+        ).rowcount
+        cutoff = now - FINISHED_RETENTION_DAYS * 24 * 3600 * 1000
+        expired = conn.execute(
+            "SELECT id, kind FROM jobs WHERE status IN ('done', 'failed', 'cancelled') AND finished_at < ?",
+            (cutoff,),
+        ).fetchall()
+        conn.executemany("DELETE FROM jobs WHERE id = ?", [(row["id"],) for row in expired])
+        for row in expired:
+            self._cleanup(row["kind"], row["id"])
+        if recovered:
+            print(f"📋 중단된 작업 복구: {recovered}개")
+        if interrupted:
+            print(f"❌ 중단된 작업 중 시도 횟수를 다 쓴 작업 실패 처리: {interrupted}개")
+        for i in range(self.workers):
+            threading.Thread(target=self._worker, name=f"wai-job-{i}", daemon=True).start()
+
+    def enqueue(self, kind, payload, key=None, priority=PRIORITY_NORMAL, max_attempts=None):
+        # 반환: (작업, 새로 넣었는지) — 같은 key 가 대기/실행 중이면 그 작업을 돌려주고 우선순위만 올림
+        if kind not in self._handlers:
+            raise ValueError(f"unknown job kind: {kind}")
+        conn = self._conn()
+        now = now_ms()
+        created = False
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = None
+            if key is not None:
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE key = ? AND status IN ('queued', 'running')", (key,)
+                ).fetchone()
+            if row is None:
+                job_id = uuid.uuid4().hex
+                conn.execute(
+                    "INSERT INTO jobs (id, kind, key, payload, status, priority, max_attempts,"
+                    " run_after, created_at, updated_at) VALUES (?, ?, ?, ?, 'queued', ?, ?, ?, ?, ?)",
+                    (job_id, kind, key, json.dumps(payload), priority,
+                     max_attempts or self._handlers[kind][1], now, now, now),
+                )
+                created = True
+            else:
+                job_id = row["id"]
+                if priority > row["priority"]:
+                    conn.execute(
+                        "UPDATE jobs SET priority = ?, updated_at = ? WHERE id = ?", (priority, now, job_id)
+                    )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if created:
+            with self._wakeup:
+                self._wakeup.notify()
+            self._notify(job_id)
+        return self.get(job_id), created
+
+    def get(self, job_id):
+        row = self._conn().execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return row_to_job(row) if row else None
+
+    def find_active(self, key):
+        row = self._conn().execute(
+            "SELECT * FROM jobs WHERE key = ? AND status IN ('queued', 'running')", (key,)
+        ).fetchone()
+        return row_to_job(row) if row else None
+
+    def list_jobs(self, status=None, kind=None, limit=DEFAULT_LIST_LIMIT):
+        limit = max(1, min(MAX_LIST_LIMIT, limit))
+        where, params = [], []
+        if status:
+            where.append("status = ?")
+            params.append(status)
+        if kind:
+            where.append("kind = ?")
+            params.append(kind)
+        sql = "SELECT * FROM jobs"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        rows = self._conn().execute(sql + " ORDER BY created_at DESC LIMIT ?", params + [limit])
+        return [row_to_job(r) for r in rows]
+
+    def cancel(self, job_id):
+        # 대기 중 → 바로 취소 / 실행 중 → 취소 요청 (작업이 check_cancelled 에서 중단)
+        conn = self._conn()
+        now = now_ms()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+            if row["status"] == "queued":
+                conn.execute(
+                    "UPDATE jobs SET status = 'cancelled', cancel_requested = 1, finished_at = ?, updated_at = ?"
+                    " WHERE id = ?",
+                    (now, now, job_id),
+                )
+            elif row["status"] == "running":
+                conn.execute("UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ?", (now, job_id))
+                self._cancel_requested.add(job_id)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        self._notify(job_id)
+        return self.get(job_id)
+
+    def delete(self, job_id):
+        # 끝난 작업 기록 삭제 + 결과 파일 정리 → True / 대기·실행 중이면 False / 없으면 None
+        conn = self._conn()
+        row = conn.execute("SELECT kind, status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        deleted = conn.execute(
+            "DELETE FROM jobs WHERE id = ? AND status IN ('done', 'failed', 'cancelled')", (job_id,)
+        ).rowcount
+        if not deleted:
+            return False
+        self._cleanup(row["kind"], job_id)
+        return True
+
+    def is_cancel_requested(self, job_id):
+        return job_id in self._cancel_requested
+
+    def set_progress(self, job_id, fraction):
+        self._conn().execute(
+            "UPDATE jobs SET progress = ?, updated_at = ? WHERE id = ?", (round(fraction, 4), now_ms(), job_id)
+        )
+        self._notify(job_id)
+
+    def _claim(self):
+        # 실행할 작업 하나를 골라 running 으로 전환 (동시 실행 한도에 걸린 종류는 건너뜀)
+        conn = self._conn()
+        now = now_ms()
+        with self._wakeup:
+            kinds = self._claimable_kinds()
+            if not kinds:
+                return None
+            placeholders = ", ".join("?" for _ in kinds)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    f"SELECT * FROM jobs WHERE status = 'queued' AND run_after <= ? AND kind IN ({placeholders})"
+                    " ORDER BY priority DESC, created_at LIMIT 1",
+                    [now] + kinds,
+                ).fetchone()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE jobs SET status = 'running', attempts = attempts + 1, progress = NULL,"
+                        " started_at = ?, updated_at = ? WHERE id = ?",
+                        (now, now, row["id"]),
+                    )
+                    row = conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone()
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            if row is not None:
+                self._running[row["kind"]] += 1
+            return row
+
+    def _claimable_kinds(self):
+        # 동시 실행 한도에 걸리지 않은 종류 (self._wakeup 을 잡은 상태에서 호출)
+        return [
+            kind for kind, (_, _, concurrency) in self._handlers.items()
+            if concurrency is None or self._running[kind] < concurrency
+        ]
+
+    def _next_due_seconds(self):
+        # 지금 가져갈 수 있는 종류의 작업이 재시도 대기 중이면 그 시각까지만 잠듦
+        # 한도에 걸린 종류는 보지 않음 → 실행 중인 작업이 끝날 때의 notify_all 로 깨어남
+        # (대기열이 밀린 종류 때문에 빈 워커가 50ms 마다 깨어나 쓰기 잠금을 다투지 않도록)
+        kinds = self._claimable_kinds()
+        if not kinds:
+            return IDLE_WAIT_SECONDS
+        placeholders = ", ".join("?" for _ in kinds)
+        try:
+            row = self._conn().execute(
+                f"SELECT MIN(run_after) AS due FROM jobs WHERE status = 'queued' AND kind IN ({placeholders})", kinds
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"❌ 대기 작업 조회 실패: {e}")
+            return IDLE_WAIT_SECONDS
+        if row["due"] is None:
+            return IDLE_WAIT_SECONDS
+        return max(0.05, min(IDLE_WAIT_SECONDS, (row["due"] - now_ms()) / 1000))
+
+    def _worker(self):
+        while True:
+            try:
+                row = self._claim()
+            except sqlite3.Error as e:
+                print(f"❌ 작업 가져오기 실패: {e}")
+                row = None
+            if row is None:
+                with self._wakeup:
+                    self._wakeup.wait(self._next_due_seconds())
+                continue
+            try:
+                self._execute(row)
+            except sqlite3.Error as e:
+                # 다시 시도해도 상태 기록 실패 → running 으로 남기지 않고 따로 되돌림 (워커는 계속)
+                print(f"❌ 작업 상태 기록 실패: {row['kind']} {row['id'][:8]} ({e})")
+                self._release(row, e)
+            finally:
+                with self._wakeup:
+                    self._running[row["kind"]] -= 1
+                    # 동시 실행 한도 때문에 기다리던 작업이 있을 수 있음
+                    self._wakeup.notify_all()
+
+    def _execute(self, row):
+        job = Job(self, row)
+        handler = self._handlers[row["kind"]][0]
+        self._notify(job.id)
+        try:
+            job.check_cancelled()
+            result = handler(job)
+        except JobCancelled:
+            self._finish(job.id, "cancelled")
+            print(f"🛑 작업 취소됨: {row['kind']} {job.id[:8]}")
+        except JobFailed as e:
+            self._finish(job.id, "failed", error=str(e))
+        except JobDeferred as e:
+            self._write_status(
+                "UPDATE jobs SET status = 'queued', attempts = attempts - 1, run_after = ?, updated_at = ? WHERE id = ?",
+                (now_ms() + int(e.delay * 1000), now_ms(), job.id),
+            )
+            self._notify(job.id)
+        except Exception as e:
+            if row["attempts"] < row["max_attempts"]:
+                delay = min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2 ** (row["attempts"] - 1))
+                self._write_status(
+                    "UPDATE jobs SET status = 'queued', error = ?, run_after = ?, updated_at = ? WHERE id = ?",
+                    (str(e), now_ms() + int(delay * 1000), now_ms(), job.id),
+                )
+                self._notify(job.id)
+                print(f"🔁 작업 재시도 예정 ({delay}s 후): {row['kind']} {job.id[:8]} ({e})")
+            else:
+                self._finish(job.id, "failed", error=str(e))
+                print(f"❌ 작업 실패: {row['kind']} {job.id[:8]} ({e})")
+        else:
+            self._finish(job.id, "done", result=result)
+        finally:
+            self._cancel_requested.discard(job.id)
+
+    def _write_status(self, sql, params):
+        # 작업 상태 기록: 잠김 등으로 실패하면 잠시 뒤 다시
+        for attempt in range(STATUS_WRITE_ATTEMPTS):
+            try:
+                return self._conn().execute(sql, params)
+            except sqlite3.OperationalError:
+                if attempt == STATUS_WRITE_ATTEMPTS - 1:
+                    raise
+                time.sleep(STATUS_WRITE_RETRY_SECONDS * (attempt + 1))
+
+    def _release(self, row, error):
+        # 결과를 기록하지 못한 작업: 시도 횟수가 남았으면 다시 대기열로, 아니면 실패
+        # running 으로 남으면 같은 key 의 새 요청이 끝나지 않는 작업에 붙으므로
+        now = now_ms()
+        message = f"job status write failed: {error}"
+        try:
+            if row["attempts"] < row["max_attempts"]:
+                self._write_status(
+                    "UPDATE jobs SET status = 'queued', error = ?, run_after = ?, updated_at = ?"
+                    " WHERE id = ? AND status = 'running'",
+                    (message, now + RETRY_BASE_SECONDS * 1000, now, row["id"]),
+                )
+            else:
+                self._write_status(
+                    "UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, updated_at = ?"
+                    " WHERE id = ? AND status = 'running'",
+                    (message, now, now, row["id"]),
+                )
+            self._notify(row["id"])
+        except sqlite3.Error as e:
+            print(f"❌ 작업 되돌리기 실패 (다음 시작 때 복구): {row['kind']} {row['id'][:8]} ({e})")
+
+    def _finish(self, job_id, status, result=None, error=None):
+        now = now_ms()
+        self._write_status(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, updated_at = ?,"
+            " progress = CASE WHEN ? = 'done' THEN 1 ELSE progress END WHERE id = ?",
+            (status, json.dumps(result) if result is not None else None, error, now, now, status, job_id),
+        )
+        self._notify(job_id)
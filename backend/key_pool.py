@@ -0,0 +1,280 @@
+# C:\wai-ui\backend\key_pool.py
+# 외부 API 키 풀 (TTS / 이미지 생성 엔진이 호출할 때마다 서비스별로 키를 골라 줌)
+# - API 관리 화면(ApiManagerModal)과 같은 키 모양: status(active | standby | error) / usage / quota
+#   → uploaded_files/keys.db (SQLite WAL) 에 저장, 사용량은 호출마다 기록해 서버를 다시 켜도 유지 (날짜가 바뀌면 0부터)
+# - 키마다 토큰 버킷(분당 ratePerMinute, 몇 초 분량까지 몰아 쓰기 허용)으로 호출 간격 제한
+#   → 429 를 맞기 전에 서버 쪽에서 기다림, 토큰이 가장 많이 남은 active 키부터 써서 부하를 고르게 나눔
+#   작업 큐에서 호출하면 워커 스레드를 재우지 않고 토큰이 찰 시각으로 작업을 미룸 (JobDeferred)
+# - 429 는 그 키만 Retry-After 동안 쉬게 하고 다른 키로, 할당량 초과는 그 키를 오늘 하루 제외
+#   active 키가 모두 할당량을 다 쓰면 standby 키로 넘어감, 인증 실패 키는 error 로 표시
+# - 서비스에 등록된 키가 없으면 환경 변수 키 하나로 그대로 호출 (기존 설정 호환)
+
+import threading
+import time
+
+from jobs import JobDeferred, JobFailed
+from storage import LocalConnection
+
+BUCKET_BURST_SECONDS = 5           # 버킷 크기 = 이 시간 동안 쓸 수 있는 호출 수 (최소 1)
+DEFAULT_RATE_PER_MINUTE = 60
+DEFAULT_COOLDOWN_SECONDS = 30      # 429 에 Retry-After 가 없을 때 쉬는 시간
+MAX_WAIT_SECONDS = 60              # 작업 밖에서 호출할 때 토큰을 기다리는 최대 시간
+KEY_STATUSES = ("active", "standby", "error")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS api_keys (
+    id              TEXT PRIMARY KEY,
+    service         TEXT NOT NULL,
+    status          TEXT NOT NULL,
+    api_key         TEXT NOT NULL,
+    account_name    TEXT,
+    key_name        TEXT,
+    memo            TEXT,
+    usage           INTEGER NOT NULL DEFAULT 0,
+    usage_day       TEXT,
+    exhausted_day   TEXT,
+    quota           INTEGER NOT NULL DEFAULT 0,
+    rate_per_minute REAL NOT NULL,
+    updated_at      INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_api_keys_service ON api_keys (service);
+"""
+
+
+class KeyPoolExhausted(Exception):
+    # 쓸 수 있는 키가 없음 (모두 할당량 초과 / error) 또는 토큰을 너무 오래 기다림 → 작업 큐가 나중에 재시도
+    pass
+
+
+class KeyRateLimited(Exception):
+    def __init__(self, retry_after=None):
+        super().__init__("rate limited")
+        self.retry_after = retry_after
+
+
+class KeyQuotaExceeded(Exception):
+    pass
+
+
+class KeyRejected(Exception):
+    pass
+
+
+def raise_for_key_errors(response):
+    # 엔진 응답 중 키 때문에 생긴 오류를 키 풀이 처리할 수 있는 예외로 (나머지 상태 코드는 엔진이 처리)
+    if response.status_code not in (401, 403, 429):
+        return
+    if "quota" in response.text.lower():
+        raise KeyQuotaExceeded(response.text[:300])
+    if response.status_code == 429:
+        retry_after = response.headers.get("Retry-After", "")
+        raise KeyRateLimited(float(retry_after) if retry_after.replace(".", "", 1).isdigit() else None)
+    raise KeyRejected(response.text[:300])
+
+
+def today():
+    return time.strftime("%Y-%m-%d")
+
+
+def mask_key(api_key):
+    return f"{api_key[:4]}…{api_key[-4:]}" if len(api_key) > 12 else "…"
+
+
+class TokenBucket:
+    def __init__(self, rate_per_minute):
+        self.configure(rate_per_minute)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.cooldown_until = 0.0
+
+    def configure(self, rate_per_minute):
+        self.rate = rate_per_minute / 60
+        self.capacity = max(1.0, self.rate * BUCKET_BURST_SECONDS)
+
+    def refill(self, now):
+        # now 가 마지막 갱신보다 이를 수 있음 (버킷을 만들기 전에 잰 시각) → 토큰을 줄이지 않음
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, cost, now):
+        # 지금 cost 만큼 쓰려면 기다려야 하는 시간 (쉬는 중이면 그 시간까지)
+        self.refill(now)
+        wait = max(0.0, (cost - self.tokens) / self.rate) if self.tokens < cost else 0.0
+        return max(wait, self.cooldown_until - now)
+
+
+def row_to_key(row):
+    return {
+        "id": row["id"],
+        "service": row["service"],
+        "status": row["status"],
+        "apiKey": row["api_key"],
+        "accountName": row["account_name"] or "",
+        "keyName": row["key_name"] or "",
+        "memo": row["memo"] or "",
+        "usage": row["usage"] if row["usage_day"] == today() else 0,
+        "quota": row["quota"],
+        "exhausted": row["exhausted_day"] == today(),
+        "ratePerMinute": row["rate_per_minute"],
+    }
+
+
+class KeyPool:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = LocalConnection(db_path)
+        self._lock = threading.Lock()
+        self._buckets = {}          # 키 id → TokenBucket (메모리에만, 서버를 다시 켜면 가득 찬 상태로 시작)
+        self._conn().executescript(SCHEMA)
+
+    def list_keys(self, service=None):
+        sql, params = "SELECT * FROM api_keys", []
+        if service:
+            sql, params = sql + " WHERE service = ?", [service]
+        rows = self._conn().execute(sql + " ORDER BY service, id", params).fetchall()
+        now = time.monotonic()
+        keys = []
+        for row in rows:
+            key = row_to_key(row)
+            api_key = key.pop("apiKey")
+            bucket = self._buckets.get(key["id"])
+            key.update(
+                apiKeyPreview=mask_key(api_key),
+                exhausted=key["exhausted"] or bool(key["quota"]) and key["usage"] >= key["quota"],
+                coolingDown=bucket is not None and bucket.cooldown_until > now,
+            )
+            keys.append(key)
+        return keys
+
+    def upsert_key(self, key_id, service, api_key=None, status="active", account_name="", key_name="", memo="",
+                   quota=0, rate_per_minute=DEFAULT_RATE_PER_MINUTE, usage=None):
+        # api_key / usage 가 None 이면 기존 값 유지 (새 키는 api_key 필수)
+        # 기존 키는 편집 칸만 갱신 → 오늘 사용량(usage_day)과 할당량 소진일(exhausted_day)은 그대로
+        conn = self._conn()
+        with self._lock:
+            row = conn.execute("SELECT id FROM api_keys WHERE id = ?", (key_id,)).fetchone()
+            if row is None and not api_key:
+                raise ValueError("apiKey is required for a new key")
+            conn.execute(
+                "INSERT INTO api_keys (id, service, status, api_key, account_name, key_name, memo,"
+                " usage, usage_day, quota, rate_per_minute, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT(id) DO UPDATE SET service = excluded.service, status = excluded.status,"
+                " api_key = COALESCE(?, api_key), account_name = excluded.account_name, key_name = excluded.key_name,"
+                " memo = excluded.memo, quota = excluded.quota, rate_per_minute = excluded.rate_per_minute,"
+                " usage = COALESCE(?, usage), usage_day = CASE WHEN ? IS NULL THEN usage_day ELSE excluded.usage_day END,"
+                " updated_at = excluded.updated_at",
+                (key_id, service, status, api_key or "", account_name, key_name, memo,
+                 usage or 0, today(), quota, rate_per_minute, int(time.time() * 1000),
+                 api_key or None, usage, usage),
+            )
+            bucket = self._buckets.get(key_id)
+            if bucket is not None:
+                bucket.configure(rate_per_minute)
+        return next(k for k in self.list_keys(service) if k["id"] == key_id)
+
+    def delete_key(self, key_id):
+        with self._lock:
+            deleted = self._conn().execute("DELETE FROM api_keys WHERE id = ?", (key_id,)).rowcount
+            self._buckets.pop(key_id, None)
+        return deleted > 0
+
+    def call(self, service, fn, cost=1, fallback_key=None, job=None):
+        # fn(api_key) 를 고른 키로 호출, 키 문제(429 / 할당량 / 인증)면 다른 키로 다시
+        rows = self._conn().execute("SELECT COUNT(*) FROM api_keys WHERE service = ?", (service,)).fetchone()
+        if rows[0] == 0:
+            if not fallback_key:
+                raise JobFailed(f"no API key configured for {service}")
+            return self._call_fallback(service, fn, fallback_key, job)
+        while True:
+            key = self._acquire(service, cost, job)
+            try:
+                return fn(key["apiKey"])
+            except KeyRateLimited as e:
+                print(f"⏳ API 키 속도 제한: {service} {key['id']} ({e.retry_after or DEFAULT_COOLDOWN_SECONDS}s 대기)")
+                with self._lock:
+                    self._buckets[key["id"]].cooldown_until = time.monotonic() + (e.retry_after or DEFAULT_COOLDOWN_SECONDS)
+            except KeyQuotaExceeded:
+                print(f"🔑 API 키 할당량 소진: {service} {key['id']} → 다른 키로")
+                # 서비스가 할당량 초과를 알려 주면 (quota 를 적지 않은 키도) 오늘 하루 제외
+                self._conn().execute("UPDATE api_keys SET exhausted_day = ? WHERE id = ?", (today(), key["id"]))
+            except KeyRejected as e:
+                print(f"❌ API 키 인증 실패: {service} {key['id']} ({e})")
+                self._conn().execute("UPDATE api_keys SET status = 'error' WHERE id = ?", (key["id"],))
+
+    def _call_fallback(self, service, fn, api_key, job):
+        # 환경 변수 키 하나뿐: 인증 실패 / 할당량 초과는 다시 해도 같으므로 실패, 429 는 Retry-After 뒤로 미룸
+        try:
+            return fn(api_key)
+        except (KeyRejected, KeyQuotaExceeded) as e:
+            raise JobFailed(f"{service} API key rejected: {e}")
+        except KeyRateLimited as e:
+            if job is None:
+                raise
+            raise JobDeferred(e.retry_after or DEFAULT_COOLDOWN_SECONDS)
+
+    def _acquire(self, service, cost, job):
+        # active 키 중 토큰이 가장 넉넉한 키, active 가 모두 할당량을 다 썼으면 standby 키
+        # 토큰이 없으면 작업은 그 시각으로 미루고 (워커 반환), 작업 밖 호출만 여기서 기다림
+        deadline = time.monotonic() + MAX_WAIT_SECONDS
+        while True:
+            with self._lock:
+                key, wait = self._pick(service, cost)
+                if key is not None:
+                    self._conn().execute(
+                        "UPDATE api_keys SET usage = CASE WHEN usage_day = ? THEN usage + ? ELSE ? END,"
+                        " usage_day = ? WHERE id = ?",
+                        (today(), cost, cost, today(), key["id"]),
+                    )
+                    return key
+            if wait is None:
+                raise KeyPoolExhausted(f"all {service} API keys are out of quota or disabled")
+            if job is not None:
+                raise JobDeferred(wait)
+            if time.monotonic() + wait > deadline:
+                raise KeyPoolExhausted(f"{service} API keys are rate limited, retry later")
+            time.sleep(wait)
+
+    def _pick(self, service, cost):
+        # 반환: (키, None) 바로 사용 / (None, 대기 시간) 기다리면 사용 가능 / (None, None) 쓸 수 있는 키 없음
+        # active 키가 모두 할당량 초과 / error 이거나 429 로 쉬는 중이면 standby 키
+        rows = self._conn().execute("SELECT * FROM api_keys WHERE service = ?", (service,)).fetchall()
+        keys = [row_to_key(row) for row in rows]
+        now = time.monotonic()
+        shortest = None
+        for status in ("active", "standby"):
+            candidates = [
+                k for k in keys
+                if k["status"] == status and not k["exhausted"]
+                and (not k["quota"] or k["usage"] + cost <= k["quota"])
+            ]
+            if not candidates:
+                continue
+            waits = []
+            for k in candidates:
+                bucket = self._buckets.get(k["id"])
+                if bucket is None:
+                    bucket = self._buckets[k["id"]] = TokenBucket(k["ratePerMinute"])
+                waits.append((bucket.wait_time(cost, now), -bucket.tokens / bucket.capacity,
+                               k["usage"] / k["quota"] if k["quota"] else 0, k["id"], k))
+            wait, _, _, _, key = min(waits)
+            if wait <= 0:
+                self._buckets[key["id"]].tokens -= cost
+                return key, None
+            shortest = wait if shortest is None else min(shortest, wait)
+            # 토큰이 조금 모자란 것뿐이면 기다림, 모두 429 로 쉬는 중이면 standby 키로
+            if any(self._buckets[k["id"]].cooldown_until <= now for k in candidates):
+                break
+        return None, shortest
+
+    def stats(self):
+        # 서비스별 키 수 / 오늘 사용량 합계
+        services = {}
+        for key in self.list_keys():
+            entry = services.setdefault(key["service"], {"active": 0, "standby": 0, "error": 0, "exhausted": 0,
+                                                         "usage": 0, "quota": 0})
+            entry[key["status"]] += 1
+            entry["exhausted"] += key["exhausted"]
+            entry["usage"] += key["usage"]
+            entry["quota"] += key["quota"]
+        return services
@@ -0,0 +1,217 @@
+# C:\wai-ui\backend\loudness.py
+# EBU R128 라우드니스 측정 (통합 라우드니스 LUFS / 트루 피크 dBTP / 라우드니스 범위 LRA)
+# - 자산 하나, 또는 내보내기 결과(오디오 믹스) 하나를 측정 → 납품 기준(-23 LUFS 등) 확인
+# - 일괄 정규화: 타임라인의 모든 sound 클립을 ffmpeg 한 번에 입력으로 넣어 클립마다 ebur128 로 동시에 측정
+#   → 클립마다 ffmpeg 를 따로 돌리지 않음, 측정값으로 목표 라우드니스에 맞는 클립 볼륨(0~200) 계산
+# - 결과는 내용 해시 기준으로 디스크 캐시 (cache/loudness/ab/<해시>/<범위>.json)
+#   자산은 원본 해시, 클립은 원본 해시 + 사용 구간, 내보내기는 오디오 믹스 입력 해시(export.audio_key)
+
+import math
+import os
+import shutil
+
+import ffmpeg
+
+from export import TimelineError, audio_key, number
+from ffmpeg_run import run_ffmpeg
+from jobs import PRIORITY_HIGH, PRIORITY_NORMAL, JobFailed
+from storage import read_result, write_error, write_result
+
+LOUDNESS_WORKERS = int(os.environ.get("WAI_LOUDNESS_WORKERS", "1"))
+LOUDNESS_DIR_NAME = os.path.join("cache", "loudness")
+BATCH_INPUTS = 32                  # ffmpeg 한 번에 여는 클립 수 상한 (파일 핸들 / 메모리)
+DEFAULT_TARGET_LUFS = -23.0        # EBU R128
+DEFAULT_PEAK_LIMIT = -1.0          # dBTP
+SILENT_LUFS = -70.0                # ebur128 은 게이트를 통과한 소리가 없으면 -70 을 보고
+MAX_CLIP_VOLUME = 200
+
+METADATA_KEYS = {"lavfi.r128.I": "integrated", "lavfi.r128.LRA": "lra", "lavfi.r128.true_peak": "truePeak"}
+
+
+def range_name(seek=None, length=None):
+    return "full" if length is None else f"s{seek:.3f}_l{length:.3f}"
+
+
+def read_measurement(metadata_path):
+    # ametadata 가 100ms 마다 쓴 누적값 중 마지막 값 = 전체 측정값
+    values = {}
+    with open(metadata_path, "r", encoding="utf-8") as f:
+        for line in f:
+            key, sep, value = line.strip().partition("=")
+            if sep and key in METADATA_KEYS:
+                values[METADATA_KEYS[key]] = float(value)
+    integrated = values.get("integrated")
+    peak = values.get("truePeak")
+    return {
+        "integrated": round(integrated, 1) if integrated is not None and integrated > SILENT_LUFS else None,
+        "truePeak": round(20 * math.log10(peak), 1) if peak else None,
+        "lra": round(values.get("lra", 0.0), 1),
+    }
+
+
+def measure_loudness(sources, work_dir, job=None, duration=None):
+    # sources: [{"path", "seek", "length"}] (length 가 None 이면 파일 전체) → 같은 순서의 측정값 목록
+    # 입력마다 ebur128 → ametadata(파일 기록) 체인을 두고 출력 여러 개를 ffmpeg 한 번으로 실행
+    outputs = []
+    metadata_paths = []
+    for index, source in enumerate(sources):
+        if source.get("length") is None:
+            stream = ffmpeg.input(source["path"]).audio
+        else:
+            stream = ffmpeg.input(source["path"], ss=f"{source['seek']:.6f}", t=f"{source['length']:.6f}").audio
+        metadata_path = os.path.join(work_dir, f"{index}.txt")
+        metadata_paths.append(metadata_path)
+        outputs.append(
+            stream
+            .filter("ebur128", peak="true", metadata=1)
+            .filter("ametadata", mode="print", file=metadata_path)
+            .output("-", format="null")
+        )
+    if duration is None and all(s.get("length") is not None for s in sources):
+        duration = max(s["length"] for s in sources)
+    run_ffmpeg(ffmpeg.merge_outputs(*outputs), job, duration)
+    return [read_measurement(path) for path in metadata_paths]
+
+
+def normalize_gain(measurement, target, peak_limit):
+    # 목표 라우드니스까지의 이득(dB), 트루 피크가 한도를 넘지 않도록 제한 → 클립 볼륨(100 = 원음)
+    if measurement["integrated"] is None:
+        return None, None, False
+    gain = target - measurement["integrated"]
+    limited = False
+    if measurement["truePeak"] is not None and measurement["truePeak"] + gain > peak_limit:
+        gain = peak_limit - measurement["truePeak"]
+        limited = True
+    volume = 100 * 10 ** (gain / 20)
+    if volume > MAX_CLIP_VOLUME:
+        volume = MAX_CLIP_VOLUME
+        gain = 20 * math.log10(MAX_CLIP_VOLUME / 100)
+        limited = True
+    return round(gain, 1), round(volume), limited
+
+
+class LoudnessAnalyzer:
+    def __init__(self, upload_dir, asset_store, exporter, job_queue, workers=LOUDNESS_WORKERS):
+        self.loudness_dir = os.path.join(upload_dir, LOUDNESS_DIR_NAME)
+        self.asset_store = asset_store
+        self.exporter = exporter
+        self.job_queue = job_queue
+        job_queue.register("loudness", self._run, concurrency=workers)
+        job_queue.register("loudness-batch", self._run_batch, concurrency=workers)
+
+    def _base_path(self, key, name):
+        return os.path.join(self.loudness_dir, key[:2], key, name)
+
+    def get_result(self, key, name="full"):
+        # 완료된 측정값 / 실패 기록 / 없음(None)
+        return read_result(self._base_path(key, name))
+
+    def _save(self, key, name, measurement):
+        base = self._base_path(key, name)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        write_result(base, dict(measurement, status="ready"))
+
+    def submit_asset(self, sha256, duration=None):
+        job, _ = self.job_queue.enqueue(
+            "loudness", {"key": sha256, "path": self.asset_store.object_path(sha256), "duration": duration},
+            key=f"loudness:{sha256}", priority=PRIORITY_NORMAL,
+        )
+        return job
+
+    def export_key(self, export_job):
+        # 내보내기 결과의 오디오는 audio_key 가 같으면 같은 내용 → 다른 내보내기와 측정값 공유
+        return audio_key(export_job["payload"]["plan"])
+
+    def submit_export(self, export_job):
+        key = self.export_key(export_job)
+        job, _ = self.job_queue.enqueue(
+            "loudness",
+            {"key": key, "path": self.exporter.output_path(export_job["id"]),
+             "duration": export_job["payload"]["plan"]["duration"]},
+            key=f"loudness:{key}", priority=PRIORITY_NORMAL,
+        )
+        return job
+
+    def _run(self, job):
+        key = job.payload["key"]
+        work_dir = self._base_path(key, f"{job.id}.parts")
+        os.makedirs(work_dir, exist_ok=True)
+        try:
+            [measurement] = measure_loudness(
+                [{"path": job.payload["path"], "length": None}], work_dir, job, job.payload["duration"],
+            )
+        except ffmpeg.Error as e:
+            message = e.stderr.decode("utf-8", "replace")[-500:]
+            write_error(self._base_path(key, "full"), message)
+            print(f"❌ 라우드니스 측정 실패: {key[:12]}")
+            raise JobFailed(message)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        self._save(key, "full", measurement)
+        print(f"📏 라우드니스 측정 완료: {key[:12]} ({measurement['integrated']} LUFS, {measurement['truePeak']} dBTP)")
+        return measurement
+
+    def clip_ranges(self, clips):
+        # 타임라인의 sound 클립 → 원본에서 재생하는 구간 (원본 해시 + 시작 / 길이)
+        ranges = []
+        for clip in clips:
+            what = f"clip {clip.get('id')}"
+            if clip.get("type") != "sound" or number(clip.get("duration") or 0, f"{what} duration") <= 0:
+                continue
+            source = self.exporter.resolve_source(clip.get("src") or "")
+            if source is None:
+                raise TimelineError(f"clip {clip.get('id')} has no server-side source: {clip.get('src')!r}")
+            sha256, path, _ = source
+            seek = max(0.0, number(clip.get("startOffset") or 0, f"{what} startOffset"))
+            length = number(clip["duration"], f"{what} duration") * number(clip.get("playbackSpeed") or 1, f"{what} playbackSpeed")
+            ranges.append({
+                "id": clip.get("id"), "hash": sha256, "path": path,
+                "seek": seek, "length": length, "name": range_name(seek, length),
+            })
+        return ranges
+
+    def missing_ranges(self, ranges):
+        missing = {}
+        for r in ranges:
+            if self.get_result(r["hash"], r["name"]) is None:
+                missing.setdefault((r["hash"], r["name"]), r)
+        return list(missing.values())
+
+    def normalize(self, ranges, target=DEFAULT_TARGET_LUFS, peak_limit=DEFAULT_PEAK_LIMIT):
+        # 모두 측정되어 있으면 클립별 이득 목록, 아니면 None
+        clips = []
+        for r in ranges:
+            measurement = self.get_result(r["hash"], r["name"])
+            if measurement is None:
+                return None
+            gain, volume, limited = normalize_gain(measurement, target, peak_limit)
+            clips.append({
+                "id": r["id"], "integrated": measurement["integrated"], "truePeak": measurement["truePeak"],
+                "lra": measurement["lra"], "gain": gain, "volume": volume, "limited": limited,
+            })
+        return {"status": "ready", "target": target, "truePeakLimit": peak_limit, "clips": clips}
+
+    def submit_batch(self, ranges, target=DEFAULT_TARGET_LUFS, peak_limit=DEFAULT_PEAK_LIMIT):
+        job, _ = self.job_queue.enqueue(
+            "loudness-batch", {"ranges": ranges, "target": target, "truePeakLimit": peak_limit}, priority=PRIORITY_HIGH,
+        )
+        return job
+
+    def _run_batch(self, job):
+        ranges = job.payload["ranges"]
+        missing = self.missing_ranges(ranges)
+        work_dir = os.path.join(self.loudness_dir, f"{job.id}.parts")
+        os.makedirs(work_dir, exist_ok=True)
+        try:
+            for first in range(0, len(missing), BATCH_INPUTS):
+                batch = missing[first:first + BATCH_INPUTS]
+                for r, measurement in zip(batch, measure_loudness(batch, work_dir, job)):
+                    self._save(r["hash"], r["name"], measurement)
+        except ffmpeg.Error as e:
+            message = e.stderr.decode("utf-8", "replace")[-500:]
+            print(f"❌ 라우드니스 일괄 측정 실패: {job.id}")
+            raise JobFailed(message)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        print(f"📏 라우드니스 일괄 측정 완료: 클립 {len(ranges)}개 중 {len(missing)}개 측정")
+        return self.normalize(ranges, job.payload["target"], job.payload["truePeakLimit"])
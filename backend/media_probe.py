@@ -0,0 +1,119 @@
+# C:\wai-ui\backend\media_probe.py
+# 업로드된 미디어 정보 추출 (ffprobe, ffmpeg-python)
+# - 업로드 직후 작업 큐(jobs.py)에서 실행 → 요청 경로를 막지 않음
+# - 결과는 내용 해시 기준으로 카탈로그(media_info)에 저장 → 같은 내용은 한 번만 분석
+# - 프론트엔드가 숨은 <video> 를 만들어 duration / videoWidth 를 읽던 작업을 대체
+
+import json
+import os
+import subprocess
+
+import ffmpeg
+
+from jobs import PRIORITY_HIGH, JobFailed
+
+PROBE_WORKERS = int(os.environ.get("WAI_PROBE_WORKERS", "2"))
+PROBE_TIMEOUT = 60
+PROBE_TYPES = ("video", "sound", "image")
+
+
+def parse_rate(rate):
+    # "30000/1001" → 29.97
+    try:
+        num, den = (float(x) for x in rate.split("/"))
+        return round(num / den, 3) if den else None
+    except (AttributeError, ValueError):
+        return None
+
+
+def to_number(value, cast=float):
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def run_ffprobe(path, timeout=PROBE_TIMEOUT):
+    # ffmpeg.probe(timeout=...) 는 "-timeout" 옵션으로 넘어가 로컬 파일에서 ffprobe 가 실패함
+    # → 직접 실행하고 시간이 넘으면 프로세스를 종료
+    process = subprocess.Popen(
+        ["ffprobe", "-v", "error", "-show_format", "-show_streams", "-of", "json", path],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+    try:
+        out, err = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        out, err = process.communicate()
+        raise ffmpeg.Error("ffprobe", out, err + f"\nffprobe timed out after {timeout}s".encode("utf-8"))
+    if process.returncode != 0:
+        raise ffmpeg.Error("ffprobe", out, err)
+    return json.loads(out.decode("utf-8"))
+
+
+def probe_media(path):
+    info = run_ffprobe(path)
+    streams = info.get("streams", [])
+    fmt = info.get("format", {})
+    video = next((s for s in streams if s.get("codec_type") == "video"), None)
+    audio = next((s for s in streams if s.get("codec_type") == "audio"), None)
+
+    duration = to_number(fmt.get("duration"))
+    if duration is None:
+        duration = to_number((video or audio or {}).get("duration"))
+
+    return {
+        "codec": video.get("codec_name") if video else None,
+        "width": to_number(video.get("width"), int) if video else None,
+        "height": to_number(video.get("height"), int) if video else None,
+        "fps": parse_rate(video.get("avg_frame_rate")) if video else None,
+        "duration": duration,
+        "audio_codec": audio.get("codec_name") if audio else None,
+        "audio_channels": to_number(audio.get("channels"), int) if audio else None,
+        "sample_rate": to_number(audio.get("sample_rate"), int) if audio else None,
+        "bitrate": to_number(fmt.get("bit_rate"), int),
+    }
+
+
+class MediaProber:
+    def __init__(self, catalog, asset_store, job_queue, workers=PROBE_WORKERS):
+        self.catalog = catalog
+        self.asset_store = asset_store
+        self.job_queue = job_queue
+        # 실패는 media_info 에 기록하므로 재시도하지 않음
+        job_queue.register("probe", self._run, max_attempts=1, concurrency=workers)
+
+    def submit(self, sha256):
+        # 같은 내용을 동시에 여러 번 분석하지 않도록 해시 단위로 중복 제거
+        key = f"probe:{sha256}"
+        if self.job_queue.find_active(key):
+            return False
+        self.catalog.mark_media_pending(sha256)
+        _, created = self.job_queue.enqueue("probe", {"hash": sha256}, key=key, priority=PRIORITY_HIGH)
+        return created
+
+    def on_catalog_event(self, event, asset):
+        if event == "added" and asset["type"] in PROBE_TYPES and not self.catalog.has_media_info(asset["hash"]):
+            self.submit(asset["hash"])
+
+    def resume_pending(self):
+        # 서버 재시작 시 분석이 끝나지 않은 자산을 다시 큐에 넣음
+        hashes = self.catalog.hashes_needing_probe(PROBE_TYPES)
+        for sha256 in hashes:
+            self.submit(sha256)
+        if hashes:
+            print(f"🔎 미디어 분석 재개: {len(hashes)}개")
+
+    def _run(self, job):
+        sha256 = job.payload["hash"]
+        try:
+            info = probe_media(self.asset_store.object_path(sha256))
+            self.catalog.set_media_info(sha256, info)
+            print(f"🔎 미디어 분석 완료: {sha256[:12]} ({info['width']}x{info['height']}, {info['duration']}s)")
+            return info
+        except Exception as e:
+            message = e.stderr.decode("utf-8", "replace")[-500:] if isinstance(e, ffmpeg.Error) else str(e)
+            self.catalog.set_media_error(sha256, message)
+            last_line = (message.strip().splitlines() or [""])[-1]
+            print(f"❌ 미디어 분석 실패: {sha256[:12]} ({last_line})")
+            raise JobFailed(last_line)
@@ -0,0 +1,208 @@
+# C:\wai-ui\backend\mixdown.py
+# 미리보기 재생용 오디오 믹스다운 (모든 트랙의 소리를 스테레오 WAV 한 개로)
+# - 브라우저가 사운드 클립마다 <audio> / <video> 를 따로 디코드하면 클립이 많을 때 무겁고 서로 어긋남
+#   → 서버에서 클립 volume(0~200, 100 = 원음) / isMuted / 숨긴 트랙 / 마스터 볼륨을 반영해 한 스트림으로 믹스
+# - 타임라인을 MIX_CHUNK_SECONDS 길이의 고정 구간(샘플 단위로 정확히 나눔)으로 잘라 구간마다 믹스
+#   → 구간 결과(PCM)는 그 구간에 걸친 클립 조각들의 해시로 캐시 (cache/mixdown/ab/<해시>.pcm)
+#   → 클립 하나를 고치면 그 클립이 걸친 구간만 다시 믹스, 나머지는 캐시 그대로 이어 붙임
+# - 타임라인 리비전 id = 구간 해시 목록의 해시 → uploaded_files/mixdowns/<리비전>.wav (최근 MAX_REVISIONS 개 보관)
+#   구간 캐시는 MIX_CACHE_MAX_BYTES 를 넘으면 가장 오래 쓰지 않은 구간부터 정리
+
+import hashlib
+import json
+import os
+import shutil
+import wave
+
+import ffmpeg
+
+from export import AUDIO_SAMPLE_RATE, SharedSources, prune_cache, render_parallel, tempo_filters, touch
+from jobs import PRIORITY_HIGH, JobFailed
+
+MIXDOWN_WORKERS = int(os.environ.get("WAI_MIXDOWN_WORKERS", "1"))
+MIX_CHUNK_WORKERS = int(os.environ.get("WAI_MIX_CHUNK_WORKERS", str(os.cpu_count() or 1)))
+MIXDOWNS_DIR_NAME = "mixdowns"
+CHUNKS_DIR_NAME = os.path.join("cache", "mixdown")
+MIX_CACHE_VERSION = 1              # 믹스 방식이 바뀌면 올려서 기존 캐시 무효화
+MIX_CHUNK_SECONDS = 5
+MIX_CHANNELS = 2
+SAMPLE_BYTES = 2                   # s16le
+MAX_REVISIONS = 8
+MIX_CACHE_MAX_BYTES = int(float(os.environ.get("WAI_MIX_CACHE_GB", "2")) * 1024 ** 3)
+MAX_MASTER_VOLUME = 200
+COPY_BLOCK_SIZE = 1024 * 1024
+
+
+def chunk_parts(plan, first_sample, end_sample, master_volume):
+    # 구간 [first_sample, end_sample) 에 걸친 클립 조각 (구간 기준 위치로 바꿔서 → 같은 내용이면 같은 해시)
+    c0, c1 = first_sample / AUDIO_SAMPLE_RATE, end_sample / AUDIO_SAMPLE_RATE
+    parts = []
+    for clip in plan["audio"]:
+        a, b = max(clip["start"], c0), min(clip["end"], c1)
+        if b - a <= 1 / AUDIO_SAMPLE_RATE:
+            continue
+        parts.append({
+            "hash": clip["hash"], "path": clip["path"], "speed": clip["speed"],
+            "seek": round(clip["offset"] + (a - clip["start"]) * clip["speed"], 6),
+            "length": round((b - a) * clip["speed"], 6),
+            "volume": clip["volume"] * master_volume / 100,
+            "delay": int(round((a - c0) * AUDIO_SAMPLE_RATE)),
+        })
+    return parts
+
+
+def chunk_key(parts, samples):
+    description = {
+        "version": MIX_CACHE_VERSION, "sampleRate": AUDIO_SAMPLE_RATE, "channels": MIX_CHANNELS,
+        "samples": samples, "parts": [{k: v for k, v in part.items() if k != "path"} for part in parts],
+    }
+    return hashlib.sha256(json.dumps(description, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def part_signature(part):
+    # 같은 조각이 다른 위치에 겹쳐 있어도 입력은 한 번만 열고 asplit 으로 나눔
+    return json.dumps({k: v for k, v in part.items() if k != "delay"}, sort_keys=True)
+
+
+def build_chunk(parts, samples, dest_path):
+    # 조각들을 구간 안 위치로 지연시켜 믹스 → 정확히 samples 개의 스테레오 s16le PCM
+    sources = SharedSources([part_signature(part) for part in parts], "asplit")
+    tracks = []
+    for part in parts:
+        def source(part=part):
+            stream = ffmpeg.input(part["path"], ss=f"{part['seek']:.6f}", t=f"{part['length']:.6f}").audio
+            return (
+                tempo_filters(stream, part["speed"])
+                .filter("aresample", AUDIO_SAMPLE_RATE)
+                .filter("aformat", channel_layouts="stereo")
+                .filter("volume", part["volume"] / 100)
+            )
+        stream = sources.get(part_signature(part), source)
+        tracks.append(stream.filter("adelay", f"{part['delay']}S", all=1))
+    if len(tracks) == 1:
+        mixed = tracks[0]
+    else:
+        mixed = ffmpeg.filter(tracks, "amix", inputs=len(tracks), duration="longest", normalize=0)
+    mixed = mixed.filter("apad", whole_len=samples).filter("atrim", end_sample=samples)
+    return mixed.output(
+        dest_path, format="s16le", acodec="pcm_s16le", ac=MIX_CHANNELS, ar=AUDIO_SAMPLE_RATE,
+    )
+
+
+class AudioMixdown:
+    def __init__(self, upload_dir, exporter, job_queue, workers=MIXDOWN_WORKERS):
+        self.mixdowns_dir = os.path.join(upload_dir, MIXDOWNS_DIR_NAME)
+        self.chunks_dir = os.path.join(upload_dir, CHUNKS_DIR_NAME)
+        self.exporter = exporter
+        self.job_queue = job_queue
+        job_queue.register("mixdown", self._run, max_attempts=1, concurrency=workers)
+
+    def output_path(self, revision):
+        return os.path.join(self.mixdowns_dir, f"{revision}.wav")
+
+    def chunk_path(self, key):
+        return os.path.join(self.chunks_dir, key[:2], key + ".pcm")
+
+    def plan(self, timeline, master_volume=100):
+        # 반환: 리비전 정보 {revision, duration, samples, chunks: [{key, samples, parts} | {key: None, samples}]}
+        # 캔버스 박스는 소리가 없으므로 제외 (박스 미디어가 서버에 없어도 믹스다운은 가능하도록)
+        plan = self.exporter.compile(dict(timeline, canvasBoxes=[]))
+        total = int(round(plan["duration"] * AUDIO_SAMPLE_RATE))
+        step = MIX_CHUNK_SECONDS * AUDIO_SAMPLE_RATE
+        chunks = []
+        for first in range(0, total, step):
+            samples = min(step, total - first)
+            parts = chunk_parts(plan, first, first + samples, master_volume)
+            # 소리가 없는 구간은 ffmpeg 없이 0 으로 채움
+            chunks.append({"key": chunk_key(parts, samples) if parts else None, "samples": samples, "parts": parts})
+        description = {"version": MIX_CACHE_VERSION, "chunks": [[c["key"], c["samples"]] for c in chunks]}
+        revision = hashlib.sha256(json.dumps(description).encode("utf-8")).hexdigest()[:32]
+        return {"revision": revision, "duration": plan["duration"], "samples": total, "chunks": chunks}
+
+    def missing_chunks(self, mix):
+        return [c for c in mix["chunks"] if c["key"] and not os.path.exists(self.chunk_path(c["key"]))]
+
+    def submit(self, mix):
+        # 같은 리비전이 이미 믹스 중이면 그 작업을 그대로 반환 (재생 대기 중이므로 높은 우선순위)
+        job, _ = self.job_queue.enqueue("mixdown", mix, key=f"mixdown:{mix['revision']}", priority=PRIORITY_HIGH)
+        return job
+
+    def touch(self, revision):
+        # 다시 사용한 리비전은 정리 대상에서 뒤로
+        try:
+            os.utime(self.output_path(revision))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _run(self, job):
+        mix = job.payload
+        work_dir = os.path.join(self.mixdowns_dir, f"{job.id}.parts")
+        os.makedirs(work_dir, exist_ok=True)
+        tasks = []
+        for chunk in mix["chunks"]:
+            if chunk["key"] and os.path.exists(self.chunk_path(chunk["key"])):
+                touch(self.chunk_path(chunk["key"]))
+        for chunk in self.missing_chunks(mix):
+            path = self.chunk_path(chunk["key"])
+            if path in (t[2] for t in tasks):
+                continue
+            tmp_path = os.path.join(work_dir, os.path.basename(path))
+            seconds = chunk["samples"] / AUDIO_SAMPLE_RATE
+            tasks.append((build_chunk(chunk["parts"], chunk["samples"], tmp_path), tmp_path, path, seconds, seconds))
+        try:
+            render_parallel(job, tasks, max(1, min(MIX_CHUNK_WORKERS, len(tasks))))
+            tmp_path = os.path.join(work_dir, "output.wav")
+            self._assemble(mix, tmp_path)
+            os.replace(tmp_path, self.output_path(mix["revision"]))
+        except ffmpeg.Error as e:
+            message = e.stderr.decode("utf-8", "replace")[-500:]
+            print(f"❌ 오디오 믹스다운 실패: {mix['revision'][:12]}")
+            raise JobFailed(message)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+        self._prune()
+
+        print(f"🔊 오디오 믹스다운 완료: {mix['revision'][:12]} ({mix['duration']}s, 구간 {len(mix['chunks'])}개 중 {len(tasks)}개 믹스)")
+        return {
+            "revision": mix["revision"],
+            "src": f"/api/mixdowns/{mix['revision']}.wav",
+            "duration": mix["duration"],
+            "chunks": len(mix["chunks"]),
+            "chunksMixed": len(tasks),
+        }
+
+    def _assemble(self, mix, dest_path):
+        # 구간 PCM 을 순서대로 WAV 하나로 (재인코딩 없음, 무음 구간은 0)
+        frame_bytes = MIX_CHANNELS * SAMPLE_BYTES
+        with wave.open(dest_path, "wb") as out:
+            out.setnchannels(MIX_CHANNELS)
+            out.setsampwidth(SAMPLE_BYTES)
+            out.setframerate(AUDIO_SAMPLE_RATE)
+            for chunk in mix["chunks"]:
+                size = chunk["samples"] * frame_bytes
+                if chunk["key"] is None:
+                    while size > 0:
+                        block = min(size, COPY_BLOCK_SIZE)
+                        out.writeframesraw(bytes(block))
+                        size -= block
+                    continue
+                with open(self.chunk_path(chunk["key"]), "rb") as f:
+                    while block := f.read(COPY_BLOCK_SIZE):
+                        out.writeframesraw(block)
+
+    def _prune(self):
+        # 최근에 만들거나 사용한 MAX_REVISIONS 개만 남김 (구간 캐시는 크기 한도까지 → 지운 리비전도 다시 만들 때 빠름)
+        removed = prune_cache(self.chunks_dir, MIX_CACHE_MAX_BYTES)
+        if removed:
+            print(f"🧹 믹스다운 구간 캐시 정리: {removed}개 삭제")
+        try:
+            names = [n for n in os.listdir(self.mixdowns_dir) if n.endswith(".wav")]
+        except FileNotFoundError:
+            return
+        paths = sorted((os.path.join(self.mixdowns_dir, n) for n in names), key=os.path.getmtime, reverse=True)
+        for path in paths[MAX_REVISIONS:]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
@@ -0,0 +1,157 @@
+# C:\wai-ui\backend\peaks.py
+# 오디오 파형 피크 피라미드 (min/max, 다중 해상도)
+# - 자산당 한 번만 디코드 → 가장 촘촘한 단계(PEAK_BLOCK 샘플당 min/max 1쌍)를 만든 뒤 2배씩 묶어 윗단계 생성
+# - 작은 바이너리 파일로 저장 (cache/peaks/ab/<sha256>.wpk, 피크당 2바이트)
+# - 조회 시에는 다시 디코드하지 않고 필요한 단계의 필요한 구간만 읽어서 요청한 막대 개수로 정확히 집계
+# - 프론트엔드 analyzeAudioLevels 의 Math.sin / Math.random 가짜 파형을 대체
+#
+# 파일 구조 (리틀 엔디언)
+#   헤더: magic "WPK1", sample_rate(u32), block(u32), total_samples(u64), level_count(u16)
+#   단계별 피크 개수: u32 × level_count
+#   단계별 데이터: int8 (min, max) 쌍 × 피크 개수, 0단계(가장 촘촘)부터 순서대로
+
+import math
+import os
+import struct
+from array import array
+
+import ffmpeg
+
+from audio_pcm import iter_pcm_blocks
+from jobs import PRIORITY_NORMAL, JobFailed
+from storage import read_json, write_error
+
+PEAK_WORKERS = int(os.environ.get("WAI_PEAK_WORKERS", "1"))
+PEAKS_DIR_NAME = os.path.join("cache", "peaks")
+PEAK_SAMPLE_RATE = 8000
+PEAK_BLOCK = 128                   # 0단계: 8000Hz 에서 128 샘플 = 16ms 당 피크 1쌍
+PEAK_TYPES = ("video", "sound")
+MAX_BARS = 10000
+HEADER = struct.Struct("<4sIIQH")
+MAGIC = b"WPK1"
+
+
+def build_pyramid(src_path, job=None, duration=None):
+    mins = array("b")
+    maxs = array("b")
+    total_samples = 0
+    for block in iter_pcm_blocks(src_path, PEAK_SAMPLE_RATE, PEAK_BLOCK):
+        # 16bit → 8bit (상위 바이트), 파형 표시에는 충분한 해상도
+        mins.append(min(block) >> 8)
+        maxs.append(max(block) >> 8)
+        total_samples += len(block)
+        if job is not None:
+            job.check_cancelled()
+            if duration:
+                job.set_progress(total_samples / PEAK_SAMPLE_RATE / duration)
+
+    levels = [(mins, maxs)]
+    while len(mins) > 1:
+        # 이웃한 두 피크를 합쳐 절반 해상도 단계 생성
+        next_mins = array("b", map(min, mins[0::2], mins[1::2]))
+        next_maxs = array("b", map(max, maxs[0::2], maxs[1::2]))
+        if len(mins) % 2:
+            next_mins.append(mins[-1])
+            next_maxs.append(maxs[-1])
+        mins, maxs = next_mins, next_maxs
+        levels.append((mins, maxs))
+    return total_samples, levels
+
+
+def write_pyramid(path, total_samples, levels):
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, PEAK_SAMPLE_RATE, PEAK_BLOCK, total_samples, len(levels)))
+        f.write(struct.pack(f"<{len(levels)}I", *(len(mins) for mins, _ in levels)))
+        for mins, maxs in levels:
+            interleaved = array("b", bytes(len(mins) * 2))
+            interleaved[0::2] = mins
+            interleaved[1::2] = maxs
+            f.write(interleaved.tobytes())
+
+
+def read_bars(path, bars, start=0.0, duration=None):
+    # [start, start + duration) 구간(원본 기준 초)을 정확히 bars 개의 (min, max) 로 집계
+    # 반환: (실제 시작, 실제 끝, mins, maxs) - 구간은 파일 길이 안으로 잘림
+    with open(path, "rb") as f:
+        magic, sample_rate, block, total_samples, level_count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC:
+            raise ValueError("invalid peak file")
+        counts = struct.unpack(f"<{level_count}I", f.read(4 * level_count))
+        data_offset = HEADER.size + 4 * level_count
+
+        total_duration = total_samples / sample_rate
+        start = max(0.0, min(start, total_duration))
+        end = total_duration if duration is None else max(start, min(total_duration, start + duration))
+        if end <= start or not counts[0]:
+            return start, end, [0.0] * bars, [0.0] * bars
+
+        # 구간 안에 피크가 bars 개 이상 남는 가장 성긴 단계 선택 → 읽는 양 최소화
+        level = 0
+        for k in range(level_count - 1, -1, -1):
+            if (end - start) * sample_rate / (block << k) >= bars:
+                level = k
+                break
+        peaks_per_second = sample_rate / (block << level)
+        first = min(counts[level] - 1, int(start * peaks_per_second))
+        last = max(first + 1, min(counts[level], math.ceil(end * peaks_per_second)))
+
+        f.seek(data_offset + 2 * (sum(counts[:level]) + first))
+        interleaved = array("b")
+        interleaved.frombytes(f.read(2 * (last - first)))
+
+    mins, maxs = interleaved[0::2], interleaved[1::2]
+    n = len(mins)
+    bar_mins, bar_maxs = [], []
+    for i in range(bars):
+        a = i * n // bars
+        b = max(a + 1, (i + 1) * n // bars)
+        bar_mins.append(round(min(mins[a:b]) / 128, 3))
+        bar_maxs.append(round(max(maxs[a:b]) / 128, 3))
+    return start, end, bar_mins, bar_maxs
+
+
+class PeakAnalyzer:
+    def __init__(self, upload_dir, asset_store, job_queue, workers=PEAK_WORKERS):
+        self.peaks_dir = os.path.join(upload_dir, PEAKS_DIR_NAME)
+        self.asset_store = asset_store
+        self.job_queue = job_queue
+        job_queue.register("peaks", self._run, concurrency=workers)
+
+    def _base_path(self, sha256):
+        return os.path.join(self.peaks_dir, sha256[:2], sha256)
+
+    def peak_path(self, sha256):
+        return self._base_path(sha256) + ".wpk"
+
+    def get_error(self, sha256):
+        error = read_json(self._base_path(sha256) + ".error")
+        return error["error"] if error else None
+
+    def submit(self, sha256, duration=None, priority=PRIORITY_NORMAL):
+        job, _ = self.job_queue.enqueue(
+            "peaks", {"hash": sha256, "duration": duration}, key=f"peaks:{sha256}", priority=priority,
+        )
+        return job
+
+    def on_catalog_event(self, event, asset):
+        # 업로드 직후 미리 분석 → 타임라인에 올릴 때는 이미 준비되어 있음
+        if event == "added" and asset["type"] in PEAK_TYPES and not os.path.exists(self.peak_path(asset["hash"])):
+            self.submit(asset["hash"])
+
+    def _run(self, job):
+        sha256 = job.payload["hash"]
+        base = self._base_path(sha256)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        try:
+            total_samples, levels = build_pyramid(self.asset_store.object_path(sha256), job, job.payload["duration"])
+        except ffmpeg.Error as e:
+            message = e.stderr.decode("utf-8", "replace")[-500:]
+            write_error(base, message)
+            print(f"❌ 파형 분석 실패: {sha256[:12]}")
+            raise JobFailed(message)
+
+        tmp_path = base + ".wpk.tmp"
+        write_pyramid(tmp_path, total_samples, levels)
+        os.replace(tmp_path, base + ".wpk")
+        print(f"🎵 파형 분석 완료: {sha256[:12]} ({total_samples / PEAK_SAMPLE_RATE:.1f}s, {len(levels)}단계)")
+        return {"duration": round(total_samples / PEAK_SAMPLE_RATE, 3), "levels": len(levels)}
@@ -0,0 +1,219 @@
+# C:\wai-ui\backend\preview_stream.py
+# 서버 합성 타임라인 미리보기 (HLS: index.m3u8 + 짧은 MPEG-TS 구간)
+# - 내보내기(export.py)와 같은 렌더링 계획 / 필터 그래프를 미리보기 해상도(PREVIEW_HEIGHT)로 줄여서 사용
+#   → DOM 에서 트랙 / 캔버스 박스를 겹쳐 그리던 합성을 서버에서 한 장의 영상으로
+# - 구간은 PREVIEW_SEGMENT_SECONDS 길이, 내용 해시로 캐시 (cache/segments, 내보내기 구간과 같은 저장소)
+#   → 타임라인을 고쳐도 바뀐 구간만 다시 렌더링
+# - 플레이어가 요청한 구간은 요청 스레드에서 바로 렌더링, 그 뒤 LOOKAHEAD_SEGMENTS 개를 백그라운드에서 미리 렌더링
+# - 재생 위치가 다른 곳으로 뛰면 새 위치 창 밖의 미리 렌더링은 ffmpeg 를 종료해서 취소
+# - 오디오는 포함하지 않음 (여러 트랙 오디오는 믹스다운 스트림으로 따로 재생)
+
+import hashlib
+import json
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import ffmpeg
+
+from export import DEFAULT_FPS, build_segment, even, segment_key, segment_layers, split_segments, touch
+from ffmpeg_run import run_ffmpeg
+from jobs import JobCancelled
+
+PREVIEW_WORKERS = int(os.environ.get("WAI_PREVIEW_WORKERS", "2"))
+PREVIEW_SEGMENT_SECONDS = 2
+PREVIEW_HEIGHT = 360
+MAX_PREVIEW_HEIGHT = 720
+LOOKAHEAD_SEGMENTS = 3
+MAX_SESSIONS = 16
+PREVIEW_ENCODER = {"vcodec": "libx264", "preset": "ultrafast", "crf": 28, "pix_fmt": "yuv420p"}
+
+# 기본 mimetypes 에서 .ts 는 다른 형식으로 잡히는 환경이 있음
+mimetypes.add_type("video/mp2t", ".ts")
+
+
+class PreviewRenderError(Exception):
+    pass
+
+
+def scale_plan(plan, height):
+    # 캔버스 좌표로 된 렌더링 계획을 미리보기 해상도로 축소
+    factor = height / plan["height"]
+    if factor >= 1:
+        return plan
+    layers = []
+    for layer in plan["layers"]:
+        scaled = dict(
+            layer,
+            x=int(round(layer["x"] * factor)), y=int(round(layer["y"] * factor)),
+            w=even(layer["w"] * factor), h=even(layer["h"] * factor),
+        )
+        if layer["text"]:
+            text = dict(layer["text"])
+            for field in ("fontSize", "strokeWidth"):
+                if text.get(field):
+                    text[field] = max(1, round(text[field] * factor))
+            if text.get("shadow"):
+                text["shadow"] = {k: (v * factor if k in ("offsetX", "offsetY") and v else v) for k, v in text["shadow"].items()}
+            scaled["text"] = text
+        layers.append(scaled)
+    return dict(plan, width=even(plan["width"] * factor), height=even(height), layers=layers)
+
+
+class SegmentToken:
+    # run_ffmpeg 에 job 대신 넘기는 취소 확인 (재생 위치가 이 구간을 벗어나면 중단)
+    def __init__(self, session, index):
+        self.session = session
+        self.index = index
+
+    def set_progress(self, fraction, force=False):
+        pass
+
+    def check_cancelled(self):
+        if not self.session.in_window(self.index):
+            raise JobCancelled()
+
+
+class PreviewSession:
+    def __init__(self, session_id, plan):
+        self.id = session_id
+        self.plan = plan
+        self.segments = split_segments(plan, PREVIEW_SEGMENT_SECONDS)
+        self.playhead = 0
+        self._keys = {}
+
+    def in_window(self, index):
+        return self.playhead <= index <= self.playhead + LOOKAHEAD_SEGMENTS
+
+    def segment_options(self, index):
+        # 구간마다 시작 시각을 타임스탬프로 넣어 이어 재생 시 끊김 없도록 (HLS 는 연속 타임스탬프를 기대)
+        first, _ = self.segments[index]
+        return {
+            "format": "mpegts", "output_ts_offset": f"{first / self.plan['fps']:.6f}",
+            "muxdelay": 0, "muxpreload": 0,
+        }
+
+    def key(self, index):
+        if index not in self._keys:
+            first, end = self.segments[index]
+            layers = segment_layers(self.plan, first, end)
+            self._keys[index] = segment_key(self.plan, layers, end - first, PREVIEW_ENCODER, self.segment_options(index))
+        return self._keys[index]
+
+
+class PreviewStreamer:
+    def __init__(self, exporter, workers=PREVIEW_WORKERS):
+        self.exporter = exporter
+        self._sessions = OrderedDict()
+        self._inflight = {}             # 구간 파일 경로 → Future (같은 구간을 동시에 두 번 렌더링하지 않음)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wai-preview")
+
+    def create(self, timeline, fps=DEFAULT_FPS, height=PREVIEW_HEIGHT):
+        # 같은 타임라인 + 해상도면 같은 세션 id (플레이어가 다시 열어도 캐시 그대로)
+        plan = scale_plan(self.exporter.compile(timeline, fps), min(height, MAX_PREVIEW_HEIGHT))
+        session_id = hashlib.sha256(json.dumps(plan, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = PreviewSession(session_id, plan)
+                self._sessions[session_id] = session
+                while len(self._sessions) > MAX_SESSIONS:
+                    self._sessions.popitem(last=False)
+            self._sessions.move_to_end(session_id)
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            return self._sessions.get(session_id)
+
+    def playlist(self, session):
+        fps = session.plan["fps"]
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            "#EXT-X-PLAYLIST-TYPE:VOD",
+            f"#EXT-X-TARGETDURATION:{PREVIEW_SEGMENT_SECONDS}",
+            "#EXT-X-MEDIA-SEQUENCE:0",
+        ]
+        for index, (first, end) in enumerate(session.segments):
+            lines.append(f"#EXTINF:{(end - first) / fps:.6f},")
+            lines.append(f"{index}.ts")
+        lines.append("#EXT-X-ENDLIST")
+        return "\n".join(lines) + "\n"
+
+    def seek(self, session, t):
+        # 재생 위치 이동: 창 밖의 미리 렌더링은 취소되고, 새 위치부터 미리 렌더링 시작
+        index = min(len(session.segments) - 1, max(0, int(t / PREVIEW_SEGMENT_SECONDS)))
+        session.playhead = index
+        self._schedule(session, range(index, index + 1 + LOOKAHEAD_SEGMENTS))
+        return index
+
+    def segment_path(self, session, index):
+        # 플레이어가 요청한 구간: 캐시 → 렌더링 중이면 대기 → 없으면 이 스레드에서 렌더링
+        session.playhead = index
+        self._schedule(session, range(index + 1, index + 1 + LOOKAHEAD_SEGMENTS))
+        path = self.exporter.segment_path(session.key(index), ".ts")
+        while not os.path.exists(path):
+            with self._lock:
+                future = self._inflight.get(path)
+                owner = future is None
+                if owner:
+                    future = Future()
+                    self._inflight[path] = future
+            if owner:
+                self._render(session, index, path, future, token=None)
+            try:
+                future.result()
+            except JobCancelled:
+                continue
+        touch(path)
+        return path
+
+    def _schedule(self, session, indexes):
+        for index in indexes:
+            if index >= len(session.segments):
+                break
+            path = self.exporter.segment_path(session.key(index), ".ts")
+            if os.path.exists(path):
+                continue
+            with self._lock:
+                if path in self._inflight:
+                    continue
+                future = Future()
+                self._inflight[path] = future
+            self._pool.submit(self._render, session, index, path, future, SegmentToken(session, index))
+
+    def _render(self, session, index, path, future, token):
+        try:
+            if token is not None:
+                token.check_cancelled()     # 큐에서 기다리는 사이 재생 위치가 바뀌었으면 시작하지 않음
+            first, end = session.segments[index]
+            layers = segment_layers(session.plan, first, end)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            spec = build_segment(
+                session.plan, layers, end - first, tmp_path, 1, PREVIEW_ENCODER, session.segment_options(index),
+            )
+            try:
+                run_ffmpeg(spec, token, (end - first) / session.plan["fps"])
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        except ffmpeg.Error as e:
+            print(f"❌ 미리보기 구간 렌더링 실패: {session.id[:12]} #{index}")
+            future.set_exception(PreviewRenderError(e.stderr.decode("utf-8", "replace")[-500:]))
+        except BaseException as e:
+            future.set_exception(e)
+        else:
+            future.set_result(path)
+            self.exporter.prune_segments()
+        finally:
+            with self._lock:
+                self._inflight.pop(path, None)
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
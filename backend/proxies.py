@@ -0,0 +1,155 @@
+# C:\wai-ui\backend\proxies.py
+# 편집용 프록시 미디어 (4K / HEVC 원본을 미리보기에서 끊김 없이 재생)
+# - 미디어 분석이 끝난 영상 중 높이가 PROXY_HEIGHT 보다 크거나 디코드가 무거운 코덱이면 프록시 생성
+# - H.264 540p, 짧은 GOP(PROXY_GOP 프레임) + fastdecode → seek / 스크럽 시 디코드할 프레임이 적음
+# - 작업 큐(jobs.py)에서 ffmpeg 프로세스로 변환 (동시 1개), 타임라인에 올라간 클립은 우선순위를 올려 먼저 처리
+# - 결과는 내용 해시 기준으로 디스크 캐시 (cache/proxies/ab/<sha256>.mp4)
+# - 완료되면 카탈로그 변경 알림 → 자산의 previewSrc 가 /api/preview/<sha256>(원본) 에서 /api/proxies/<sha256> 로 바뀜
+
+import os
+
+import ffmpeg
+
+from catalog import original_preview_src
+from ffmpeg_run import run_ffmpeg
+from jobs import PRIORITY_LOW, PRIORITY_NORMAL, JobCancelled, JobFailed
+from storage import write_error
+
+PROXY_WORKERS = int(os.environ.get("WAI_PROXY_WORKERS", "1"))
+PROXIES_DIR_NAME = os.path.join("cache", "proxies")
+PROXY_HEIGHT = 540
+PROXY_GOP = 12
+PROXY_CRF = 26
+HEAVY_CODECS = ("hevc", "av1", "vp9", "prores", "dnxhd", "mpeg2video")
+PRIORITY_INGEST = PRIORITY_LOW
+PRIORITY_TIMELINE = PRIORITY_NORMAL
+
+
+def needs_proxy(media):
+    if media.get("status") != "ready" or not media.get("height"):
+        return False
+    return media["height"] > PROXY_HEIGHT or media.get("codec") in HEAVY_CODECS
+
+
+def transcode_proxy(src_path, dest_path, height, has_audio, job=None, duration=None):
+    stream = ffmpeg.input(src_path)
+    target_height = min(PROXY_HEIGHT, height) // 2 * 2
+    video = stream.video.filter("scale", -2, target_height)
+    streams = [video, stream.audio] if has_audio else [video]
+    output = ffmpeg.output(
+        *streams, dest_path,
+        format="mp4", vcodec="libx264", preset="veryfast", tune="fastdecode", crf=PROXY_CRF,
+        g=PROXY_GOP, pix_fmt="yuv420p", movflags="+faststart",
+        **({"acodec": "aac", "audio_bitrate": "128k"} if has_audio else {}),
+    )
+    run_ffmpeg(output, job, duration)
+
+
+class ProxyTranscoder:
+    def __init__(self, upload_dir, catalog, asset_store, job_queue, workers=PROXY_WORKERS):
+        self.proxies_dir = os.path.join(upload_dir, PROXIES_DIR_NAME)
+        self.catalog = catalog
+        self.asset_store = asset_store
+        self.job_queue = job_queue
+        job_queue.register("proxy", self._run, concurrency=workers)
+        self._timeline_hashes = set()   # 분석 전에 타임라인 우선순위를 요청받은 해시
+        catalog.set_preview_resolver(self.preview_src)
+
+    def _base_path(self, sha256):
+        return os.path.join(self.proxies_dir, sha256[:2], sha256)
+
+    def proxy_path(self, sha256):
+        return self._base_path(sha256) + ".mp4"
+
+    def preview_src(self, sha256):
+        return f"/api/proxies/{sha256}" if os.path.exists(self.proxy_path(sha256)) else original_preview_src(sha256)
+
+    def status(self, sha256):
+        if os.path.exists(self.proxy_path(sha256)):
+            return "ready"
+        if self.job_queue.find_active(f"proxy:{sha256}"):
+            return "pending"
+        if os.path.exists(self._base_path(sha256) + ".error"):
+            return "error"
+        return "none"
+
+    def asset_status(self, entry):
+        # 자산(get_with_media 결과) 기준 상태: 분석 전이면 pending, 프록시가 필요 없으면 not_needed
+        media = entry["media"]
+        if media["status"] in ("none", "pending"):
+            return "pending"
+        if not needs_proxy(media):
+            return "not_needed"
+        return self.status(entry["hash"])
+
+    def submit(self, sha256, media, priority=PRIORITY_INGEST):
+        payload = {
+            "hash": sha256,
+            "height": media["height"],
+            "hasAudio": bool(media.get("audio_codec")),
+            "duration": media.get("duration"),
+        }
+        job, _ = self.job_queue.enqueue("proxy", payload, key=f"proxy:{sha256}", priority=priority)
+        return job
+
+    def on_catalog_event(self, event, asset):
+        # 미디어 분석이 끝나면(updated) 해상도 / 코덱을 보고 프록시 필요 여부 판단
+        if event != "updated" or asset["type"] != "video":
+            return
+        entry = self.catalog.get_with_media([asset["id"]]).get(asset["id"])
+        if entry and needs_proxy(entry["media"]) and self.status(asset["hash"]) == "none":
+            priority = PRIORITY_TIMELINE if asset["hash"] in self._timeline_hashes else PRIORITY_INGEST
+            self.submit(asset["hash"], entry["media"], priority=priority)
+
+    def prioritize(self, asset_ids):
+        # 타임라인에 올라간 클립의 자산 → 대기 중이면 앞으로, 아직 안 넣었으면 높은 우선순위로 추가
+        statuses = {}
+        for asset_id, entry in self.catalog.get_with_media(asset_ids).items():
+            if entry["type"] != "video":
+                continue
+            sha256 = entry["hash"]
+            if entry["media"]["status"] in ("none", "pending"):
+                # 미디어 분석이 끝나면 on_catalog_event 에서 높은 우선순위로 추가
+                self._timeline_hashes.add(sha256)
+            elif needs_proxy(entry["media"]) and self.status(sha256) in ("none", "pending"):
+                self.submit(sha256, entry["media"], priority=PRIORITY_TIMELINE)
+            statuses[asset_id] = self.asset_status(entry)
+        return statuses
+
+    def resume_pending(self):
+        # 서버 재시작 시 프록시가 없는 영상을 다시 큐에 넣음
+        count = 0
+        for sha256, media in self.catalog.media_by_type("video").items():
+            if needs_proxy(media) and self.status(sha256) == "none":
+                self.submit(sha256, media)
+                count += 1
+        if count:
+            print(f"📼 프록시 변환 재개: {count}개")
+
+    def _run(self, job):
+        sha256 = job.payload["hash"]
+        base = self._base_path(sha256)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        tmp_path = base + ".tmp.mp4"
+        try:
+            transcode_proxy(
+                self.asset_store.object_path(sha256), tmp_path,
+                job.payload["height"], job.payload["hasAudio"], job, job.payload["duration"],
+            )
+        except ffmpeg.Error as e:
+            message = e.stderr.decode("utf-8", "replace")[-500:]
+            write_error(base, message)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            print(f"❌ 프록시 변환 실패: {sha256[:12]}")
+            raise JobFailed(message)
+        except JobCancelled:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        os.replace(tmp_path, base + ".mp4")
+        self._timeline_hashes.discard(sha256)
+        print(f"📼 프록시 변환 완료: {sha256[:12]} ({os.path.getsize(base + '.mp4') // 1024} KB)")
+        self.catalog.notify_hash(sha256)
+        return {"size": os.path.getsize(base + ".mp4")}
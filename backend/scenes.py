@@ -0,0 +1,124 @@
+# C:\wai-ui\backend\scenes.py
+# 장면 전환(컷) 감지 → 긴 원본 영상을 샷 단위 클립으로 자동 분할
+# - ffmpeg select 필터의 scene 점수를 축소 프레임(160px)에서 계산 → 해상도와 무관하게 가벼움
+# - 한 번 분석할 때 낮은 기준(CANDIDATE_SCORE) 이상인 후보를 점수와 함께 모두 저장
+#   → 민감도(threshold) / 최소 샷 길이를 바꿔도 다시 디코드하지 않음
+# - 결과는 내용 해시 기준으로 디스크 캐시 (cache/scenes/ab/<sha256>.json)
+
+import os
+import re
+
+import ffmpeg
+
+from ffmpeg_run import run_ffmpeg
+from jobs import PRIORITY_NORMAL, JobFailed
+from storage import read_result, write_error, write_result
+
+SCENE_WORKERS = int(os.environ.get("WAI_SCENE_WORKERS", "1"))
+SCENES_DIR_NAME = os.path.join("cache", "scenes")
+ANALYSIS_WIDTH = 160
+CANDIDATE_SCORE = 0.1
+DEFAULT_THRESHOLD = 0.3
+DEFAULT_MIN_SHOT = 1.0
+
+PTS_TIME_PATTERN = re.compile(r"pts_time:(\d+(?:\.\d+)?)")
+SCORE_PATTERN = re.compile(r"lavfi\.scene_score=(\d+(?:\.\d+)?)")
+
+
+def detect_scene_candidates(src_path, job=None, duration=None):
+    # 반환: (전체 길이, [{"time", "score"}, ...]) - ffmpeg 로그를 줄 단위로 읽으므로 메모리 사용량 일정
+    stream = (
+        ffmpeg
+        .input(src_path)
+        .video
+        .filter("scale", ANALYSIS_WIDTH, -2)
+        .filter("select", f"gt(scene,{CANDIDATE_SCORE})")
+        .filter("metadata", mode="print", key="lavfi.scene_score")
+        .output("-", format="null")
+        .global_args("-hide_banner")
+    )
+    candidates = []
+    pending = {}
+
+    def on_line(line):
+        if match := PTS_TIME_PATTERN.search(line):
+            pending["time"] = float(match.group(1))
+        elif (match := SCORE_PATTERN.search(line)) and "time" in pending:
+            candidates.append({"time": round(pending.pop("time"), 3), "score": round(float(match.group(1)), 4)})
+
+    duration = run_ffmpeg(stream, job, duration, on_line)
+    return duration, candidates
+
+
+def select_cuts(candidates, duration, threshold=DEFAULT_THRESHOLD, min_shot=DEFAULT_MIN_SHOT):
+    # 기준 이상인 후보 중 앞 컷 / 영상 끝과 min_shot 이상 떨어진 것만 채택
+    cuts = []
+    previous = 0.0
+    for candidate in candidates:
+        t = candidate["time"]
+        if candidate["score"] < threshold or t - previous < min_shot:
+            continue
+        if duration is not None and duration - t < min_shot:
+            break
+        cuts.append(t)
+        previous = t
+    return cuts
+
+
+def cuts_to_clips(cuts, duration, asset, insert_at=0.0):
+    # app-root.js 가 자산을 타임라인에 놓을 때 만드는 클립 모양 ({name, start, duration, type, src, volume})
+    # + 원본 안의 위치(startOffset), 샷끼리 빈틈 없이 insert_at 부터 이어 붙임
+    base_name = os.path.splitext(asset["name"])[0]
+    bounds = [0.0] + cuts + [duration]
+    clips = []
+    for i, (shot_start, shot_end) in enumerate(zip(bounds, bounds[1:])):
+        clips.append({
+            "name": f"{base_name} #{i + 1}",
+            "start": round(insert_at + shot_start, 3),
+            "duration": round(shot_end - shot_start, 3),
+            "type": asset["type"],
+            "src": asset["src"],
+            "volume": 100,
+            "startOffset": round(shot_start, 3),
+            "sourceDuration": duration,
+        })
+    return clips
+
+
+class SceneDetector:
+    def __init__(self, upload_dir, asset_store, job_queue, workers=SCENE_WORKERS):
+        self.scenes_dir = os.path.join(upload_dir, SCENES_DIR_NAME)
+        self.asset_store = asset_store
+        self.job_queue = job_queue
+        job_queue.register("scenes", self._run, concurrency=workers)
+
+    def _base_path(self, sha256):
+        return os.path.join(self.scenes_dir, sha256[:2], sha256)
+
+    def get_result(self, sha256):
+        # 완료된 후보 목록 / 실패 기록 / 없음(None)
+        return read_result(self._base_path(sha256))
+
+    def submit(self, sha256, duration=None):
+        job, _ = self.job_queue.enqueue(
+            "scenes", {"hash": sha256, "duration": duration}, key=f"scenes:{sha256}", priority=PRIORITY_NORMAL,
+        )
+        return job
+
+    def _run(self, job):
+        sha256 = job.payload["hash"]
+        base = self._base_path(sha256)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        try:
+            duration, candidates = detect_scene_candidates(
+                self.asset_store.object_path(sha256), job, job.payload["duration"],
+            )
+        except ffmpeg.Error as e:
+            message = e.stderr.decode("utf-8", "replace")[-500:]
+            write_error(base, message)
+            print(f"❌ 장면 감지 실패: {sha256[:12]}")
+            raise JobFailed(message)
+
+        write_result(base, {"status": "ready", "duration": duration, "candidates": candidates})
+        print(f"🎬 장면 감지 완료: {sha256[:12]} (후보 {len(candidates)}개)")
+        return {"candidates": len(candidates)}
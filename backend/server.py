@@ -1,15 +1,120 @@
 ﻿# C:\wai-ui\backend\server.py
 
-from fastapi import FastAPI, File, UploadFile, Form
+from fastapi import FastAPI, File, UploadFile, Form, Request, Header, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from urllib.parse import unquote
+import asyncio
 import os
+import re
+import sqlite3
+
+from asset_store import AssetStore, DEFAULT_SAMPLE_SIZE
+from catalog import AssetCatalog, DEFAULT_PAGE_SIZE
+from disk_io import DISK_IO_WORKERS, run_io
+from events import EventHub
+from export import TimelineExporter, TimelineError, DEFAULT_FPS
+from file_serve import file_response
+from frames import FrameServer, DEFAULT_FRAME_WIDTH
+from image_gen import ImageGenerator, ImageRequestError
+from jobs import JobQueue, PRIORITY_HIGH, ACTIVE_STATUSES, FINISHED_STATUSES, DEFAULT_LIST_LIMIT
+from key_pool import KeyPool, KEY_STATUSES, DEFAULT_RATE_PER_MINUTE
+from loudness import LoudnessAnalyzer, DEFAULT_TARGET_LUFS, DEFAULT_PEAK_LIMIT
+from media_probe import MediaProber
+from mixdown import AudioMixdown, MAX_MASTER_VOLUME
+from preview_stream import PreviewStreamer, PreviewRenderError, PREVIEW_HEIGHT, PREVIEW_SEGMENT_SECONDS
+from proxies import ProxyTranscoder
+from peaks import PeakAnalyzer, MAX_BARS, read_bars
+from scenes import SceneDetector, DEFAULT_MIN_SHOT, cuts_to_clips, select_cuts
+from scenes import DEFAULT_THRESHOLD as DEFAULT_SCENE_THRESHOLD
+from silence import SilenceDetector, DEFAULT_THRESHOLD, DEFAULT_MIN_DURATION
+from thumbnails import SpriteGenerator, zoom_level
+from tts import TTSGenerator, TTSRequestError
+from upload_sessions import UploadSessionStore, UploadSessionError
 
 # 파일이 저장될 디렉토리 설정
 UPLOAD_DIR = "uploaded_files"
 if not os.path.exists(UPLOAD_DIR):
     os.makedirs(UPLOAD_DIR)
 
-app = FastAPI()
+# 자산 카탈로그 (uploaded_files/catalog.db, SQLite WAL)
+catalog = AssetCatalog(os.path.join(UPLOAD_DIR, "catalog.db"))
+
+# 콘텐츠 주소 기반 자산 저장소 (uploaded_files/objects/ab/cd/<sha256>, 이름 → 해시는 카탈로그)
+asset_store = AssetStore(UPLOAD_DIR, catalog)
+
+# 영속 작업 큐 (uploaded_files/jobs.db) — 아래 분석 / 변환 작업은 모두 이 큐의 워커 풀에서 실행
+job_queue = JobQueue(os.path.join(UPLOAD_DIR, "jobs.db"))
+
+# 업로드 직후 백그라운드에서 ffprobe 분석 (코덱/길이/해상도/fps/오디오 채널/비트레이트)
+media_prober = MediaProber(catalog, asset_store, job_queue)
+catalog.add_listener(media_prober.on_catalog_event)
+
+# 타임라인 필름스트립 스프라이트 시트 (uploaded_files/cache/sprites, 백그라운드 생성)
+sprite_generator = SpriteGenerator(UPLOAD_DIR, asset_store, job_queue)
+
+# 오디오 파형 피크 피라미드 (uploaded_files/cache/peaks, 업로드 직후 백그라운드 분석)
+peak_analyzer = PeakAnalyzer(UPLOAD_DIR, asset_store, job_queue)
+catalog.add_listener(peak_analyzer.on_catalog_event)
+
+# 무음 구간 감지 (uploaded_files/cache/silence, 요청 시 백그라운드 분석)
+silence_detector = SilenceDetector(UPLOAD_DIR, asset_store, job_queue)
+
+# 장면 전환 감지 (uploaded_files/cache/scenes, 요청 시 백그라운드 분석)
+scene_detector = SceneDetector(UPLOAD_DIR, asset_store, job_queue)
+
+# 편집용 프록시 (uploaded_files/cache/proxies, 4K / HEVC 원본 → 540p H.264, 미디어 분석 후 백그라운드 변환)
+proxy_transcoder = ProxyTranscoder(UPLOAD_DIR, catalog, asset_store, job_queue)
+catalog.add_listener(proxy_transcoder.on_catalog_event)
+
+# 타임라인 내보내기 (uploaded_files/exports, 구간 단위 병렬 렌더링 후 재인코딩 없이 연결)
+timeline_exporter = TimelineExporter(UPLOAD_DIR, catalog, asset_store, job_queue)
+
+# 서버 합성 타임라인 미리보기 (HLS, 내보내기와 같은 렌더링 / 구간 캐시를 미리보기 해상도로)
+preview_streamer = PreviewStreamer(timeline_exporter)
+
+# 미리보기 재생용 오디오 믹스다운 (uploaded_files/mixdowns, 고정 길이 구간 단위로 캐시 → 고친 구간만 다시 믹스)
+audio_mixdown = AudioMixdown(UPLOAD_DIR, timeline_exporter, job_queue)
+
+# EBU R128 라우드니스 측정 / 일괄 정규화 (uploaded_files/cache/loudness, 요청 시 백그라운드 분석)
+loudness_analyzer = LoudnessAnalyzer(UPLOAD_DIR, asset_store, timeline_exporter, job_queue)
+
+# 외부 API 키 풀 (uploaded_files/keys.db, 키별 토큰 버킷 속도 제한 + 할당량 초과 시 standby 키로 전환)
+key_pool = KeyPool(os.path.join(UPLOAD_DIR, "keys.db"))
+
+# TTS 일괄 생성 (엔진별 동시 호출 제한, uploaded_files/cache/tts 에 줄 단위 캐시 → 결과는 일반 자산)
+tts_generator = TTSGenerator(UPLOAD_DIR, asset_store, key_pool, job_queue)
+
+# 이미지 생성 (엔진별 동시 호출 제한, 같은 요청은 한 번만 생성, uploaded_files/cache/images 에 캐시 → 결과는 일반 자산)
+image_generator = ImageGenerator(UPLOAD_DIR, asset_store, key_pool, job_queue)
+
+# 스크럽용 프레임 서버 (자산별 디코더 유지 + 최근 프레임 LRU 메모리 캐시)
+frame_server = FrameServer()
+
+# 이어받기 업로드 세션 저장소 (uploaded_files/.sessions)
+upload_sessions = UploadSessionStore(UPLOAD_DIR)
+
+# 실시간 알림 (SSE /api/events): 작업 진행률 / 완료, 카탈로그 변경, 업로드 진행률
+event_hub = EventHub()
+catalog.add_listener(event_hub.on_catalog_event)
+job_queue.add_listener(event_hub.on_job_event)
+
+@asynccontextmanager
+async def lifespan(app):
+    # 서버 시작 시 중단된 작업 복구 + 워커 시작, 큐에 들어가기 전이던 분석 재개
+    event_hub.attach(asyncio.get_running_loop())
+    job_queue.start()
+    media_prober.resume_pending()
+    proxy_transcoder.resume_pending()
+    yield
+    frame_server.close()
+    preview_streamer.close()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # 프론트엔드(localhost:5174 또는 5173)와의 통신을 허용하기 위한 CORS 설정
 origins = [
@@ -25,6 +130,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # 이어받기 업로드 진행 상황 / Range 응답 헤더를 브라우저에서 읽을 수 있도록 노출
+    expose_headers=["Upload-Offset", "Upload-Length", "Content-Range", "Accept-Ranges", "ETag", "X-Frame-Time"],
 )
 
 # 기본 상태 확인 엔드포인트
@@ -36,23 +143,951 @@ def read_root():
 @app.post("/api/upload")
 async def upload_asset(
     file: UploadFile = File(...), 
-    description: str = Form(None)
+    description: str = Form(None),
+    folder_id: str = Form("all"),
 ):
     try:
-        # 파일을 서버에 저장
-        file_path = os.path.join(UPLOAD_DIR, file.filename)
-        with open(file_path, "wb") as buffer:
-            # 파일 내용을 비동기적으로 읽어와 저장 (chunk 단위)
-            while content := await file.read(1024 * 1024):  # 1MB씩 읽기
-                buffer.write(content)
+        entry = await save_upload_file(file, description, folder_id)
         
-        print(f"✅ 파일 업로드 성공: {file.filename} (설명: {description})")
+        print(f"✅ 파일 업로드 성공: {entry['name']} (설명: {description}, 중복: {entry['deduplicated']})")
         
-        return {
-            "filename": file.filename, 
-            "message": "File successfully uploaded and saved.",
-            "description": description
-        }
+        return upload_result(entry, description)
     except Exception as e:
         print(f"❌ 파일 업로드 실패: {e}")
-        return {"message": "File upload failed.", "error": str(e)}
\ No newline at end of file
+        return {"message": "File upload failed.", "error": str(e)}
+
+
+async def save_upload_file(file, description, folder_id="all"):
+    # 파일을 서버에 저장 (SHA-256 을 계산하며 기록 → 이미 있는 내용이면 사본을 만들지 않음)
+    filename = safe_filename(file.filename)
+    # 디스크 쓰기는 전용 스레드 풀에서 수행 (이벤트 루프 블로킹 방지)
+    writer = await run_io(asset_store.open_writer)
+    try:
+        # 파일 내용을 비동기적으로 읽어와 저장 (chunk 단위)
+        while content := await file.read(1024 * 1024):  # 1MB씩 읽기
+            await run_io(writer.write, content)
+        return await run_io(asset_store.commit, writer, filename, description, folder_id)
+    except BaseException:
+        await run_io(writer.abort)
+        raise
+
+
+# 🚀 일괄 업로드: 한 번의 multipart 요청에 여러 파일 → 동시에 저장하고 파일별 결과 반환
+#    (300개를 드롭해도 300번 왕복 / 300번 순차 쓰기가 되지 않도록)
+@app.post("/api/upload/batch")
+async def upload_asset_batch(
+    files: List[UploadFile] = File(...),
+    description: str = Form(None),
+    folder_id: str = Form("all"),
+):
+    # 디스크 쓰기 스레드 수만큼만 동시에 처리 (나머지는 대기)
+    limit = asyncio.Semaphore(DISK_IO_WORKERS)
+
+    async def save_one(index, file):
+        async with limit:
+            try:
+                entry = await save_upload_file(file, description, folder_id)
+                return dict(upload_result(entry, description), index=index, ok=True)
+            except Exception as e:
+                detail = e.detail if isinstance(e, HTTPException) else str(e)
+                return {"index": index, "filename": file.filename, "ok": False, "error": detail}
+            finally:
+                await file.close()
+
+    results = await asyncio.gather(*(save_one(i, f) for i, f in enumerate(files)))
+    succeeded = sum(1 for r in results if r["ok"])
+    print(f"✅ 일괄 업로드: {succeeded}/{len(results)}개 성공 (설명: {description})")
+    return {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "results": results,
+    }
+
+
+def upload_result(entry, description):
+    return {
+        "id": entry["id"],
+        "filename": entry["name"],
+        "type": entry["type"],
+        "hash": entry["hash"],
+        "size": entry["size"],
+        "deduplicated": entry["deduplicated"],
+        "message": "File successfully uploaded and saved.",
+        "description": description,
+    }
+
+
+# 🚀 업로드 사전 확인: 본문을 보내기 전에 전체 해시로 물어보고 이미 있는 내용이면 전송 자체를 생략
+#    (같은 스톡 영상을 여러 프로젝트에 다시 가져올 때)
+#    앞/뒤 N MB 해시 + 크기는 후보만 알려 줌 (가운데가 다른 파일일 수 있으므로 연결하지 않음)
+#    → 응답 candidate 가 있으면 클라이언트가 전체 sha256 을 계산해 같을 때 sha256 으로 다시 확인
+SHA256_PATTERN = re.compile(r"[0-9a-f]{64}")
+
+
+class UploadCheck(BaseModel):
+    filename: str
+    size: int = None
+    sha256: str = None
+    head_tail_sha256: str = None      # sha256(앞 N MB + 뒤 N MB), 구간은 겹치지 않음
+    sample_mb: int = DEFAULT_SAMPLE_SIZE // (1024 * 1024)
+    description: str = None
+
+
+@app.post("/api/upload/check")
+async def check_upload(body: UploadCheck):
+    filename = safe_filename(body.filename)
+    if body.sha256:
+        sha256 = body.sha256.lower()
+        if not SHA256_PATTERN.fullmatch(sha256):
+            raise HTTPException(status_code=400, detail="invalid sha256")
+    elif body.head_tail_sha256 and body.size is not None:
+        if body.sample_mb <= 0:
+            raise HTTPException(status_code=400, detail="sample_mb must be > 0")
+        candidate = await run_io(
+            asset_store.find_by_fingerprint,
+            body.size, body.head_tail_sha256.lower(), body.sample_mb * 1024 * 1024,
+        )
+        result = {"exists": False, "filename": filename}
+        if candidate:
+            result.update(candidate=candidate, match="head_tail")
+        return result
+    else:
+        raise HTTPException(status_code=400, detail="sha256 or head_tail_sha256 + size required")
+
+    entry = await run_io(asset_store.link, filename, sha256, body.description, body.size)
+    if entry is None:
+        return {"exists": False, "filename": filename}
+
+    print(f"⚡ 업로드 생략 (이미 있는 내용): {entry['name']}")
+    return dict(upload_result(entry, body.description), exists=True, match="sha256")
+
+
+def safe_filename(filename):
+    # 경로 구분자 제거 (윈도우 경로 포함) → uploaded_files/ 밖으로 나가지 못하게
+    name = os.path.basename((filename or "").replace("\\", "/")).strip()
+    if name in ("", ".", ".."):
+        raise HTTPException(status_code=400, detail="invalid filename")
+    return name
+
+
+# 🚀 이어받기(resumable) 업로드: 세션 생성 → 청크 PUT → HEAD 오프셋 확인 → finalize
+class UploadSessionCreate(BaseModel):
+    filename: str
+    size: int
+    description: str = None
+
+
+def get_upload_session(session_id):
+    try:
+        return upload_sessions.get(session_id)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+
+@app.post("/api/upload/sessions")
+def create_upload_session(body: UploadSessionCreate):
+    filename = safe_filename(body.filename)
+    try:
+        session = upload_sessions.create(filename, body.size, body.description)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    print(f"📦 업로드 세션 생성: {filename} ({body.size} bytes, id={session.id})")
+    return session.to_dict()
+
+
+@app.head("/api/upload/sessions/{session_id}")
+def head_upload_session(session_id: str):
+    session = get_upload_session(session_id)
+    return Response(headers={
+        "Upload-Offset": str(session.offset),
+        "Upload-Length": str(session.size),
+        "Cache-Control": "no-store",
+    })
+
+
+@app.get("/api/upload/sessions/{session_id}")
+def get_upload_session_status(session_id: str):
+    # 병렬 업로드 클라이언트는 missing 구간만 다시 보내면 됨
+    return get_upload_session(session_id).to_dict()
+
+
+@app.put("/api/upload/sessions/{session_id}")
+async def put_upload_chunk(
+    session_id: str,
+    request: Request,
+    upload_offset: int = Header(...),
+    content_length: int = Header(None),
+):
+    # 세션 저장소 락을 이벤트 루프에서 기다리지 않도록 디스크 I/O 스레드에서 조회
+    session = await run_io(get_upload_session, session_id)
+    try:
+        upload_sessions.check_chunk(session, upload_offset, content_length)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    position = upload_offset
+    buffer = await run_io(upload_sessions.open_at, session, upload_offset)
+    try:
+        async for content in request.stream():
+            if not content:
+                continue
+            if position + len(content) > session.size:
+                raise HTTPException(status_code=413, detail="chunk exceeds declared upload size")
+            await run_io(buffer.write, content)
+            position += len(content)
+            publish_upload_progress(session, session.received + position - upload_offset)
+    finally:
+        await run_io(buffer.close)
+        # 연결이 중간에 끊겨도 실제로 기록된 구간까지는 수신 처리
+        await run_io(upload_sessions.mark_received, session, upload_offset, position)
+        publish_upload_progress(session, session.received)
+
+    return Response(
+        status_code=204,
+        headers={"Upload-Offset": str(session.offset), "Upload-Length": str(session.size)},
+    )
+
+
+def publish_upload_progress(session, received):
+    event_hub.publish("upload", f"upload:{session.id}", {
+        "sessionId": session.id,
+        "filename": session.filename,
+        "size": session.size,
+        "received": min(received, session.size),
+    })
+
+
+@app.post("/api/upload/sessions/{session_id}/finalize")
+async def finalize_upload_session(session_id: str):
+    session = await run_io(get_upload_session, session_id)
+    try:
+        # 순서 없이 들어온 청크라 해시는 완료 시점에 한 번 읽어서 계산
+        entry = await run_io(
+            upload_sessions.finalize, session,
+            lambda path: asset_store.ingest_file(path, session.filename, session.description),
+        )
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+
+    print(f"✅ 이어받기 업로드 완료: {entry['name']} (설명: {session.description}, 중복: {entry['deduplicated']})")
+    return upload_result(entry, session.description)
+
+
+@app.delete("/api/upload/sessions/{session_id}")
+def abort_upload_session(session_id: str):
+    session = get_upload_session(session_id)
+    try:
+        upload_sessions.abort(session)
+    except UploadSessionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.message)
+    return {"session_id": session_id, "message": "Upload session aborted."}
+
+
+# 🚀 원본 스트리밍 업로드: multipart 임시파일(SpooledTemporaryFile) 단계 없이
+#    request body 를 최종 위치에 바로 기록 → 디스크 I/O 절반, 임시파일 피크 제거
+#    파일명/설명은 query(filename, description) 또는 헤더(X-Filename, X-Description, URL 인코딩)
+@app.post("/api/upload/stream")
+async def upload_asset_stream(
+    request: Request,
+    filename: str = None,
+    description: str = None,
+    x_filename: str = Header(None),
+    x_description: str = Header(None),
+):
+    filename = safe_filename(filename or unquote(x_filename or ""))
+    if description is None and x_description is not None:
+        description = unquote(x_description)
+
+    # 수신 중에는 저장소 임시 폴더에 기록하고 끝나면 같은 디스크 안에서 rename (추가 복사 없음)
+    writer = await run_io(asset_store.open_writer)
+    try:
+        async for content in request.stream():
+            if content:
+                await run_io(writer.write, content)
+        entry = await run_io(asset_store.commit, writer, filename, description)
+    except Exception as e:
+        print(f"❌ 스트리밍 업로드 실패: {filename} ({e})")
+        await run_io(writer.abort)
+        return {"message": "File upload failed.", "error": str(e)}
+
+    print(f"✅ 스트리밍 업로드 성공: {entry['name']} ({entry['size']} bytes, 설명: {description}, 중복: {entry['deduplicated']})")
+    return upload_result(entry, description)
+
+
+# 🚀 자산 파일 내려주기 (Range / ETag)
+#    /api/objects/{sha256} : 내용 해시 주소 → 절대 바뀌지 않으므로 immutable 캐시
+#    /api/files/{name}     : 파일명 주소 → ETag 로 재검증
+@app.api_route("/api/objects/{sha256}", methods=["GET", "HEAD"])
+def download_object(sha256: str, request: Request):
+    if not SHA256_PATTERN.fullmatch(sha256):
+        raise HTTPException(status_code=404, detail="object not found")
+    path = asset_store.object_path(sha256)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="object not found")
+    return file_response(
+        request, path, f'"{sha256}"', sha256,
+        cache_control="public, max-age=31536000, immutable",
+    )
+
+
+@app.api_route("/api/files/{name}", methods=["GET", "HEAD"])
+def download_file(name: str, request: Request):
+    entry = asset_store.lookup(name)
+    if entry is None:
+        raise HTTPException(status_code=404, detail="file not found")
+    return file_response(request, asset_store.object_path(entry["hash"]), f'"{entry["hash"]}"', name)
+
+
+# 재생용 주소 (자산의 previewSrc): 프록시 준비 전에는 /api/preview(원본), 준비되면 /api/proxies
+#    한 주소의 내용은 바뀌지 않음 → 재생 중인 <video> 의 Range 요청이 길이가 다른 파일을 받지 않음
+#    프록시가 생기면 자산 변경 이벤트(previewSrc)로 알리고 클라이언트가 주소를 바꿈
+@app.api_route("/api/preview/{sha256}", methods=["GET", "HEAD"])
+def download_preview(sha256: str, request: Request):
+    if not SHA256_PATTERN.fullmatch(sha256):
+        raise HTTPException(status_code=404, detail="object not found")
+    path = asset_store.object_path(sha256)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="object not found")
+    return file_response(request, path, f'"{sha256}"', sha256)
+
+
+@app.api_route("/api/proxies/{sha256}", methods=["GET", "HEAD"])
+def download_proxy(sha256: str, request: Request):
+    if not SHA256_PATTERN.fullmatch(sha256):
+        raise HTTPException(status_code=404, detail="proxy not found")
+    path = proxy_transcoder.proxy_path(sha256)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="proxy not found")
+    return file_response(request, path, f'"{sha256}-proxy"', f"{sha256}.mp4")
+
+
+# 🚀 자산 카탈로그 조회 (AssetManagerModal 목록 / 폴더 / 정렬 / 검색)
+#    sort=name|date, order=asc|desc, 다음 페이지는 응답의 nextCursor 를 cursor 로 전달
+@app.get("/api/assets")
+def list_assets(
+    type: str = None,
+    folderId: str = None,
+    q: str = None,
+    sort: str = "name",
+    order: str = "asc",
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str = None,
+):
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be asc or desc")
+    try:
+        return catalog.list_assets(type, folderId, q, sort, order == "asc", limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/api/assets/folders")
+def list_asset_folders(type: str = None):
+    return {"counts": catalog.folder_counts(type)}
+
+
+# 여러 자산의 미디어 정보를 한 번에 (AssetManagerModal / TimelinePanel 의 <video> 메타데이터 읽기 대체)
+class AssetMetadataQuery(BaseModel):
+    ids: List[str]
+
+
+@app.post("/api/assets/metadata")
+def get_assets_metadata(body: AssetMetadataQuery):
+    items = catalog.get_with_media(body.ids)
+    return {"items": items, "missing": [i for i in body.ids if i not in items]}
+
+
+@app.get("/api/assets/{asset_id}")
+def get_asset(asset_id: str):
+    asset = catalog.get(asset_id)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="asset not found")
+    return asset
+
+
+class AssetUpdate(BaseModel):
+    name: str = None
+    folderId: str = None
+    description: str = None
+
+
+@app.patch("/api/assets/{asset_id}")
+def update_asset(asset_id: str, body: AssetUpdate):
+    if catalog.get(asset_id) is None:
+        raise HTTPException(status_code=404, detail="asset not found")
+    name = safe_filename(body.name) if body.name is not None else None
+    try:
+        return catalog.update_asset(asset_id, name=name, folderId=body.folderId, description=body.description)
+    except sqlite3.IntegrityError:
+        raise HTTPException(status_code=409, detail="name already in use")
+
+
+
+# 🚀 타임라인 필름스트립 스프라이트 시트
+#    zoom = 타임라인 줌(px/초), 아직 없으면 백그라운드 생성 후 202 (다시 요청하면 결과 반환)
+@app.get("/api/assets/{asset_id}/sprites")
+def get_asset_sprites(asset_id: str, zoom: float = 20):
+    asset = catalog.get_with_media([asset_id]).get(asset_id)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="asset not found")
+    if asset["type"] != "video":
+        raise HTTPException(status_code=400, detail="sprites are only available for video assets")
+    try:
+        level = zoom_level(zoom)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    media = asset["media"]
+    if media["status"] == "error" or (media["status"] == "ready" and not media["duration"]):
+        raise HTTPException(status_code=422, detail="media could not be decoded")
+    if media["status"] != "ready":
+        # 미디어 분석(길이)이 끝나야 프레임 간격을 정할 수 있음
+        return JSONResponse(status_code=202, content={"status": "pending", "zoomLevel": level})
+
+    index = sprite_generator.get_index(asset["hash"], level)
+    if index is None:
+        job = sprite_generator.submit(asset["hash"], media["duration"], level)
+        return JSONResponse(status_code=202, content={"status": "pending", "zoomLevel": level, "jobId": job["id"]})
+    if index["status"] == "error":
+        raise HTTPException(status_code=422, detail=index["error"])
+    return dict(index, image=f"/api/sprites/{asset['hash']}/z{level}.jpg")
+
+
+SPRITE_NAME_PATTERN = re.compile(r"z(-?\d+)\.jpg")
+
+
+@app.api_route("/api/sprites/{sha256}/{sprite_name}", methods=["GET", "HEAD"])
+def download_sprite(sha256: str, sprite_name: str, request: Request):
+    match = SPRITE_NAME_PATTERN.fullmatch(sprite_name)
+    if not SHA256_PATTERN.fullmatch(sha256) or not match:
+        raise HTTPException(status_code=404, detail="sprite not found")
+    path = sprite_generator.image_path(sha256, int(match.group(1)))
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="sprite not found")
+    return file_response(
+        request, path, f'"{sha256}-{sprite_name}"', sprite_name,
+        cache_control="public, max-age=31536000, immutable",
+    )
+
+
+# 🚀 오디오 파형 (getAudioLevelBars 용)
+#    bars 개수만큼 정확히 (min, max) 반환, start / duration 은 원본 기준 초 (클립 startOffset / 길이)
+@app.get("/api/assets/{asset_id}/peaks")
+def get_asset_peaks(asset_id: str, bars: int = 100, start: float = 0, duration: float = None):
+    asset = catalog.get_with_media([asset_id]).get(asset_id)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="asset not found")
+    if asset["type"] not in ("video", "sound"):
+        raise HTTPException(status_code=400, detail="peaks are only available for audio/video assets")
+    if not 1 <= bars <= MAX_BARS:
+        raise HTTPException(status_code=400, detail=f"bars must be between 1 and {MAX_BARS}")
+
+    media = asset["media"]
+    if media["status"] == "ready" and not media["audio_codec"]:
+        # 오디오 트랙이 없는 영상 → 평평한 파형
+        return {"hasAudio": False, "bars": bars, "min": [0.0] * bars, "max": [0.0] * bars}
+
+    path = peak_analyzer.peak_path(asset["hash"])
+    if not os.path.exists(path):
+        error = peak_analyzer.get_error(asset["hash"])
+        if error is not None:
+            raise HTTPException(status_code=422, detail=error)
+        job = peak_analyzer.submit(asset["hash"], media.get("duration"), priority=PRIORITY_HIGH)
+        return JSONResponse(status_code=202, content={"status": "pending", "jobId": job["id"]})
+
+    start, end, bar_mins, bar_maxs = read_bars(path, bars, start, duration)
+    return {
+        "hasAudio": True,
+        "bars": bars,
+        "start": round(start, 3),
+        "duration": round(end - start, 3),
+        "min": bar_mins,
+        "max": bar_maxs,
+    }
+
+
+# 🚀 무음 구간 (타임라인 "무음 제거")
+#    threshold = 진폭 비율 (SILENT_THRESHOLD 와 같은 단위), minDuration = 최소 무음 길이(초)
+#    아직 없으면 백그라운드 분석 후 202, 구간은 원본 기준 초
+@app.get("/api/assets/{asset_id}/silences")
+def get_asset_silences(asset_id: str, threshold: float = DEFAULT_THRESHOLD, minDuration: float = DEFAULT_MIN_DURATION):
+    asset = catalog.get_with_media([asset_id]).get(asset_id)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="asset not found")
+    if asset["type"] not in ("video", "sound"):
+        raise HTTPException(status_code=400, detail="silence detection is only available for audio/video assets")
+    if not 0 < threshold <= 1 or not 0.05 <= minDuration <= 60:
+        raise HTTPException(status_code=400, detail="threshold must be in (0, 1] and minDuration in [0.05, 60]")
+    if asset["media"]["status"] == "ready" and not asset["media"]["audio_codec"]:
+        raise HTTPException(status_code=422, detail="asset has no audio track")
+
+    result = silence_detector.get_result(asset["hash"], threshold, minDuration)
+    if result is None:
+        job = silence_detector.submit(asset["hash"], threshold, minDuration, asset["media"].get("duration"))
+        return JSONResponse(status_code=202, content={"status": "pending", "jobId": job["id"]})
+    if result["status"] == "error":
+        raise HTTPException(status_code=422, detail=result["error"])
+    return result
+
+
+# 🚀 장면 전환 감지 → 샷 단위 클립 (타임라인에 그대로 넣을 수 있는 {start, duration, src, startOffset ...})
+#    threshold = 장면 점수 기준(0~1, 낮을수록 민감), minShot = 최소 샷 길이(초), at = 첫 클립을 놓을 타임라인 위치(초)
+@app.get("/api/assets/{asset_id}/scenes")
+def get_asset_scenes(
+    asset_id: str,
+    threshold: float = DEFAULT_SCENE_THRESHOLD,
+    minShot: float = DEFAULT_MIN_SHOT,
+    at: float = 0,
+):
+    asset = catalog.get_with_media([asset_id]).get(asset_id)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="asset not found")
+    if asset["type"] != "video":
+        raise HTTPException(status_code=400, detail="scene detection is only available for video assets")
+    if not 0 < threshold <= 1 or minShot < 0 or at < 0:
+        raise HTTPException(status_code=400, detail="threshold must be in (0, 1], minShot and at must be >= 0")
+
+    result = scene_detector.get_result(asset["hash"])
+    if result is None:
+        job = scene_detector.submit(asset["hash"], asset["media"].get("duration"))
+        return JSONResponse(status_code=202, content={"status": "pending", "jobId": job["id"]})
+    if result["status"] == "error":
+        raise HTTPException(status_code=422, detail=result["error"])
+
+    duration = asset["media"].get("duration") or result["duration"]
+    if not duration:
+        raise HTTPException(status_code=422, detail="media duration unknown")
+    cuts = select_cuts(result["candidates"], duration, threshold, minShot)
+    return {
+        "status": "ready",
+        "duration": duration,
+        "cuts": cuts,
+        "clips": cuts_to_clips(cuts, duration, asset, at),
+    }
+
+
+# 🚀 편집용 프록시 상태 / 우선순위
+#    status: ready | pending | none | error | not_needed
+@app.get("/api/assets/{asset_id}/proxy")
+def get_asset_proxy(asset_id: str):
+    asset = catalog.get_with_media([asset_id]).get(asset_id)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="asset not found")
+    if asset["type"] != "video":
+        raise HTTPException(status_code=400, detail="proxies are only available for video assets")
+    return {"status": proxy_transcoder.asset_status(asset), "previewSrc": asset["previewSrc"]}
+
+
+# 타임라인에 올라간 클립의 자산 id 목록 → 해당 프록시를 먼저 변환
+class ProxyPriorityRequest(BaseModel):
+    ids: List[str]
+
+
+@app.post("/api/proxies/prioritize")
+def prioritize_proxies(body: ProxyPriorityRequest):
+    return {"statuses": proxy_transcoder.prioritize(body.ids)}
+
+
+# 🚀 작업 큐 상태 / 취소
+#    status: queued | running | done | failed | cancelled, kind: probe | sprites | peaks | silence | scenes | proxy ...
+@app.get("/api/jobs")
+def list_jobs(status: str = None, kind: str = None, limit: int = DEFAULT_LIST_LIMIT):
+    if status is not None and status not in ACTIVE_STATUSES + FINISHED_STATUSES:
+        raise HTTPException(status_code=400, detail="unknown status")
+    return {"items": job_queue.list_jobs(status, kind, limit)}
+
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job
+
+
+@app.post("/api/jobs/{job_id}/cancel")
+def cancel_job(job_id: str):
+    job = job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return job
+
+
+# 🚀 실시간 알림 스트림 (Server-Sent Events)
+#    event: job | asset | upload | resync, topics=job,asset 처럼 필요한 종류만 구독 가능
+#    같은 작업 / 자산의 이벤트는 짧은 간격 안에서 최신 상태 하나로 합쳐서 전송
+@app.get("/api/events")
+def stream_events(request: Request, topics: str = None):
+    topic_list = [t.strip() for t in topics.split(",") if t.strip()] if topics else None
+    return StreamingResponse(
+        event_hub.stream(request, topic_list),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# 🚀 타임라인 내보내기 (MP4)
+#    app-root.js 의 clips / tracks / canvasBoxes / canvasSize 를 그대로 전달, 클립 src 는 /api/objects | /api/preview | /api/proxies | /api/files 주소
+#    202 + jobId → 진행률은 /api/jobs/{id} 또는 /api/events, 완료 후 /api/exports/{id}/file
+class ExportRequest(BaseModel):
+    clips: List[dict]
+    tracks: List[dict]
+    canvasBoxes: List[dict] = []
+    canvasSize: dict = {"w": 1920, "h": 1080}
+    fps: float = DEFAULT_FPS
+    name: Optional[str] = None
+
+
+@app.post("/api/exports")
+def create_export(body: ExportRequest):
+    try:
+        plan = timeline_exporter.compile(body.model_dump(), body.fps)
+    except TimelineError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    job = timeline_exporter.submit(plan, body.name)
+    return JSONResponse(status_code=202, content={
+        "status": "pending",
+        "jobId": job["id"],
+        "duration": plan["duration"],
+        "warnings": plan["warnings"],
+    })
+
+
+@app.get("/api/exports/{export_id}")
+def get_export(export_id: str):
+    job = job_queue.get(export_id)
+    if job is None or job["kind"] != "export":
+        raise HTTPException(status_code=404, detail="export not found")
+    result = {"status": job["status"], "progress": job["progress"], "error": job["error"]}
+    if job["status"] == "done" and os.path.exists(timeline_exporter.output_path(export_id)):
+        result.update(job["result"])
+    return result
+
+
+@app.api_route("/api/exports/{export_id}/file", methods=["GET", "HEAD"])
+def download_export(export_id: str, request: Request):
+    job = job_queue.get(export_id)
+    path = timeline_exporter.output_path(export_id)
+    if job is None or job["kind"] != "export" or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="export not found")
+    filename = safe_filename(f"{job['payload'].get('name') or export_id}.mp4")
+    return file_response(request, path, f'"{export_id}"', filename)
+
+
+# 내보내기 삭제 (작업 기록 + 결과 MP4), 대기 / 렌더링 중이면 취소만 (끝나면 다시 DELETE)
+@app.delete("/api/exports/{export_id}")
+def delete_export(export_id: str):
+    job = job_queue.get(export_id)
+    if job is None or job["kind"] != "export":
+        raise HTTPException(status_code=404, detail="export not found")
+    if job["status"] in ACTIVE_STATUSES:
+        job = job_queue.cancel(export_id)
+        return {"status": job["status"], "id": export_id}
+    job_queue.delete(export_id)
+    return {"status": "deleted", "id": export_id}
+
+
+# 🚀 스크럽용 프레임 (t 초의 프레임 한 장, JPEG)
+#    프록시가 있으면 프록시에서 디코드, X-Frame-Time = 실제 프레임 시각(fps 간격으로 맞춤)
+@app.get("/api/assets/{asset_id}/frame")
+def get_asset_frame(asset_id: str, t: float = 0, width: int = DEFAULT_FRAME_WIDTH):
+    asset = catalog.get_with_media([asset_id]).get(asset_id)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="asset not found")
+    if asset["type"] != "video":
+        raise HTTPException(status_code=400, detail="frames are only available for video assets")
+    if t < 0:
+        raise HTTPException(status_code=400, detail="t must be >= 0")
+    sha256 = asset["hash"]
+    path = proxy_transcoder.proxy_path(sha256)
+    if not os.path.exists(path):
+        path = asset_store.object_path(sha256)
+    media = asset["media"]
+    frame_time, frame = frame_server.get_frame(sha256, path, t, width, media.get("fps"), media.get("duration"))
+    if frame is None:
+        raise HTTPException(status_code=404, detail="no frame at this position")
+    return Response(content=frame, media_type="image/jpeg", headers={
+        "Cache-Control": "private, max-age=3600",
+        "X-Frame-Time": f"{frame_time:.3f}",
+    })
+
+
+@app.get("/api/frames/stats")
+def get_frame_stats():
+    return frame_server.stats()
+
+
+# 🚀 서버 합성 타임라인 미리보기 (HLS)
+#    내보내기와 같은 타임라인 JSON → sessionId + playlist, 플레이어(hls.js 등)는 playlist 를 열고 startPosition 으로 재생 위치 지정
+#    구간을 요청하면 그 구간을 바로 렌더링하고 뒤 구간을 미리 렌더링, 재생 위치가 뛰면 이전 위치의 미리 렌더링은 취소
+class PreviewRequest(ExportRequest):
+    height: int = PREVIEW_HEIGHT
+
+
+@app.post("/api/previews")
+def create_preview(body: PreviewRequest):
+    if body.height < 90:
+        raise HTTPException(status_code=400, detail="height must be >= 90")
+    try:
+        session = preview_streamer.create(body.model_dump(), body.fps, body.height)
+    except TimelineError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {
+        "sessionId": session.id,
+        "playlist": f"/api/previews/{session.id}/index.m3u8",
+        "duration": session.plan["duration"],
+        "width": session.plan["width"],
+        "height": session.plan["height"],
+        "segmentDuration": PREVIEW_SEGMENT_SECONDS,
+        "warnings": session.plan["warnings"],
+    }
+
+
+def get_preview_session(session_id):
+    session = preview_streamer.get(session_id)
+    if session is None:
+        # 서버 재시작 / 오래된 세션 → 클라이언트가 POST /api/previews 로 다시 생성
+        raise HTTPException(status_code=404, detail="preview session not found")
+    return session
+
+
+@app.get("/api/previews/{session_id}/index.m3u8")
+def get_preview_playlist(session_id: str):
+    session = get_preview_session(session_id)
+    return Response(content=preview_streamer.playlist(session), media_type="application/vnd.apple.mpegurl")
+
+
+# 재생하지 않고 재생 위치만 옮길 때 (일시정지 상태에서 플레이헤드 드래그 등) 미리 렌더링 시작
+@app.post("/api/previews/{session_id}/seek")
+def seek_preview(session_id: str, t: float = 0):
+    session = get_preview_session(session_id)
+    return {"segment": preview_streamer.seek(session, t)}
+
+
+PREVIEW_SEGMENT_PATTERN = re.compile(r"(\d+)\.ts")
+
+
+@app.api_route("/api/previews/{session_id}/{segment_name}", methods=["GET", "HEAD"])
+def get_preview_segment(session_id: str, segment_name: str, request: Request):
+    session = get_preview_session(session_id)
+    match = PREVIEW_SEGMENT_PATTERN.fullmatch(segment_name)
+    if not match or int(match.group(1)) >= len(session.segments):
+        raise HTTPException(status_code=404, detail="segment not found")
+    index = int(match.group(1))
+    try:
+        path = preview_streamer.segment_path(session, index)
+    except PreviewRenderError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return file_response(
+        request, path, f'"{session.key(index)}"', segment_name, cache_control="private, max-age=31536000, immutable",
+    )
+
+
+# 🚀 미리보기 재생용 오디오 믹스다운 (모든 트랙 → 스테레오 WAV 한 개)
+#    clips / tracks + masterVolume(0~200, 100 = 원음) → 리비전 id, 이미 있으면 바로 src, 없으면 202 + jobId
+#    타임라인을 고칠 때마다 다시 요청하면 바뀐 구간만 다시 믹스, 화면은 <audio> 하나만 재생
+class MixdownRequest(BaseModel):
+    clips: List[dict]
+    tracks: List[dict]
+    masterVolume: float = 100
+
+
+@app.post("/api/mixdowns")
+def create_mixdown(body: MixdownRequest):
+    if not 0 <= body.masterVolume <= MAX_MASTER_VOLUME:
+        raise HTTPException(status_code=400, detail=f"masterVolume must be in [0, {MAX_MASTER_VOLUME}]")
+    try:
+        mix = audio_mixdown.plan(body.model_dump(), body.masterVolume)
+    except TimelineError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    src = f"/api/mixdowns/{mix['revision']}.wav"
+    if audio_mixdown.touch(mix["revision"]):
+        return {"status": "ready", "revision": mix["revision"], "src": src, "duration": mix["duration"]}
+    job = audio_mixdown.submit(mix)
+    return JSONResponse(status_code=202, content={
+        "status": "pending",
+        "jobId": job["id"],
+        "revision": mix["revision"],
+        "src": src,
+        "duration": mix["duration"],
+        "chunks": len(mix["chunks"]),
+        "chunksToMix": len(audio_mixdown.missing_chunks(mix)),
+    })
+
+
+MIXDOWN_NAME_PATTERN = re.compile(r"([0-9a-f]{32})\.wav")
+
+
+@app.api_route("/api/mixdowns/{file_name}", methods=["GET", "HEAD"])
+def get_mixdown(file_name: str, request: Request):
+    match = MIXDOWN_NAME_PATTERN.fullmatch(file_name)
+    path = audio_mixdown.output_path(match.group(1)) if match else None
+    if path is None or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="mixdown not found")
+    # 리비전 id 가 내용 해시이므로 같은 주소의 내용은 바뀌지 않음
+    return file_response(
+        request, path, f'"{match.group(1)}"', file_name, cache_control="private, max-age=31536000, immutable",
+    )
+
+
+# 🚀 EBU R128 라우드니스 (integrated LUFS / truePeak dBTP / lra LU, 소리가 없으면 integrated = null)
+#    아직 없으면 백그라운드 측정 후 202
+@app.get("/api/assets/{asset_id}/loudness")
+def get_asset_loudness(asset_id: str):
+    asset = catalog.get_with_media([asset_id]).get(asset_id)
+    if asset is None:
+        raise HTTPException(status_code=404, detail="asset not found")
+    if asset["type"] not in ("video", "sound"):
+        raise HTTPException(status_code=400, detail="loudness is only available for audio/video assets")
+    if asset["media"]["status"] == "ready" and not asset["media"]["audio_codec"]:
+        raise HTTPException(status_code=422, detail="asset has no audio track")
+
+    result = loudness_analyzer.get_result(asset["hash"])
+    if result is None:
+        job = loudness_analyzer.submit_asset(asset["hash"], asset["media"].get("duration"))
+        return JSONResponse(status_code=202, content={"status": "pending", "jobId": job["id"]})
+    if result["status"] == "error":
+        raise HTTPException(status_code=422, detail=result["error"])
+    return result
+
+
+@app.get("/api/exports/{export_id}/loudness")
+def get_export_loudness(export_id: str):
+    job = job_queue.get(export_id)
+    if job is None or job["kind"] != "export":
+        raise HTTPException(status_code=404, detail="export not found")
+    result = loudness_analyzer.get_result(loudness_analyzer.export_key(job))
+    if result is None:
+        if job["status"] != "done" or not os.path.exists(timeline_exporter.output_path(export_id)):
+            raise HTTPException(status_code=409, detail="export is not finished")
+        measure_job = loudness_analyzer.submit_export(job)
+        return JSONResponse(status_code=202, content={"status": "pending", "jobId": measure_job["id"]})
+    if result["status"] == "error":
+        raise HTTPException(status_code=422, detail=result["error"])
+    return result
+
+
+# 🚀 라우드니스 일괄 정규화: 타임라인의 모든 sound 클립을 한 번에 측정 → 클립별 gain(dB) / volume(0~200)
+#    트루 피크가 truePeakLimit 을 넘지 않도록 gain 을 줄이면 limited = true, 소리가 없는 클립은 gain / volume = null
+#    모두 측정되어 있으면 바로 결과, 아니면 202 + jobId (작업 결과에 같은 형식의 결과)
+class LoudnessNormalizeRequest(BaseModel):
+    clips: List[dict]
+    target: float = DEFAULT_TARGET_LUFS
+    truePeakLimit: float = DEFAULT_PEAK_LIMIT
+
+
+@app.post("/api/loudness/normalize")
+def normalize_loudness(body: LoudnessNormalizeRequest):
+    if not -70 < body.target < 0 or not -20 <= body.truePeakLimit <= 0:
+        raise HTTPException(status_code=400, detail="target must be in (-70, 0) LUFS and truePeakLimit in [-20, 0] dBTP")
+    try:
+        ranges = loudness_analyzer.clip_ranges(body.clips)
+    except TimelineError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    result = loudness_analyzer.normalize(ranges, body.target, body.truePeakLimit)
+    if result is not None:
+        return result
+    job = loudness_analyzer.submit_batch(ranges, body.target, body.truePeakLimit)
+    return JSONResponse(status_code=202, content={
+        "status": "pending",
+        "jobId": job["id"],
+        "clips": len(ranges),
+        "clipsToMeasure": len(loudness_analyzer.missing_ranges(ranges)),
+    })
+
+
+# 🚀 TTS 일괄 생성 (클립박스 "생성" / "전체 TTS")
+#    clips = 클립박스 클립 목록 (id, rawText, voiceDirecting, useGlobalVoice, voiceOverride), voice = 전역 음성 설정
+#    클립 순서대로 ready(src = /api/objects/<sha256>) | pending(jobId) | skipped(텍스트 없음), 하나라도 pending 이면 202
+#    진행 상황은 /api/jobs/{jobId} 또는 /api/events, 다시 보내면 끝난 줄은 ready 로
+class TTSBatchRequest(BaseModel):
+    clips: List[dict]
+    voice: dict = {}
+
+
+@app.post("/api/tts/generate")
+def generate_tts(body: TTSBatchRequest):
+    try:
+        results = tts_generator.submit_batch(body.clips, body.voice)
+    except TTSRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    pending = sum(1 for r in results if r["status"] == "pending")
+    content = {
+        "status": "pending" if pending else "ready",
+        "clips": results,
+        "pending": pending,
+        "cached": sum(1 for r in results if r["status"] == "ready"),
+    }
+    return JSONResponse(status_code=202 if pending else 200, content=content)
+
+
+# 🚀 이미지 일괄 생성 (클립박스 "생성" / "전체 IMG")
+#    clips = 클립박스 클립 목록 (id, imagePrompt), image = 전역 이미지 설정 (engine, style, aspectRatio, quality, defaultPrefix)
+#    클립 순서대로 ready(src = /api/objects/<sha256>) | pending(jobId) | skipped(프롬프트 없음), 하나라도 pending 이면 202
+class ImageBatchRequest(BaseModel):
+    clips: List[dict]
+    image: dict = {}
+
+
+@app.post("/api/image/generate")
+def generate_images(body: ImageBatchRequest):
+    try:
+        results = image_generator.submit_batch(body.clips, body.image)
+    except ImageRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    pending = sum(1 for r in results if r["status"] == "pending")
+    content = {
+        "status": "pending" if pending else "ready",
+        "clips": results,
+        "pending": pending,
+        "cached": sum(1 for r in results if r["status"] == "ready"),
+    }
+    return JSONResponse(status_code=202 if pending else 200, content=content)
+
+
+# 🚀 외부 API 키 풀 (API 관리 화면의 키 목록을 서버에 등록 → TTS / 이미지 생성이 호출마다 키를 골라 씀)
+#    service = azure | google | eleven (TTS), openai | stability (이미지), status = active | standby | error
+#    quota = 하루 호출 수 (0 = 제한 없음), ratePerMinute = 키별 분당 호출 수, 목록의 키 값은 앞뒤 4자만
+class ApiKeyRequest(BaseModel):
+    service: str
+    apiKey: Optional[str] = None   # 기존 키를 고칠 때 생략하면 그대로
+    status: str = "active"
+    accountName: str = ""
+    keyName: str = ""
+    memo: str = ""
+    quota: int = 0
+    ratePerMinute: float = DEFAULT_RATE_PER_MINUTE
+    usage: Optional[int] = None
+
+
+@app.get("/api/keys")
+def list_api_keys(service: Optional[str] = None):
+    return {"keys": key_pool.list_keys(service)}
+
+
+@app.get("/api/keys/stats")
+def get_api_key_stats():
+    return {"services": key_pool.stats()}
+
+
+@app.put("/api/keys/{key_id}")
+def put_api_key(key_id: str, body: ApiKeyRequest):
+    if body.status not in KEY_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(KEY_STATUSES)}")
+    if body.quota < 0 or body.ratePerMinute <= 0 or (body.usage is not None and body.usage < 0):
+        raise HTTPException(status_code=400, detail="quota / usage must be >= 0 and ratePerMinute > 0")
+    try:
+        return key_pool.upsert_key(
+            key_id, body.service, body.apiKey, body.status, body.accountName, body.keyName, body.memo,
+            body.quota, body.ratePerMinute, body.usage,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.delete("/api/keys/{key_id}")
+def delete_api_key(key_id: str):
+    if not key_pool.delete_key(key_id):
+        raise HTTPException(status_code=404, detail="key not found")
+    return {"status": "deleted", "id": key_id}
\ No newline at end of file
@@ -0,0 +1,102 @@
+# C:\wai-ui\backend\silence.py
+# 무음 구간 감지 (자동 트리밍 / "무음 제거" 용)
+# - 디코드된 PCM 을 고정 크기 블록(10ms)으로 흘려보내며 블록별 RMS 계산 → 메모리 사용량 일정 (한 시간 녹음도 동일)
+# - 임계값(진폭 비율, 프론트엔드 SILENT_THRESHOLD 와 같은 단위) 아래가 min_duration 이상 이어지면 무음 구간
+# - 결과는 내용 해시 + 파라미터 기준으로 디스크 캐시 (cache/silence/ab/<sha256>/t<임계값>_d<최소길이>.json)
+
+import math
+import operator
+import os
+
+import ffmpeg
+
+from audio_pcm import iter_pcm_blocks
+from jobs import PRIORITY_NORMAL, JobFailed
+from storage import read_result, write_error, write_result
+
+SILENCE_WORKERS = int(os.environ.get("WAI_SILENCE_WORKERS", "1"))
+SILENCE_DIR_NAME = os.path.join("cache", "silence")
+SILENCE_SAMPLE_RATE = 8000
+SILENCE_BLOCK = 80                 # 8000Hz 에서 80 샘플 = 10ms
+DEFAULT_THRESHOLD = 0.05
+DEFAULT_MIN_DURATION = 0.5
+
+
+def detect_silences(src_path, threshold=DEFAULT_THRESHOLD, min_duration=DEFAULT_MIN_DURATION, job=None, duration=None):
+    # 반환: (전체 길이, [{"start", "end"}, ...]) - 구간 목록 외에는 블록 하나만 메모리에 둠
+    limit = (threshold * 32768) ** 2
+    intervals = []
+    silent_since = None
+    position = 0
+    for block in iter_pcm_blocks(src_path, SILENCE_SAMPLE_RATE, SILENCE_BLOCK):
+        mean_square = sum(map(operator.mul, block, block)) / len(block)
+        if mean_square < limit:
+            if silent_since is None:
+                silent_since = position
+        elif silent_since is not None:
+            add_interval(intervals, silent_since, position, min_duration)
+            silent_since = None
+        position += len(block)
+        if job is not None:
+            job.check_cancelled()
+            if duration:
+                job.set_progress(position / SILENCE_SAMPLE_RATE / duration)
+    if silent_since is not None:
+        add_interval(intervals, silent_since, position, min_duration)
+    return position / SILENCE_SAMPLE_RATE, intervals
+
+
+def add_interval(intervals, start_sample, end_sample, min_duration):
+    start = start_sample / SILENCE_SAMPLE_RATE
+    end = end_sample / SILENCE_SAMPLE_RATE
+    if end - start >= min_duration:
+        intervals.append({"start": round(start, 3), "end": round(end, 3)})
+
+
+class SilenceDetector:
+    def __init__(self, upload_dir, asset_store, job_queue, workers=SILENCE_WORKERS):
+        self.silence_dir = os.path.join(upload_dir, SILENCE_DIR_NAME)
+        self.asset_store = asset_store
+        self.job_queue = job_queue
+        job_queue.register("silence", self._run, concurrency=workers)
+
+    def _base_path(self, sha256, threshold, min_duration):
+        return os.path.join(self.silence_dir, sha256[:2], sha256, f"t{threshold:g}_d{min_duration:g}")
+
+    def get_result(self, sha256, threshold, min_duration):
+        # 완료된 결과 / 실패 기록 / 없음(None)
+        return read_result(self._base_path(sha256, threshold, min_duration))
+
+    def submit(self, sha256, threshold, min_duration, duration=None):
+        job, _ = self.job_queue.enqueue(
+            "silence",
+            {"hash": sha256, "threshold": threshold, "minDuration": min_duration, "duration": duration},
+            key=f"silence:{sha256}:{threshold:g}:{min_duration:g}", priority=PRIORITY_NORMAL,
+        )
+        return job
+
+    def _run(self, job):
+        sha256, threshold, min_duration = job.payload["hash"], job.payload["threshold"], job.payload["minDuration"]
+        base = self._base_path(sha256, threshold, min_duration)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        try:
+            duration, intervals = detect_silences(
+                self.asset_store.object_path(sha256), threshold, min_duration, job, job.payload["duration"],
+            )
+        except ffmpeg.Error as e:
+            message = e.stderr.decode("utf-8", "replace")[-500:]
+            write_error(base, message)
+            print(f"❌ 무음 감지 실패: {sha256[:12]}")
+            raise JobFailed(message)
+
+        result = {
+            "status": "ready",
+            "threshold": threshold,
+            "minDuration": min_duration,
+            "duration": round(duration, 3),
+            "silentDuration": round(math.fsum(i["end"] - i["start"] for i in intervals), 3),
+            "intervals": intervals,
+        }
+        write_result(base, result)
+        print(f"🔇 무음 감지 완료: {sha256[:12]} ({len(intervals)}구간, {result['silentDuration']}s)")
+        return {"intervals": len(intervals), "silentDuration": result["silentDuration"]}
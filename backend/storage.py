@@ -0,0 +1,64 @@
+# C:\wai-ui\backend\storage.py
+# 여러 모듈이 같이 쓰는 저장 도우미
+# - LocalConnection: SQLite(WAL) 연결을 스레드마다 하나씩 (카탈로그 / 작업 큐 / API 키 풀)
+# - 분석 결과 디스크 캐시: <base>.json (완료) / <base>.error (실패 기록) (스프라이트 / 파형 / 무음 / 장면 / 프록시 / 라우드니스 / TTS / 이미지 생성)
+
+import json
+import os
+import sqlite3
+import threading
+
+
+class LocalConnection:
+    # sqlite3 연결은 스레드마다 따로 (작업 워커 / 디스크 I/O 풀 / starlette 스레드 풀에서 동시에 호출됨)
+    # 호출하면 현재 스레드의 연결을 돌려줌: self._conn = LocalConnection(path) → self._conn().execute(...)
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+
+    def __call__(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+
+def read_json(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def read_result(base):
+    # 완료된 결과 / 실패 기록 / 없음(None)
+    for suffix in (".json", ".error"):
+        result = read_json(base + suffix)
+        if result is not None:
+            return result
+    return None
+
+
+def write_result(base, result):
+    # 임시 파일에 쓰고 교체 → 읽는 쪽은 항상 완성된 JSON 만 봄
+    # 임시 파일 이름은 스레드마다 다르게 (같은 결과를 두 스레드가 동시에 써도 서로의 임시 파일을 덮지 않음)
+    os.makedirs(os.path.dirname(base), exist_ok=True)
+    tmp_path = f"{base}.{threading.get_ident()}.json.tmp"
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(result, f)
+        os.replace(tmp_path, base + ".json")
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_error(base, message):
+    with open(base + ".error", "w", encoding="utf-8") as f:
+        json.dump({"status": "error", "error": message}, f)
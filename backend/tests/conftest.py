@@ -0,0 +1,62 @@
+# backend 모듈(catalog, jobs, ...)을 그대로 import 할 수 있도록
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+requires_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+
+def lavfi(dest, *inputs, options=()):
+    # ffmpeg 가상 입력(testsrc2 / sine)으로 테스트용 미디어 생성 → 저장소에 바이너리 파일을 두지 않음
+    args = ["ffmpeg", "-nostdin", "-loglevel", "error", "-y"]
+    for source in inputs:
+        args += ["-f", "lavfi", "-i", source]
+    subprocess.run(args + list(options) + [str(dest)], check=True)
+    return str(dest)
+
+
+@pytest.fixture(scope="session")
+def sample_video(tmp_path_factory):
+    # 3초, 320x240 30fps 영상 + 440Hz 소리
+    return lavfi(
+        tmp_path_factory.mktemp("media") / "sample.mp4",
+        "testsrc2=size=320x240:rate=30:duration=3", "sine=frequency=440:duration=3",
+        options=("-c:v", "libx264", "-g", "30", "-pix_fmt", "yuv420p", "-c:a", "aac", "-shortest"),
+    )
+
+
+@pytest.fixture(scope="session")
+def server_app(tmp_path_factory):
+    # server.py 는 작업 폴더 기준 상대 경로 uploaded_files/ 를 씀 → 임시 폴더에서 한 번만 import
+    # 작업 워커(데몬 스레드)는 세션이 끝날 때까지 그 경로를 쓰므로 작업 폴더는 되돌리지 않음
+    os.chdir(tmp_path_factory.mktemp("server"))
+    import server
+    return server
+
+
+@pytest.fixture(scope="session")
+def client(server_app):
+    # lifespan(작업 워커 시작 / 종료 정리)은 테스트 세션 동안 한 번
+    from fastapi.testclient import TestClient
+    with TestClient(server_app.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def wait_job(client):
+    # 작업이 끝날 때까지 /api/jobs/{id} 를 확인 → 마지막 상태
+    def wait(job_id, timeout=20):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = client.get(f"/api/jobs/{job_id}").json()
+            if job["status"] not in ("queued", "running"):
+                return job
+            time.sleep(0.05)
+        raise AssertionError(f"job {job_id} did not finish")
+    return wait
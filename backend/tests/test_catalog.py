@@ -0,0 +1,82 @@
+import random
+
+import pytest
+
+from catalog import AssetCatalog, decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    return AssetCatalog(str(tmp_path / "catalog.db"))
+
+
+@pytest.fixture
+def assets(catalog):
+    # 대소문자만 다른 이름 / 같은 추가일이 섞인 200개 → 정렬값이 같은 행은 id 로 순서가 정해져야 함
+    rng = random.Random(7)
+    words = ["alpha", "Beta", "gamma", "DELTA", "echo", "Zulu", "_under", "10", "9"]
+    names = set()
+    while len(names) < 200:
+        word = rng.choice(words)
+        name = f"{word}{rng.randint(0, 40)}.mp4"
+        names.add("".join(c.upper() if rng.random() < 0.5 else c for c in name))
+    added = []
+    for i, name in enumerate(sorted(names)):
+        added.append(catalog.add_asset(name, f"{i:064x}", 100 + i, date_added=1_700_000_000_000 + rng.randint(0, 20)))
+    return added
+
+
+def list_all(catalog, page_size, **options):
+    items, cursor, pages = [], None, 0
+    while True:
+        page = catalog.list_assets(limit=page_size, cursor=cursor, **options)
+        if cursor is None:
+            assert page["total"] == 200
+        items.extend(page["items"])
+        pages += 1
+        cursor = page["nextCursor"]
+        if cursor is None:
+            return items, pages
+
+
+@pytest.mark.parametrize("sort, ascending", [("name", True), ("name", False), ("date", True), ("date", False)])
+@pytest.mark.parametrize("page_size", [1, 7, 50, 200])
+def test_cursor_paging_matches_full_sort(catalog, assets, sort, ascending, page_size):
+    if sort == "name":
+        expected = sorted(assets, key=lambda a: (a["name"].lower(), a["id"]), reverse=not ascending)
+    else:
+        expected = sorted(assets, key=lambda a: (a["dateAdded"], a["id"]), reverse=not ascending)
+    items, pages = list_all(catalog, page_size, sort=sort, ascending=ascending)
+    assert [a["id"] for a in items] == [a["id"] for a in expected]
+    assert pages == -(-200 // page_size)
+
+
+def test_cursor_paging_with_filters(catalog, assets):
+    query = "alpha"
+    expected = sorted(
+        (a for a in assets if query in a["name"].lower()), key=lambda a: (a["name"].lower(), a["id"])
+    )
+    page = catalog.list_assets(query=query, asset_type="video", limit=3)
+    assert page["total"] == len(expected)
+    items = page["items"]
+    while page["nextCursor"]:
+        page = catalog.list_assets(query=query, asset_type="video", limit=3, cursor=page["nextCursor"])
+        assert page["total"] is None
+        items.extend(page["items"])
+    assert [a["id"] for a in items] == [a["id"] for a in expected]
+
+
+def test_like_wildcards_are_literal(catalog, assets):
+    names = {a["name"] for a in catalog.list_assets(query="_", limit=500)["items"]}
+    assert names == {a["name"] for a in assets if "_" in a["name"]}
+
+
+def test_cursor_round_trip():
+    assert decode_cursor(encode_cursor("Clip 한글.mp4", "abc")) == ("Clip 한글.mp4", "abc")
+
+
+def test_add_asset_renames_on_conflict(catalog):
+    first = catalog.add_asset("clip.mp4", "a" * 64, 10)
+    assert catalog.add_asset("clip.mp4", "a" * 64, 10)["id"] == first["id"]
+    assert catalog.add_asset("clip.mp4", "b" * 64, 10)["name"] == "clip (1).mp4"
+    assert catalog.add_asset("clip.mp4", "c" * 64, 10)["name"] == "clip (2).mp4"
@@ -0,0 +1,78 @@
+import asyncio
+import json
+import threading
+
+import events
+from events import EventHub, Subscriber, format_event
+
+
+def test_coalesces_by_key_in_first_seen_order():
+    subscriber = Subscriber()
+    subscriber.put("job", "job:1", {"progress": 0.1})
+    subscriber.put("asset", "asset:9", {"event": "added"})
+    subscriber.put("job", "job:1", {"progress": 0.8})
+    assert subscriber.drain() == [("job", {"progress": 0.8}), ("asset", {"event": "added"})]
+    assert subscriber.drain() == []
+    assert not subscriber.wakeup.is_set()
+
+
+def test_topic_filter():
+    subscriber = Subscriber(["upload"])
+    subscriber.put("job", "job:1", {})
+    assert not subscriber.wakeup.is_set()
+    subscriber.put("upload", "upload:1", {"offset": 10})
+    assert subscriber.drain() == [("upload", {"offset": 10})]
+
+
+def test_overflow_sends_resync_once(monkeypatch):
+    monkeypatch.setattr(events, "MAX_PENDING_KEYS", 3)
+    subscriber = Subscriber()
+    for i in range(4):
+        subscriber.put("job", f"job:{i}", {"i": i})
+    subscriber.put("job", "job:late", {"i": "late"})
+    assert subscriber.drain() == [("resync", {}), ("job", {"i": "late"})]
+    subscriber.put("job", "job:next", {})
+    assert subscriber.drain() == [("job", {})]
+
+
+def test_format_event():
+    assert format_event("job", {"name": "내보내기"}, 7) == 'id: 7\nevent: job\ndata: {"name": "내보내기"}\n\n'
+
+
+class FakeRequest:
+    def __init__(self):
+        self.disconnected = False
+
+    async def is_disconnected(self):
+        return self.disconnected
+
+
+def test_stream_delivers_latest_state_from_worker_threads(monkeypatch):
+    monkeypatch.setattr(events, "FLUSH_INTERVAL", 0.01)
+
+    async def run():
+        hub = EventHub()
+        hub.attach(asyncio.get_running_loop())
+        request = FakeRequest()
+        stream = hub.stream(request, ["job"])
+        assert await stream.__anext__() == "retry: 3000\n\n"
+
+        def work():
+            # 작업 워커 스레드에서 진행률을 연달아 발행
+            for progress in (0.1, 0.5, 0.9):
+                hub.on_job_event({"id": "j1", "progress": progress})
+            hub.on_catalog_event("added", {"id": "a1"})
+
+        thread = threading.Thread(target=work)
+        thread.start()
+        thread.join()
+        chunk = await stream.__anext__()
+        request.disconnected = True
+        await stream.aclose()
+        return chunk
+
+    chunk = asyncio.run(run())
+    assert chunk.count("event: ") == 1
+    assert "event: job\n" in chunk
+    data = json.loads(chunk.split("data: ", 1)[1])
+    assert data == {"id": "j1", "progress": 0.9}
@@ -0,0 +1,142 @@
+import copy
+from urllib.parse import quote
+
+import pytest
+
+import export
+from export import TimelineError, compile_timeline, segment_key, segment_layers, split_segments
+
+SOURCES = {
+    "/api/objects/aaa": ("a" * 64, "/uploads/objects/aa/aaa", {"audio_codec": "aac"}),
+    "/api/objects/bbb": ("b" * 64, "/uploads/objects/bb/bbb", {}),
+    "/api/files/renamed.mp4": ("a" * 64, "/uploads/renamed.mp4", {"audio_codec": "aac"}),
+}
+
+
+@pytest.fixture(autouse=True)
+def drawtext(monkeypatch):
+    monkeypatch.setattr(export, "has_filter", lambda name: True)
+
+
+def timeline(**changes):
+    # 30초: 0~25초 영상 A, 12~14초 영상 B (위 트랙), 자막 박스
+    state = {
+        "canvasSize": {"w": 1280, "h": 720},
+        "tracks": [{"id": "t2"}, {"id": "t1"}],
+        "clips": [
+            {"id": "c1", "trackId": "t1", "type": "video", "src": "/api/objects/aaa", "start": 0, "duration": 25},
+            {"id": "c2", "trackId": "t2", "type": "video", "src": "/api/objects/bbb", "start": 12, "duration": 2},
+            {"id": "c3", "trackId": "t1", "type": "video", "src": "/api/objects/aaa", "start": 25, "duration": 5,
+             "startOffset": 3},
+        ],
+        "canvasBoxes": [
+            {"id": "b1", "x": 0, "y": 600, "w": 1280, "h": 120, "rowType": "TXT", "textContent": "hello",
+             "textStyle": {"fontSize": 40}},
+        ],
+    }
+    for path, value in changes.items():
+        target = state
+        *parents, last = path.split(".")
+        for part in parents:
+            target = target[int(part)] if part.isdigit() else target[part]
+        target[int(last) if last.isdigit() else last] = value
+    return state
+
+
+def keys(state, **options):
+    plan = compile_timeline(copy.deepcopy(state), SOURCES.get)
+    return [segment_key(plan, segment_layers(plan, first, end), end - first, **options)
+            for first, end in split_segments(plan)]
+
+
+def changed(before, after):
+    return [i for i, (a, b) in enumerate(zip(before, after)) if a != b]
+
+
+def test_segments_cover_timeline():
+    plan = compile_timeline(timeline(), SOURCES.get)
+    segments = split_segments(plan)
+    assert segments == [(0, 300), (300, 600), (600, 900)]
+    assert len(set(keys(timeline()))) == 3
+
+
+def test_keys_are_stable():
+    assert keys(timeline()) == keys(timeline())
+
+
+def test_clip_edit_invalidates_only_overlapping_segments():
+    base = keys(timeline())
+    assert changed(base, keys(timeline(**{"clips.1.start": 13}))) == [1]
+    assert changed(base, keys(timeline(**{"clips.1.src": "/api/objects/aaa"}))) == [1]
+    assert changed(base, keys(timeline(**{"clips.2.startOffset": 4}))) == [2]
+    # 10초 경계를 넘기면 두 구간 모두
+    assert changed(base, keys(timeline(**{"clips.1.start": 9}))) == [0, 1]
+
+
+def test_text_edit_invalidates_segments_showing_it():
+    base = keys(timeline())
+    assert changed(base, keys(timeline(**{"canvasBoxes.0.textContent": "hello!"}))) == [0, 1, 2]
+    assert changed(base, keys(timeline(**{"canvasBoxes.0.textStyle": {"fontSize": 41}}))) == [0, 1, 2]
+
+
+def test_same_content_under_another_path_hits_cache():
+    assert keys(timeline(**{"clips.0.src": "/api/files/renamed.mp4"})) == keys(timeline())
+
+
+def test_muting_does_not_touch_video_segments():
+    assert keys(timeline(**{"clips.0.isMuted": True})) == keys(timeline())
+
+
+def test_encoder_and_version_invalidate_everything(monkeypatch):
+    base = keys(timeline())
+    assert changed(base, keys(timeline(), output_options={"g": 30})) == [0, 1, 2]
+    assert changed(base, keys(timeline(), encoder=dict(export.ENCODER_SETTINGS, crf=23))) == [0, 1, 2]
+    monkeypatch.setattr(export, "SEGMENT_CACHE_VERSION", export.SEGMENT_CACHE_VERSION + 1)
+    assert changed(base, keys(timeline())) == [0, 1, 2]
+
+
+def test_canvas_change_invalidates_everything():
+    base = keys(timeline())
+    assert changed(base, keys(timeline(canvasSize={"w": 1920, "h": 1080}))) == [0, 1, 2]
+
+
+def test_unresolvable_source():
+    with pytest.raises(TimelineError):
+        compile_timeline(timeline(**{"clips.0.src": "blob:abc"}), SOURCES.get)
+
+
+@pytest.mark.parametrize("path, value", [
+    ("clips.0.start", "soon"),
+    ("clips.0.duration", [5]),
+    ("clips.1.playbackSpeed", "fast"),
+    ("clips.1.playbackSpeed", -1),
+    ("clips.2.volume", {"level": 1}),
+    ("clips.2.startOffset", "nan"),
+    ("canvasSize.w", "wide"),
+    ("canvasBoxes.0.x", "left"),
+    ("canvasBoxes.0.zIndex", "top"),
+    ("clips.0", "not a clip"),
+])
+def test_bad_numbers_are_timeline_errors(path, value):
+    with pytest.raises(TimelineError):
+        compile_timeline(timeline(**{path: value}), SOURCES.get)
+
+
+def test_numeric_strings_are_accepted():
+    plan = compile_timeline(timeline(**{"clips.0.start": "0", "clips.0.duration": "25"}), SOURCES.get)
+    assert plan["duration"] == 30
+
+
+def test_bad_number_is_rejected_over_http(client):
+    body = {"tracks": [{"id": "t1"}], "clips": [{"id": "c1", "trackId": "t1", "type": "video",
+                                                 "src": "/api/objects/" + "a" * 64, "start": "x", "duration": 1}]}
+    response = client.post("/api/exports", json=body)
+    assert response.status_code == 422
+    assert "clip c1 start must be a number" in response.json()["detail"]
+
+
+def test_files_src_is_url_decoded(client, server_app):
+    data = b"encoded name"
+    stored = client.post("/api/upload", files={"file": ("내 영상 (1).mp4", data)}).json()
+    resolved = server_app.timeline_exporter.resolve_source(f"/api/files/{quote(stored['filename'])}")
+    assert resolved is not None and resolved[0] == stored["hash"]
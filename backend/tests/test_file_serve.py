@@ -0,0 +1,76 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from file_serve import file_response
+
+ETAG = '"abc123"'
+CONTENT = bytes(range(256)) * 40
+
+
+@pytest.fixture
+def client(tmp_path):
+    path = tmp_path / "clip.mp4"
+    path.write_bytes(CONTENT)
+    app = FastAPI()
+
+    @app.api_route("/file", methods=["GET", "HEAD"])
+    def serve(request: Request):
+        return file_response(request, str(path), ETAG, "내 클립.mp4")
+
+    return TestClient(app)
+
+
+def test_full_response_headers(client):
+    r = client.get("/file")
+    assert r.status_code == 200
+    assert r.content == CONTENT
+    assert r.headers["etag"] == ETAG
+    assert r.headers["accept-ranges"] == "bytes"
+    assert r.headers["content-type"] == "video/mp4"
+    assert r.headers["content-disposition"] == "inline; filename*=UTF-8''%EB%82%B4%20%ED%81%B4%EB%A6%BD.mp4"
+
+
+@pytest.mark.parametrize("header, start, end", [
+    ("bytes=10-19", 10, 19),
+    ("bytes=10000-", 10000, len(CONTENT) - 1),
+    ("bytes=-100", len(CONTENT) - 100, len(CONTENT) - 1),
+    ("bytes=9000-99999", 9000, len(CONTENT) - 1),
+])
+def test_range(client, header, start, end):
+    r = client.get("/file", headers={"Range": header})
+    assert r.status_code == 206
+    assert r.headers["content-range"] == f"bytes {start}-{end}/{len(CONTENT)}"
+    assert r.content == CONTENT[start:end + 1]
+
+
+def test_unsatisfiable_range(client):
+    r = client.get("/file", headers={"Range": f"bytes={len(CONTENT)}-"})
+    assert r.status_code == 416
+    assert r.headers["content-range"] == f"bytes */{len(CONTENT)}"
+
+
+def test_if_none_match(client):
+    for header in (ETAG, f'W/{ETAG}', f'"other", {ETAG}', "*"):
+        r = client.get("/file", headers={"If-None-Match": header})
+        assert r.status_code == 304
+        assert r.content == b""
+        assert r.headers["etag"] == ETAG
+    assert client.get("/file", headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_if_range(client):
+    # 클라이언트 사본이 최신이면 부분만, 내용이 바뀌었으면 전체
+    r = client.get("/file", headers={"Range": "bytes=0-9", "If-Range": ETAG})
+    assert r.status_code == 206
+    assert r.content == CONTENT[:10]
+    r = client.get("/file", headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert r.status_code == 200
+    assert r.content == CONTENT
+
+
+def test_head_range(client):
+    r = client.head("/file", headers={"Range": "bytes=10-19"})
+    assert r.status_code == 206
+    assert r.headers["content-length"] == "10"
+    assert r.content == b""
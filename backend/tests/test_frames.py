@@ -0,0 +1,52 @@
+import pytest
+
+from conftest import requires_ffmpeg
+from frames import FrameCache, FrameServer, frame_width
+
+JPEG_START = b"\xff\xd8"
+
+
+def test_cache_evicts_least_recently_used_by_bytes():
+    cache = FrameCache(max_bytes=10)
+    cache.put("a", b"1234")
+    cache.put("b", b"1234")
+    assert cache.get("a") == b"1234"        # a 를 최근 사용으로
+    cache.put("c", b"1234")                 # 12 > 10 → 가장 오래된 b 가 밀려남
+    assert cache.get("b") is None
+    assert cache.stats() == {"frames": 2, "bytes": 8, "maxBytes": 10}
+    cache.put("a", b"12")                   # 같은 키 교체는 크기를 다시 계산
+    assert cache.stats()["bytes"] == 6
+
+
+def test_frame_width_is_clamped_and_even():
+    assert frame_width(10) == 64
+    assert frame_width(641) == 640
+    assert frame_width(10_000) == 1920
+
+
+@pytest.fixture
+def server():
+    frame_server = FrameServer(max_bytes=64 * 1024 * 1024)
+    yield frame_server
+    frame_server.close()
+
+
+@requires_ffmpeg
+def test_scrub_forward_and_backward(server, sample_video):
+    t, first = server.get_frame("v", sample_video, 1.0, width=160, duration=3)
+    assert t == 1.0 and first.startswith(JPEG_START)
+    # 조금 앞은 같은 디코더를 이어서 읽음
+    t, later = server.get_frame("v", sample_video, 1.2, width=160, duration=3)
+    assert t == pytest.approx(1.2) and later != first
+    assert server.stats()["decoders"] == 1
+    # 다시 요청하면 캐시
+    assert server.get_frame("v", sample_video, 1.0, width=160, duration=3) == (1.0, first)
+    # 뒤로 / 멀리 뛰어도 정확한 프레임
+    t, early = server.get_frame("v", sample_video, 0.1, width=160, duration=3)
+    assert t == pytest.approx(0.1) and early.startswith(JPEG_START) and early != first
+
+
+@requires_ffmpeg
+def test_past_the_end_returns_last_frame(server, sample_video):
+    t, frame = server.get_frame("v", sample_video, 99, width=160, duration=3)
+    assert t == pytest.approx(89 / 30) and frame.startswith(JPEG_START)
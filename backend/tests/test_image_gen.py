@@ -0,0 +1,39 @@
+import os
+
+from image_gen import image_key, resolve_request
+
+SETTINGS = {"engine": "fake", "style": "ghibli", "aspectRatio": "16:9", "defaultPrefix": "cinematic,"}
+
+
+def test_resolve_request_prefix_and_defaults():
+    request = resolve_request({"defaultPrefix": " soft light "}, {"imagePrompt": " a cat "})
+    assert request["prompt"] == "soft light a cat"
+    assert request["style"] == "ghibli" and request["aspectRatio"] == "9:16"
+    assert image_key(request) != image_key(dict(request, aspectRatio="1:1"))
+
+
+def test_generate_then_cached(client, server_app, wait_job):
+    clips = [{"id": "c1", "imagePrompt": "a quiet harbour"}, {"id": "c2", "imagePrompt": ""}]
+    response = client.post("/api/image/generate", json={"clips": clips, "image": SETTINGS})
+    assert response.status_code == 202
+    first, skipped = response.json()["clips"]
+    assert skipped == {"clipId": "c2", "status": "skipped"}
+    assert wait_job(first["jobId"])["status"] == "done"
+
+    base = server_app.image_generator._base_path(first["key"])
+    assert os.path.exists(base + ".json")
+    assert not [name for name in os.listdir(os.path.dirname(base)) if name.endswith(".tmp")]
+
+    response = client.post("/api/image/generate", json={"clips": clips, "image": SETTINGS})
+    assert response.status_code == 200
+    ready = response.json()["clips"][0]
+    assert ready["status"] == "ready" and ready["aspectRatio"] == "16:9"
+    image = client.get(ready["src"])
+    assert image.status_code == 200 and image.content.startswith(b"\x89PNG")
+
+
+def test_bad_request(client):
+    clips = [{"id": "c1", "imagePrompt": "x"}]
+    assert client.post("/api/image/generate", json={"clips": clips, "image": {"engine": "nope"}}).status_code == 400
+    bad_ratio = dict(SETTINGS, aspectRatio="3:2")
+    assert client.post("/api/image/generate", json={"clips": clips, "image": bad_ratio}).status_code == 400
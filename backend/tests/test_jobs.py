@@ -0,0 +1,234 @@
+import sqlite3
+
+import pytest
+
+import jobs
+from jobs import JobDeferred, JobFailed, JobQueue
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.db")
+
+
+@pytest.fixture
+def queue(db_path, monkeypatch):
+    # 재시도 대기 없이 바로 다시 가져올 수 있도록
+    monkeypatch.setattr(jobs, "RETRY_BASE_SECONDS", 0)
+    return JobQueue(db_path, workers=0)
+
+
+def run_next(queue):
+    # 워커 스레드 없이 작업 하나를 가져와 실행 (_worker 한 바퀴와 같음)
+    row = queue._claim()
+    if row is None:
+        return None
+    try:
+        queue._execute(row)
+    finally:
+        queue._running[row["kind"]] -= 1
+    return queue.get(row["id"])
+
+
+def test_retry_then_success(queue):
+    calls = []
+
+    def handler(job):
+        calls.append(job.attempt)
+        if len(calls) == 1:
+            raise RuntimeError("flaky")
+        return {"ok": True}
+
+    queue.register("flaky", handler)
+    job, created = queue.enqueue("flaky", {"n": 1})
+    assert created
+    first = run_next(queue)
+    assert first["status"] == "queued"
+    assert first["error"] == "flaky"
+    second = run_next(queue)
+    assert second["status"] == "done"
+    assert second["result"] == {"ok": True}
+    assert second["attempts"] == 2
+    assert calls == [1, 2]
+
+
+def test_fails_after_max_attempts(queue):
+    def handler(job):
+        raise RuntimeError("broken")
+
+    queue.register("broken", handler, max_attempts=2)
+    queue.enqueue("broken", {})
+    assert run_next(queue)["status"] == "queued"
+    job = run_next(queue)
+    assert job["status"] == "failed"
+    assert job["attempts"] == 2
+    assert run_next(queue) is None
+
+
+def test_job_failed_is_not_retried(queue):
+    def handler(job):
+        raise JobFailed("bad input")
+
+    queue.register("bad", handler)
+    queue.enqueue("bad", {})
+    job = run_next(queue)
+    assert (job["status"], job["error"], job["attempts"]) == ("failed", "bad input", 1)
+
+
+def test_deferred_job_keeps_attempts(queue):
+    def handler(job):
+        raise JobDeferred(60)
+
+    queue.register("later", handler, max_attempts=1)
+    job, _ = queue.enqueue("later", {})
+    deferred = run_next(queue)
+    assert deferred["status"] == "queued"
+    assert deferred["attempts"] == 0
+    # run_after 가 미래 → 지금은 가져갈 작업 없음
+    assert run_next(queue) is None
+
+
+def test_enqueue_dedupes_by_key(queue):
+    queue.register("probe", lambda job: None)
+    job, created = queue.enqueue("probe", {}, key="probe:x", priority=jobs.PRIORITY_LOW)
+    again, created_again = queue.enqueue("probe", {}, key="probe:x", priority=jobs.PRIORITY_HIGH)
+    assert created and not created_again
+    assert again["id"] == job["id"]
+    assert again["priority"] == jobs.PRIORITY_HIGH
+
+
+def test_cancel_queued(queue):
+    queue.register("noop", lambda job: None)
+    job, _ = queue.enqueue("noop", {})
+    assert queue.cancel(job["id"])["status"] == "cancelled"
+    assert run_next(queue) is None
+    assert queue.cancel("missing") is None
+
+
+def test_cancel_running(queue):
+    def handler(job):
+        queue.cancel(job.id)
+        job.check_cancelled()
+        return "unreachable"
+
+    queue.register("long", handler)
+    queue.enqueue("long", {})
+    job = run_next(queue)
+    assert job["status"] == "cancelled"
+    assert not queue.is_cancel_requested(job["id"])
+
+
+def test_concurrency_limit(queue):
+    queue.register("proxy", lambda job: None, concurrency=1)
+    queue.enqueue("proxy", {"n": 1})
+    queue.enqueue("proxy", {"n": 2})
+    row = queue._claim()
+    assert row is not None
+    assert queue._claim() is None
+    queue._running["proxy"] -= 1
+    assert queue._claim() is not None
+
+
+def test_delete_runs_cleanup(queue):
+    cleaned = []
+    queue.register("export", lambda job: "out", cleanup=cleaned.append)
+    job, _ = queue.enqueue("export", {})
+    assert queue.delete(job["id"]) is False
+    run_next(queue)
+    assert queue.delete(job["id"]) is True
+    assert queue.get(job["id"]) is None
+    assert cleaned == [job["id"]]
+    assert queue.delete(job["id"]) is None
+
+
+def test_recovery_after_restart(db_path):
+    # 실행 중에 서버가 죽은 상황: running 으로 남은 작업들
+    before = JobQueue(db_path, workers=0)
+    for kind, max_attempts in (("resume", 3), ("crashy", 1), ("stop", 3)):
+        before.register(kind, lambda job: None, max_attempts=max_attempts)
+        before.enqueue(kind, {})
+        assert before._claim()["kind"] == kind
+    stop = before.list_jobs(kind="stop")[0]
+    before.cancel(stop["id"])
+
+    after = JobQueue(db_path, workers=0)
+    for kind in ("resume", "crashy", "stop"):
+        after.register(kind, lambda job: "ok")
+    after.start()
+    resumed = after.list_jobs(kind="resume")[0]
+    crashed = after.list_jobs(kind="crashy")[0]
+    assert resumed["status"] == "queued"
+    assert (crashed["status"], crashed["error"]) == ("failed", "interrupted by server restart")
+    assert after.get(stop["id"])["status"] == "cancelled"
+    assert run_next(after)["status"] == "done"
+    assert run_next(after) is None
+
+
+def test_idle_wait_ignores_kinds_at_their_limit(queue):
+    queue.register("proxy", lambda job: None, concurrency=1)
+    queue.register("later", lambda job: None)
+    queue.enqueue("proxy", {"n": 1})
+    queue.enqueue("proxy", {"n": 2})
+    assert queue._next_due_seconds() == 0.05
+    queue._claim()
+    # 밀린 proxy 작업은 실행 중인 작업이 끝날 때 깨워 주므로 빈 워커는 쉬어도 됨
+    assert queue._next_due_seconds() == jobs.IDLE_WAIT_SECONDS
+    later, _ = queue.enqueue("later", {})
+    queue._conn().execute("UPDATE jobs SET run_after = ? WHERE id = ?", (jobs.now_ms() + 2000, later["id"]))
+    assert 1 < queue._next_due_seconds() <= 2
+
+
+class FlakyConnection:
+    # 작업 상태 UPDATE 를 처음 failures 번은 "database is locked" 로 실패시킴
+    def __init__(self, conn, failures):
+        self._conn = conn
+        self.failures = failures
+
+    def execute(self, sql, params=()):
+        if sql.startswith("UPDATE jobs SET status") and self.failures > 0:
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return self._conn.execute(sql, params)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+@pytest.fixture
+def flaky(queue, monkeypatch):
+    monkeypatch.setattr(jobs, "STATUS_WRITE_RETRY_SECONDS", 0)
+    connection = FlakyConnection(queue._conn(), 0)
+    monkeypatch.setattr(queue, "_conn", lambda: connection)
+    return connection
+
+
+def run_worker_step(queue, flaky, failures):
+    # _worker 한 바퀴: 작업을 가져온 뒤의 상태 기록을 failures 번 실패시키고, 실패는 워커가 처리하는 그대로
+    row = queue._claim()
+    flaky.failures = failures
+    try:
+        queue._execute(row)
+    except sqlite3.Error as e:
+        queue._release(row, e)
+    finally:
+        queue._running[row["kind"]] -= 1
+    return queue.get(row["id"])
+
+
+def test_status_write_is_retried(queue, flaky):
+    queue.register("noop", lambda job: "ok")
+    queue.enqueue("noop", {})
+    assert run_worker_step(queue, flaky, jobs.STATUS_WRITE_ATTEMPTS - 1)["status"] == "done"
+
+
+def test_unwritable_status_is_requeued_not_left_running(queue, flaky):
+    queue.register("peaks", lambda job: "ok", max_attempts=2)
+    job, _ = queue.enqueue("peaks", {}, key="peaks:x")
+    released = run_worker_step(queue, flaky, jobs.STATUS_WRITE_ATTEMPTS)
+    assert released["status"] == "queued"
+    assert "status write failed" in released["error"]
+    # key 를 붙잡고 있지 않음 → 같은 key 로 다시 넣으면 그 작업이 다시 실행됨
+    assert queue.enqueue("peaks", {}, key="peaks:x")[0]["id"] == job["id"]
+    queue._conn().execute("UPDATE jobs SET run_after = 0 WHERE id = ?", (job["id"],))
+    assert run_worker_step(queue, flaky, jobs.STATUS_WRITE_ATTEMPTS)["status"] == "failed"
+    assert queue.enqueue("peaks", {}, key="peaks:x")[1]
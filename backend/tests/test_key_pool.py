@@ -0,0 +1,115 @@
+import pytest
+
+from jobs import JobDeferred, JobFailed
+from key_pool import KeyPool, KeyPoolExhausted, KeyQuotaExceeded, KeyRateLimited, KeyRejected
+
+
+@pytest.fixture
+def pool(tmp_path):
+    return KeyPool(str(tmp_path / "keys.db"))
+
+
+def echo(api_key):
+    return api_key
+
+
+def test_rotation_then_standby(pool):
+    # active 두 키를 번갈아 쓰다가 할당량을 다 쓰면 standby 키로
+    pool.upsert_key("a", "tts", api_key="KEY-A", quota=2)
+    pool.upsert_key("b", "tts", api_key="KEY-B", quota=2)
+    pool.upsert_key("c", "tts", api_key="KEY-C", status="standby")
+    used = [pool.call("tts", echo) for _ in range(6)]
+    assert used == ["KEY-A", "KEY-B", "KEY-A", "KEY-B", "KEY-C", "KEY-C"]
+    usage = {k["id"]: k["usage"] for k in pool.list_keys("tts")}
+    assert usage == {"a": 2, "b": 2, "c": 2}
+
+
+def test_no_usable_key(pool):
+    pool.upsert_key("a", "tts", api_key="KEY-A", quota=1)
+    pool.call("tts", echo)
+    with pytest.raises(KeyPoolExhausted):
+        pool.call("tts", echo)
+
+
+def test_quota_error_marks_key_exhausted(pool):
+    pool.upsert_key("a", "img", api_key="KEY-A")
+    pool.upsert_key("b", "img", api_key="KEY-B", status="standby")
+
+    def fn(api_key):
+        if api_key == "KEY-A":
+            raise KeyQuotaExceeded("daily quota")
+        return api_key
+
+    assert pool.call("img", fn) == "KEY-B"
+    assert {k["id"]: k["exhausted"] for k in pool.list_keys("img")} == {"a": True, "b": False}
+    assert pool.call("img", fn) == "KEY-B"
+
+
+def test_rejected_key_is_disabled(pool):
+    pool.upsert_key("a", "img", api_key="KEY-A")
+    pool.upsert_key("b", "img", api_key="KEY-B")
+
+    def fn(api_key):
+        if api_key == "KEY-A":
+            raise KeyRejected("401")
+        return api_key
+
+    assert pool.call("img", fn) == "KEY-B"
+    assert {k["id"]: k["status"] for k in pool.list_keys("img")} == {"a": "error", "b": "active"}
+
+
+def test_rate_limited_key_falls_over_to_standby(pool):
+    pool.upsert_key("a", "img", api_key="KEY-A")
+    pool.upsert_key("b", "img", api_key="KEY-B", status="standby")
+    calls = []
+
+    def fn(api_key):
+        calls.append(api_key)
+        if api_key == "KEY-A":
+            raise KeyRateLimited(retry_after=120)
+        return api_key
+
+    assert pool.call("img", fn) == "KEY-B"
+    assert pool.call("img", fn) == "KEY-B"
+    assert calls == ["KEY-A", "KEY-B", "KEY-B"]
+
+
+def test_job_is_deferred_instead_of_waiting(pool):
+    # 분당 6회 → 버킷 1개: 두 번째 호출은 작업을 약 10초 뒤로 미룸
+    pool.upsert_key("a", "tts", api_key="KEY-A", rate_per_minute=6)
+    job = object()
+    assert pool.call("tts", echo, job=job) == "KEY-A"
+    with pytest.raises(JobDeferred) as deferred:
+        pool.call("tts", echo, job=job)
+    assert 9 < deferred.value.delay <= 10
+
+
+def test_fallback_key(pool):
+    assert pool.call("tts", echo, fallback_key="ENV-KEY") == "ENV-KEY"
+    with pytest.raises(JobFailed):
+        pool.call("tts", echo)
+
+    def rejected(api_key):
+        raise KeyRejected("401")
+
+    def limited(api_key):
+        raise KeyRateLimited(retry_after=7)
+
+    with pytest.raises(JobFailed):
+        pool.call("tts", rejected, fallback_key="ENV-KEY", job=object())
+    with pytest.raises(JobDeferred) as deferred:
+        pool.call("tts", limited, fallback_key="ENV-KEY", job=object())
+    assert deferred.value.delay == 7
+    with pytest.raises(KeyRateLimited):
+        pool.call("tts", limited, fallback_key="ENV-KEY")
+
+
+def test_edit_keeps_usage_and_exhaustion(pool):
+    pool.upsert_key("a", "tts", api_key="KEY-A", usage=5)
+    pool._conn().execute("UPDATE api_keys SET exhausted_day = date('now', 'localtime') WHERE id = 'a'")
+    edited = pool.upsert_key("a", "tts", memo="renamed", key_name="main")
+    assert (edited["usage"], edited["exhausted"], edited["memo"]) == (5, True, "renamed")
+    reset = pool.upsert_key("a", "tts", usage=0)
+    assert (reset["usage"], reset["exhausted"]) == (0, True)
+    with pytest.raises(ValueError):
+        pool.upsert_key("new", "tts")
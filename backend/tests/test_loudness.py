@@ -0,0 +1,73 @@
+import pytest
+
+from conftest import lavfi, requires_ffmpeg
+from loudness import measure_loudness, normalize_gain, range_name, read_measurement
+
+
+def test_normalize_gain():
+    assert normalize_gain({"integrated": None, "truePeak": None}, -23, -1) == (None, None, False)
+    assert normalize_gain({"integrated": -26.0, "truePeak": -10.0}, -23, -1) == (3.0, 141, False)
+    # 목표까지 7dB 올리면 트루 피크가 +4dBTP → 한도(-1)까지만
+    assert normalize_gain({"integrated": -30.0, "truePeak": -3.0}, -23, -1) == (2.0, 126, True)
+    # 클립 볼륨 상한 200
+    assert normalize_gain({"integrated": -40.0, "truePeak": -30.0}, -23, -1) == (6.0, 200, True)
+
+
+def test_read_measurement_uses_last_values(tmp_path):
+    path = tmp_path / "0.txt"
+    path.write_text(
+        "frame:0\nlavfi.r128.I=-70.000\nlavfi.r128.true_peak=0.100\n"
+        "frame:1\nlavfi.r128.I=-20.04\nlavfi.r128.LRA=3.21\nlavfi.r128.true_peak=0.5\n",
+        encoding="utf-8",
+    )
+    assert read_measurement(str(path)) == {"integrated": -20.0, "truePeak": -6.0, "lra": 3.2}
+    assert range_name() == "full" and range_name(1.5, 2) == "s1.500_l2.000"
+
+
+@requires_ffmpeg
+def test_measure_tone_and_silence(tmp_path):
+    tone = lavfi(tmp_path / "tone.wav", "sine=frequency=1000:duration=4")
+    silence = lavfi(tmp_path / "silence.wav", "anullsrc=r=48000:cl=mono", options=("-t", "4"))
+    work_dir = tmp_path / "work"
+    work_dir.mkdir()
+    loud, quiet = measure_loudness(
+        [{"path": tone, "length": None}, {"path": silence, "seek": 0, "length": 3}], str(work_dir), duration=4,
+    )
+    assert -25 < loud["integrated"] < -15 and loud["truePeak"] < 0
+    assert quiet["integrated"] is None
+
+
+@pytest.fixture(scope="module")
+def tone_src(client, tmp_path_factory):
+    path = lavfi(tmp_path_factory.mktemp("loudness") / "tone.wav", "sine=frequency=500:duration=3")
+    with open(path, "rb") as f:
+        stored = client.post("/api/upload", files={"file": ("loudness_tone.wav", f.read())}).json()
+    return f"/api/objects/{stored['hash']}"
+
+
+@requires_ffmpeg
+def test_batch_normalize(client, tone_src, wait_job):
+    clips = [
+        {"id": "s1", "type": "sound", "src": tone_src, "duration": 1},
+        {"id": "s2", "type": "sound", "src": tone_src, "duration": 1, "startOffset": 1},
+        {"id": "v1", "type": "video", "src": tone_src, "duration": 1},
+    ]
+    created = client.post("/api/loudness/normalize", json={"clips": clips, "target": -16})
+    assert created.status_code == 202
+    assert (created.json()["clips"], created.json()["clipsToMeasure"]) == (2, 2)
+    job = wait_job(created.json()["jobId"])
+    assert job["status"] == "done"
+
+    result = client.post("/api/loudness/normalize", json={"clips": clips, "target": -16}).json()
+    assert result["status"] == "ready" and result == job["result"]
+    assert [c["id"] for c in result["clips"]] == ["s1", "s2"]
+    for clip in result["clips"]:
+        assert not clip["limited"] and clip["gain"] == pytest.approx(-16 - clip["integrated"], abs=0.2)
+        assert abs(clip["volume"] - 100 * 10 ** (clip["gain"] / 20)) <= 1
+
+
+def test_normalize_errors(client):
+    assert client.post("/api/loudness/normalize", json={"clips": [], "target": 5}).status_code == 400
+    bad = [{"id": "s1", "type": "sound", "src": "/api/objects/" + "0" * 64, "duration": "long"}]
+    response = client.post("/api/loudness/normalize", json={"clips": bad})
+    assert response.status_code == 422 and "clip s1 duration must be a number" in response.json()["detail"]
@@ -0,0 +1,66 @@
+import json
+import os
+import stat
+import time
+
+import ffmpeg
+import pytest
+
+import media_probe
+from media_probe import parse_rate, probe_media, run_ffprobe
+
+PROBE_OUTPUT = {
+    "streams": [
+        {"codec_type": "video", "codec_name": "h264", "width": 1920, "height": 1080, "avg_frame_rate": "30000/1001"},
+        {"codec_type": "audio", "codec_name": "aac", "channels": 2, "sample_rate": "48000"},
+    ],
+    "format": {"duration": "12.5", "bit_rate": "8000000"},
+}
+
+
+def fake_ffprobe(tmp_path, monkeypatch, body):
+    # PATH 앞에 가짜 ffprobe (받은 인자를 args.json 에 기록)
+    script = tmp_path / "bin" / "ffprobe"
+    script.parent.mkdir()
+    script.write_text(
+        "#!/usr/bin/env python3\nimport json, sys, time\n"
+        f"json.dump(sys.argv[1:], open({str(tmp_path / 'args.json')!r}, 'w'))\n" + body
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{script.parent}{os.pathsep}{os.environ['PATH']}")
+    return tmp_path / "args.json"
+
+
+def test_probe_media(tmp_path, monkeypatch):
+    args_path = fake_ffprobe(tmp_path, monkeypatch, f"print(json.dumps({PROBE_OUTPUT!r}))\n")
+    info = probe_media("/media/clip.mp4")
+    assert info == {
+        "codec": "h264", "width": 1920, "height": 1080, "fps": 29.97, "duration": 12.5,
+        "audio_codec": "aac", "audio_channels": 2, "sample_rate": 48000, "bitrate": 8000000,
+    }
+    args = json.loads(args_path.read_text())
+    assert args[-1] == "/media/clip.mp4"
+    assert "-timeout" not in args
+
+
+def test_probe_failure(tmp_path, monkeypatch):
+    fake_ffprobe(tmp_path, monkeypatch, "sys.stderr.write('Invalid data found'); sys.exit(1)\n")
+    with pytest.raises(ffmpeg.Error) as error:
+        run_ffprobe("/media/broken.mp4")
+    assert b"Invalid data found" in error.value.stderr
+
+
+def test_probe_timeout_kills_process(tmp_path, monkeypatch):
+    fake_ffprobe(tmp_path, monkeypatch, "time.sleep(30)\n")
+    started = time.monotonic()
+    with pytest.raises(ffmpeg.Error) as error:
+        run_ffprobe("/media/stuck.mp4", timeout=0.5)
+    assert time.monotonic() - started < 10
+    assert b"timed out" in error.value.stderr
+
+
+def test_parse_rate():
+    assert parse_rate("30000/1001") == 29.97
+    assert parse_rate("0/0") is None
+    assert parse_rate(None) is None
+    assert media_probe.to_number("x") is None
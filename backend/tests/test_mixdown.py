@@ -0,0 +1,71 @@
+import io
+import wave
+from array import array
+
+import pytest
+
+from conftest import lavfi, requires_ffmpeg
+from export import AUDIO_SAMPLE_RATE
+from mixdown import chunk_parts
+
+SR = AUDIO_SAMPLE_RATE
+
+
+def test_chunk_parts_are_relative_to_the_chunk():
+    plan = {"audio": [{"hash": "h", "path": "/a.wav", "start": 3.0, "end": 8.0, "offset": 1.0, "speed": 2.0, "volume": 50}]}
+    first, second = chunk_parts(plan, 0, 5 * SR, 200), chunk_parts(plan, 5 * SR, 10 * SR, 200)
+    assert first == [{"hash": "h", "path": "/a.wav", "speed": 2.0, "seek": 1.0, "length": 4.0, "volume": 100, "delay": 3 * SR}]
+    assert second[0]["seek"] == 5.0 and second[0]["length"] == 6.0 and second[0]["delay"] == 0
+    assert chunk_parts(plan, 10 * SR, 15 * SR, 100) == []
+
+
+@pytest.fixture(scope="module")
+def tone_src(client, tmp_path_factory):
+    path = lavfi(tmp_path_factory.mktemp("mix") / "tone.wav", "sine=frequency=330:duration=2")
+    with open(path, "rb") as f:
+        stored = client.post("/api/upload", files={"file": ("mix_tone.wav", f.read())}).json()
+    return f"/api/objects/{stored['hash']}"
+
+
+def mix_body(src, volume=100):
+    # 0~2초, 6~8초에 같은 소리 → 5초 구간 두 개
+    return {
+        "tracks": [{"id": "a1"}],
+        "clips": [
+            {"id": "s1", "trackId": "a1", "type": "sound", "src": src, "start": 0, "duration": 2},
+            {"id": "s2", "trackId": "a1", "type": "sound", "src": src, "start": 6, "duration": 2, "volume": volume},
+        ],
+    }
+
+
+def peak(samples, first_second, end_second):
+    return max(abs(v) for v in samples[first_second * SR * 2:end_second * SR * 2])
+
+
+@requires_ffmpeg
+def test_mixdown_and_partial_remix(client, tone_src, wait_job):
+    created = client.post("/api/mixdowns", json=mix_body(tone_src))
+    assert created.status_code == 202
+    body = created.json()
+    assert (body["chunks"], body["chunksToMix"], body["duration"]) == (2, 2, 8)
+    assert wait_job(body["jobId"])["status"] == "done"
+
+    with wave.open(io.BytesIO(client.get(body["src"]).content)) as wav:
+        assert (wav.getnchannels(), wav.getframerate(), wav.getnframes()) == (2, SR, 8 * SR)
+        samples = array("h", wav.readframes(wav.getnframes()))
+    assert peak(samples, 0, 2) > 1000 and peak(samples, 3, 5) == 0 and peak(samples, 6, 8) > 1000
+
+    again = client.post("/api/mixdowns", json=mix_body(tone_src))
+    assert again.status_code == 200 and again.json()["revision"] == body["revision"]
+
+    # 두 번째 클립만 고치면 그 클립이 걸친 구간만 다시 믹스
+    changed = client.post("/api/mixdowns", json=mix_body(tone_src, volume=50)).json()
+    assert changed["revision"] != body["revision"] and changed["chunksToMix"] == 1
+    assert wait_job(changed["jobId"])["status"] == "done"
+
+
+def test_mixdown_errors(client):
+    body = mix_body("blob:local")
+    assert client.post("/api/mixdowns", json=dict(body, masterVolume=500)).status_code == 400
+    assert client.post("/api/mixdowns", json=body).status_code == 422
+    assert client.get("/api/mixdowns/" + "0" * 32 + ".wav").status_code == 404
@@ -0,0 +1,60 @@
+import pytest
+
+from conftest import requires_ffmpeg
+from preview_stream import scale_plan
+
+
+def test_scale_plan_to_preview_height():
+    plan = {
+        "width": 1920, "height": 1080, "fps": 30,
+        "layers": [{"x": 300, "y": 900, "w": 1200, "h": 150, "media": None, "background": "#000000",
+                    "text": {"content": "hi", "fontSize": 60, "shadow": {"offsetX": 6, "offsetY": 0, "color": "#000"}}}],
+    }
+    scaled = scale_plan(plan, 360)
+    assert (scaled["width"], scaled["height"]) == (640, 360)
+    layer = scaled["layers"][0]
+    assert (layer["x"], layer["y"], layer["w"], layer["h"]) == (100, 300, 400, 50)
+    assert layer["text"]["fontSize"] == 20 and layer["text"]["shadow"]["offsetX"] == 2
+    assert plan["layers"][0]["text"]["fontSize"] == 60       # 원본 계획은 그대로
+    assert scale_plan(plan, 1080) is plan                    # 확대하지 않음
+
+
+@pytest.fixture(scope="module")
+def video_src(client, sample_video):
+    with open(sample_video, "rb") as f:
+        stored = client.post("/api/upload", files={"file": ("preview_sample.mp4", f.read())}).json()
+    return f"/api/objects/{stored['hash']}"
+
+
+def preview_body(src):
+    return {
+        "canvasSize": {"w": 640, "h": 360}, "height": 180,
+        "tracks": [{"id": "t1"}],
+        "clips": [{"id": "c1", "trackId": "t1", "type": "video", "src": src, "start": 0, "duration": 3}],
+    }
+
+
+@requires_ffmpeg
+def test_preview_playlist_and_segments(client, video_src):
+    created = client.post("/api/previews", json=preview_body(video_src)).json()
+    assert (created["width"], created["height"], created["duration"]) == (320, 180, 3)
+    # 같은 타임라인이면 같은 세션
+    assert client.post("/api/previews", json=preview_body(video_src)).json()["sessionId"] == created["sessionId"]
+
+    playlist = client.get(created["playlist"]).text
+    assert playlist.splitlines()[-5:] == ["#EXTINF:2.000000,", "0.ts", "#EXTINF:1.000000,", "1.ts", "#EXT-X-ENDLIST"]
+
+    base = f"/api/previews/{created['sessionId']}"
+    segment = client.get(f"{base}/1.ts")
+    assert segment.status_code == 200 and segment.content[:1] == b"\x47"     # MPEG-TS sync byte
+    again = client.get(f"{base}/1.ts", headers={"If-None-Match": segment.headers["etag"]})
+    assert again.status_code == 304
+    assert client.get(f"{base}/2.ts").status_code == 404
+    assert client.post(f"{base}/seek", params={"t": 2.5}).json() == {"segment": 1}
+
+
+def test_preview_errors(client):
+    assert client.get("/api/previews/nope/index.m3u8").status_code == 404
+    body = preview_body("blob:local")
+    assert client.post("/api/previews", json=dict(body, height=50)).status_code == 400
+    assert client.post("/api/previews", json=body).status_code == 422
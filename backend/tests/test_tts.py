@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+import tts
+from tts import AzureEngine, TTSRequestError, resolve_voice, tts_key
+
+AZURE = {"engine": "azure", "voiceId": "ko-KR-SunHiNeural"}
+
+
+def test_directing_becomes_azure_style():
+    assert resolve_voice(AZURE, {"voiceDirecting": "밝게"})["style"] == "cheerful"
+    assert resolve_voice(AZURE, {"voiceDirecting": " Whispering "})["style"] == "whispering"
+    assert resolve_voice({"engine": "stub"}, {"voiceDirecting": "밝게"})["style"] == "cheerful"
+    # 디렉팅이 없으면 style 자체가 없음 → 기존 캐시 키 유지
+    assert "style" not in resolve_voice(AZURE, {"voiceDirecting": "  "})
+
+
+def test_directing_changes_cache_key():
+    plain = resolve_voice(AZURE, {})
+    sad = resolve_voice(AZURE, {"voiceDirecting": "슬프게"})
+    assert tts_key("안녕하세요", plain) != tts_key("안녕하세요", sad)
+
+
+def test_directing_is_rejected_rather_than_dropped():
+    with pytest.raises(TTSRequestError, match="unsupported voice directing"):
+        resolve_voice(AZURE, {"id": "c1", "voiceDirecting": "천천히 또박또박, 마지막에 웃으면서"})
+    with pytest.raises(TTSRequestError, match="not supported by the google engine"):
+        resolve_voice({"engine": "google"}, {"id": "c1", "voiceDirecting": "밝게"})
+
+
+def test_azure_ssml_express_as(monkeypatch):
+    sent = {}
+
+    class Response:
+        status_code = 200
+        content = b"mp3"
+
+    def post(url, data, **kwargs):
+        sent["ssml"] = data.decode("utf-8")
+        return Response()
+
+    monkeypatch.setattr(tts.requests, "post", post)
+    voice = dict(resolve_voice(AZURE, {"voiceDirecting": "차분하게"}))
+    assert AzureEngine().synthesize("a < b", voice, "KEY") == (b"mp3", ".mp3")
+    ssml = sent["ssml"]
+    assert "xmlns:mstts='https://www.w3.org/2001/mstts'" in ssml
+    assert "<mstts:express-as style='calm'><prosody rate='+0%' pitch='+0Hz'>a &lt; b</prosody></mstts:express-as>" in ssml
+
+
+def test_generate_then_cached(client, server_app, wait_job):
+    # stub 엔진으로 합성 → 캐시(cache/tts/ab/<키>.json) → 다시 보내면 ready
+    clips = [{"id": "c1", "rawText": "첫 줄"}, {"id": "c2", "rawText": "  "}]
+    voice = {"engine": "stub", "voiceId": "stub-voice"}
+    response = client.post("/api/tts/generate", json={"clips": clips, "voice": voice})
+    assert response.status_code == 202
+    first, skipped = response.json()["clips"]
+    assert skipped == {"clipId": "c2", "status": "skipped"}
+    assert wait_job(first["jobId"])["status"] == "done"
+
+    generator = server_app.tts_generator
+    base = generator._base_path(first["key"])
+    assert os.path.exists(base + ".json")
+    assert not [name for name in os.listdir(os.path.dirname(base)) if name.endswith(".tmp")]
+
+    response = client.post("/api/tts/generate", json={"clips": clips, "voice": voice})
+    assert response.status_code == 200
+    ready = response.json()["clips"][0]
+    assert ready["status"] == "ready" and ready["engine"] == "stub"
+    assert client.get(ready["src"]).status_code == 200
+
+    assert client.post("/api/tts/generate", json={"clips": [{"id": "c3", "rawText": "x", "voiceDirecting": "밝게"}],
+                                                   "voice": {"engine": "google"}}).status_code == 400
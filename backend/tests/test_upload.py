@@ -0,0 +1,41 @@
+import hashlib
+from urllib.parse import quote
+
+
+def test_stream_upload_query_name(client):
+    data = b"x" * (3 * 1024 * 1024 + 17)
+    result = client.post("/api/upload/stream", params={"filename": "stream_a.bin", "description": "raw"},
+                         content=data).json()
+    assert result["filename"] == "stream_a.bin"
+    assert result["hash"] == hashlib.sha256(data).hexdigest()
+    assert result["size"] == len(data) and result["description"] == "raw"
+    assert client.get("/api/files/stream_a.bin").content == data
+
+
+def test_stream_upload_encoded_headers(client):
+    # 헤더는 URL 인코딩 (한글 파일명 / 설명)
+    headers = {"X-Filename": quote("스트림 영상.bin"), "X-Description": quote("설명 메모")}
+    result = client.post("/api/upload/stream", headers=headers, content=b"chunks").json()
+    assert result["filename"] == "스트림 영상.bin" and result["description"] == "설명 메모"
+
+
+def test_stream_upload_rejects_path_names(client):
+    assert client.post("/api/upload/stream", params={"filename": ".."}, content=b"x").status_code == 400
+    result = client.post("/api/upload/stream", params={"filename": "../../escape.bin"}, content=b"x").json()
+    assert result["filename"] == "escape.bin"
+
+
+def test_batch_upload_reports_per_file(client):
+    files = [
+        ("files", ("batch_a.txt", b"alpha")),
+        ("files", ("batch_b.txt", b"beta")),
+        ("files", ("..", b"bad name")),
+        ("files", ("batch_a_copy.txt", b"alpha")),
+    ]
+    result = client.post("/api/upload/batch", files=files, data={"description": "batch"}).json()
+    assert (result["total"], result["succeeded"], result["failed"]) == (4, 3, 1)
+    by_index = {r["index"]: r for r in result["results"]}
+    assert [by_index[i]["ok"] for i in range(4)] == [True, True, False, True]
+    assert by_index[2]["error"] == "invalid filename"
+    assert by_index[3]["hash"] == by_index[0]["hash"]
+    assert client.get("/api/files/batch_b.txt").content == b"beta"
@@ -0,0 +1,60 @@
+import hashlib
+
+from asset_store import head_tail_fingerprint
+
+MB = 1024 * 1024
+HEAD, TAIL = b"h" * MB, b"t" * MB
+
+
+def sha(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_fingerprint_skips_the_middle(tmp_path):
+    a, b = tmp_path / "a", tmp_path / "b"
+    a.write_bytes(HEAD + b"1" * MB + TAIL)
+    b.write_bytes(HEAD + b"2" * MB + TAIL)
+    size = 3 * MB
+    assert head_tail_fingerprint(str(a), size, MB) == head_tail_fingerprint(str(b), size, MB) == sha(HEAD + TAIL)
+    # 작은 파일은 전체
+    (tmp_path / "small").write_bytes(b"abc")
+    assert head_tail_fingerprint(str(tmp_path / "small"), 3, MB) == sha(b"abc")
+
+
+def test_upload_deduplicates(client):
+    data = b"same content for two names"
+    first = client.post("/api/upload", files={"file": ("dedupe_a.txt", data)}).json()
+    second = client.post("/api/upload", files={"file": ("dedupe_b.txt", data)}).json()
+    assert first["hash"] == second["hash"] == sha(data)
+    assert second["deduplicated"] is True
+    assert client.get("/api/files/dedupe_b.txt").content == data
+
+
+def test_head_tail_match_is_only_a_candidate(client):
+    # 앞/뒤가 같고 가운데만 다른 파일 → 후보만 알려 주고 이름을 연결하지 않음
+    original = HEAD + b"1" * MB + TAIL
+    other = HEAD + b"2" * MB + TAIL
+    stored = client.post("/api/upload", files={"file": ("check_original.bin", original)}).json()
+
+    check = {"filename": "check_other.bin", "size": len(other), "head_tail_sha256": sha(HEAD + TAIL), "sample_mb": 1}
+    result = client.post("/api/upload/check", json=check).json()
+    assert result == {"exists": False, "filename": "check_other.bin", "candidate": stored["hash"], "match": "head_tail"}
+    assert client.get("/api/files/check_other.bin").status_code == 404
+
+    # 클라이언트가 전체 해시를 계산해 보니 다름 → 본문 업로드 필요
+    result = client.post("/api/upload/check", json={"filename": "check_other.bin", "sha256": sha(other)}).json()
+    assert result == {"exists": False, "filename": "check_other.bin"}
+
+    # 같은 내용이면 전체 해시로 확인 → 전송 없이 연결
+    result = client.post(
+        "/api/upload/check", json={"filename": "check_copy.bin", "size": len(original), "sha256": sha(original)},
+    ).json()
+    assert result["exists"] is True and result["match"] == "sha256" and result["hash"] == stored["hash"]
+    assert client.get("/api/files/check_copy.bin").content == original
+
+
+def test_check_errors(client):
+    assert client.post("/api/upload/check", json={"filename": "x.bin"}).status_code == 400
+    assert client.post("/api/upload/check", json={"filename": "x.bin", "sha256": "zz"}).status_code == 400
+    no_match = {"filename": "x.bin", "size": 5, "head_tail_sha256": sha(b"nope"), "sample_mb": 1}
+    assert client.post("/api/upload/check", json=no_match).json() == {"exists": False, "filename": "x.bin"}
@@ -0,0 +1,173 @@
+import hashlib
+import os
+import threading
+
+import pytest
+
+from upload_sessions import UploadSessionError, UploadSessionStore, merge_range
+
+CONTENT = os.urandom(3000)
+
+
+def test_merge_range():
+    assert merge_range([], 10, 20) == [[10, 20]]
+    assert merge_range([[0, 10], [20, 30]], 10, 20) == [[0, 30]]
+    assert merge_range([[0, 10]], 5, 8) == [[0, 10]]
+    assert merge_range([[20, 30]], 0, 5) == [[0, 5], [20, 30]]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return UploadSessionStore(str(tmp_path))
+
+
+def write_chunk(store, session, start, end):
+    store.check_chunk(session, start, end - start)
+    with store.open_at(session, start) as f:
+        f.write(CONTENT[start:end])
+    store.mark_received(session, start, end)
+
+
+def test_out_of_order_chunks(store):
+    session = store.create("clip.mp4", len(CONTENT))
+    write_chunk(store, session, 2000, 3000)
+    assert (session.offset, session.missing) == (0, [[0, 2000]])
+    write_chunk(store, session, 0, 1000)
+    assert (session.offset, session.missing) == (1000, [[1000, 2000]])
+    assert not session.is_complete
+    write_chunk(store, session, 1000, 2000)
+    assert (session.offset, session.missing, session.is_complete) == (3000, [], True)
+    with open(session.data_path, "rb") as f:
+        assert f.read() == CONTENT
+
+
+def test_session_survives_restart(store, tmp_path):
+    session = store.create("clip.mp4", len(CONTENT), "설명")
+    write_chunk(store, session, 500, 1500)
+    reloaded = UploadSessionStore(str(tmp_path)).get(session.id)
+    assert (reloaded.filename, reloaded.description, reloaded.ranges) == ("clip.mp4", "설명", [[500, 1500]])
+
+
+def test_chunk_bounds(store):
+    session = store.create("clip.mp4", 100)
+    with pytest.raises(UploadSessionError) as error:
+        store.check_chunk(session, 101)
+    assert error.value.status_code == 416
+    with pytest.raises(UploadSessionError) as error:
+        store.check_chunk(session, 90, 20)
+    assert error.value.status_code == 413
+    with pytest.raises(UploadSessionError) as error:
+        store.get("../etc")
+    assert error.value.status_code == 404
+
+
+def test_finalize_requires_every_byte(store):
+    session = store.create("clip.mp4", len(CONTENT))
+    write_chunk(store, session, 0, 2999)
+    with pytest.raises(UploadSessionError) as error:
+        store.finalize(session, lambda path: None)
+    assert error.value.status_code == 409
+
+
+def test_conflicts_while_finalizing(store):
+    session = store.create("clip.mp4", len(CONTENT))
+    write_chunk(store, session, 0, len(CONTENT))
+    started, release = threading.Event(), threading.Event()
+
+    def slow_ingest(path):
+        started.set()
+        release.wait(10)
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    result = {}
+    worker = threading.Thread(target=lambda: result.update(sha=store.finalize(session, slow_ingest)))
+    worker.start()
+    assert started.wait(10)
+    # 해시 계산 중에도 다른 세션은 막히지 않음
+    other = store.create("other.mp4", 10)
+    assert store.get(other.id) is other
+    for attempt in (lambda: store.check_chunk(session, 0, 10), lambda: store.abort(session),
+                    lambda: store.finalize(session, slow_ingest)):
+        with pytest.raises(UploadSessionError) as error:
+            attempt()
+        assert error.value.status_code == 409
+    release.set()
+    worker.join(10)
+    assert result["sha"] == hashlib.sha256(CONTENT).hexdigest()
+    assert not os.path.exists(session.dir)
+
+
+def test_failed_ingest_can_be_retried(store):
+    session = store.create("clip.mp4", 10)
+    write_chunk(store, session, 0, 10)
+
+    def failing(path):
+        raise OSError("disk full")
+
+    with pytest.raises(OSError):
+        store.finalize(session, failing)
+    assert store.finalize(session, lambda path: "ok") == "ok"
+
+
+def test_purge_expired(store):
+    stale = store.create("stale.mp4", 10)
+    fresh = store.create("fresh.mp4", 10)
+    stale.updated_at -= 48 * 3600
+    store.purge_expired()
+    assert not os.path.exists(stale.dir)
+    assert os.path.exists(fresh.dir)
+
+
+# HTTP: 세션 생성 → 순서 없는 청크 PUT → HEAD 오프셋 → finalize
+
+
+def put(client, session_id, start, end):
+    return client.put(f"/api/upload/sessions/{session_id}", content=CONTENT[start:end],
+                      headers={"Upload-Offset": str(start)})
+
+
+def test_http_resumable_upload(client):
+    session = client.post("/api/upload/sessions", json={"filename": "resume test.bin", "size": len(CONTENT)}).json()
+    session_id = session["session_id"]
+    assert put(client, session_id, 1000, 3000).status_code == 204
+    head = client.head(f"/api/upload/sessions/{session_id}")
+    assert (head.headers["upload-offset"], head.headers["upload-length"]) == ("0", str(len(CONTENT)))
+    assert client.post(f"/api/upload/sessions/{session_id}/finalize").status_code == 409
+    r = put(client, session_id, 0, 1000)
+    assert r.headers["upload-offset"] == str(len(CONTENT))
+    assert client.get(f"/api/upload/sessions/{session_id}").json()["missing"] == []
+
+    result = client.post(f"/api/upload/sessions/{session_id}/finalize").json()
+    assert result["hash"] == hashlib.sha256(CONTENT).hexdigest()
+    assert result["filename"] == "resume test.bin"
+    assert client.get(f"/api/objects/{result['hash']}").content == CONTENT
+    assert client.head(f"/api/upload/sessions/{session_id}").status_code == 404
+
+
+def test_http_chunk_errors(client):
+    session_id = client.post("/api/upload/sessions", json={"filename": "a.bin", "size": 10}).json()["session_id"]
+    r = client.put(f"/api/upload/sessions/{session_id}", content=b"x" * 20, headers={"Upload-Offset": "0"})
+    assert r.status_code == 413
+    r = client.put(f"/api/upload/sessions/{session_id}", content=b"x", headers={"Upload-Offset": "11"})
+    assert r.status_code == 416
+    assert client.delete(f"/api/upload/sessions/{session_id}").status_code == 200
+    assert client.put(f"/api/upload/sessions/{session_id}", content=b"x",
+                      headers={"Upload-Offset": "0"}).status_code == 404
+    assert client.post("/api/upload/sessions", json={"filename": "../", "size": 1}).status_code == 400
+    assert client.post("/api/upload/sessions", json={"filename": "a.bin", "size": -1}).status_code == 400
+
+
+def test_http_conflict_while_finalizing(client, server_app, monkeypatch):
+    session_id = client.post("/api/upload/sessions", json={"filename": "slow.bin", "size": 10}).json()["session_id"]
+    client.put(f"/api/upload/sessions/{session_id}", content=b"0123456789", headers={"Upload-Offset": "0"})
+    session = server_app.upload_sessions.get(session_id)
+    session.finalizing = True
+    try:
+        assert client.post(f"/api/upload/sessions/{session_id}/finalize").status_code == 409
+        assert client.put(f"/api/upload/sessions/{session_id}", content=b"0",
+                          headers={"Upload-Offset": "0"}).status_code == 409
+        assert client.delete(f"/api/upload/sessions/{session_id}").status_code == 409
+    finally:
+        session.finalizing = False
+    assert client.post(f"/api/upload/sessions/{session_id}/finalize").status_code == 200
@@ -0,0 +1,121 @@
+# C:\wai-ui\backend\thumbnails.py
+# 타임라인 필름스트립용 썸네일 스프라이트 시트
+# - ffmpeg 한 번 실행(디코드 1회)으로 일정 간격 프레임 추출 → fps + scale + pad + tile 필터로 이미지 한 장에 배치
+# - 프론트엔드가 숨은 <video> 를 프레임마다 seek 해서 canvas 로 캡처하던 작업(generateVideoThumbnails)을 대체
+# - 결과는 내용 해시 + 줌 레벨 기준으로 디스크 캐시 (cache/sprites/ab/<sha256>/z<level>.jpg + .json)
+# - 생성은 작업 큐(jobs.py)에서 실행 → 요청 경로를 막지 않음
+
+import math
+import os
+
+import ffmpeg
+
+from ffmpeg_run import run_ffmpeg
+from jobs import PRIORITY_HIGH, JobCancelled, JobFailed
+from storage import read_result, write_error, write_result
+
+SPRITE_WORKERS = int(os.environ.get("WAI_SPRITE_WORKERS", "1"))
+SPRITES_DIR_NAME = os.path.join("cache", "sprites")
+THUMB_WIDTH = 160
+THUMB_HEIGHT = 90
+SPRITE_COLUMNS = 10
+MAX_FRAMES = 240
+MIN_ZOOM_LEVEL = -3                # 2^-3 = 0.125 px/초
+MAX_ZOOM_LEVEL = 8                 # 2^8 = 256 px/초
+KEYFRAME_ONLY_INTERVAL = 4.0       # 프레임 간격이 이보다 넓으면 키프레임만 디코드 (긴 클립에서 수 배 빠름)
+JPEG_QUALITY = 5                   # ffmpeg -q:v (2 최고 ~ 31 최저)
+
+
+def zoom_level(zoom):
+    # 타임라인 줌(px/초)을 2의 거듭제곱 단계로 묶음 → 줌을 조금씩 바꿀 때마다 새로 만들지 않음
+    if zoom is None or zoom <= 0:
+        raise ValueError("zoom must be positive")
+    return max(MIN_ZOOM_LEVEL, min(MAX_ZOOM_LEVEL, round(math.log2(zoom))))
+
+
+def frame_count(duration, level):
+    # 썸네일 한 장이 타임라인에서 THUMB_WIDTH 픽셀을 차지하도록
+    return max(1, min(MAX_FRAMES, math.ceil(duration * (2 ** level) / THUMB_WIDTH)))
+
+
+def build_sprite(src_path, duration, count, image_path, job=None):
+    interval = duration / count
+    columns = min(SPRITE_COLUMNS, count)
+    rows = math.ceil(count / columns)
+    input_args = {"skip_frame": "nokey"} if interval >= KEYFRAME_ONLY_INTERVAL else {}
+    stream = (
+        ffmpeg
+        .input(src_path, **input_args)
+        .video
+        .filter("fps", fps=f"{count}/{duration}", eof_action="pass")
+        .filter("scale", THUMB_WIDTH, THUMB_HEIGHT, force_original_aspect_ratio="decrease")
+        .filter("pad", THUMB_WIDTH, THUMB_HEIGHT, "(ow-iw)/2", "(oh-ih)/2")
+        .filter("tile", f"{columns}x{rows}")
+        .output(image_path, vframes=1, format="image2", vcodec="mjpeg", **{"q:v": JPEG_QUALITY})
+    )
+    run_ffmpeg(stream, job, duration)
+    return {
+        "count": count,
+        "columns": columns,
+        "rows": rows,
+        "tileWidth": THUMB_WIDTH,
+        "tileHeight": THUMB_HEIGHT,
+        "interval": round(interval, 3),
+        "frames": [
+            {"time": round(i * interval, 3), "x": (i % columns) * THUMB_WIDTH, "y": (i // columns) * THUMB_HEIGHT}
+            for i in range(count)
+        ],
+    }
+
+
+class SpriteGenerator:
+    def __init__(self, upload_dir, asset_store, job_queue, workers=SPRITE_WORKERS):
+        self.sprites_dir = os.path.join(upload_dir, SPRITES_DIR_NAME)
+        self.asset_store = asset_store
+        self.job_queue = job_queue
+        job_queue.register("sprites", self._run, concurrency=workers)
+
+    def _base_path(self, sha256, level):
+        return os.path.join(self.sprites_dir, sha256[:2], sha256, f"z{level}")
+
+    def image_path(self, sha256, level):
+        return self._base_path(sha256, level) + ".jpg"
+
+    def get_index(self, sha256, level):
+        # 완성된 스프라이트 인덱스 / 실패 기록 / 없음(None)
+        return read_result(self._base_path(sha256, level))
+
+    def submit(self, sha256, duration, level):
+        job, _ = self.job_queue.enqueue(
+            "sprites", {"hash": sha256, "duration": duration, "level": level},
+            key=f"sprites:{sha256}:{level}", priority=PRIORITY_HIGH,
+        )
+        return job
+
+    def _run(self, job):
+        sha256, duration, level = job.payload["hash"], job.payload["duration"], job.payload["level"]
+        base = self._base_path(sha256, level)
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+        count = frame_count(duration, level)
+        tmp_image = base + ".tmp.jpg"
+        try:
+            index = build_sprite(self.asset_store.object_path(sha256), duration, count, tmp_image, job)
+            if not os.path.exists(tmp_image):
+                raise RuntimeError("no frames decoded")
+        except (ffmpeg.Error, RuntimeError) as e:
+            message = e.stderr.decode("utf-8", "replace")[-500:] if isinstance(e, ffmpeg.Error) else str(e)
+            write_error(base, message)
+            if os.path.exists(tmp_image):
+                os.remove(tmp_image)
+            print(f"❌ 스프라이트 생성 실패: {sha256[:12]} z{level}")
+            raise JobFailed(message)
+        except JobCancelled:
+            if os.path.exists(tmp_image):
+                os.remove(tmp_image)
+            raise
+
+        # 이미지가 먼저 자리잡은 뒤 인덱스를 기록 → 인덱스가 보이면 이미지도 항상 있음
+        os.replace(tmp_image, base + ".jpg")
+        write_result(base, dict(index, status="ready", zoomLevel=level))
+        print(f"🎞️ 스프라이트 생성 완료: {sha256[:12]} z{level} ({count}프레임)")
+        return {"count": count}
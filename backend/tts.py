@@ -0,0 +1,309 @@
+# C:\wai-ui\backend\tts.py
+# TTS 일괄 생성 (클립박스 generate-tts / 전체 TTS)
+# - 클립박스 클립 목록을 한 번에 받아 줄마다 작업 하나로 나눠 작업 큐에 넣음
+#   → 엔진별 작업 종류(tts:azure / tts:google / tts:eleven)로 등록해 엔진마다 동시 호출 수 제한 (TTS_CONCURRENCY)
+# - 결과는 (엔진, 텍스트, voiceId, 속도, 피치, 디렉팅 스타일) 해시로 캐시 (cache/tts/ab/<해시>.json → 자산 해시)
+#   → 200줄 대본을 다시 생성해도 바뀐 줄만 합성, 같은 줄이 합성 중이면 그 작업을 공유
+# - 합성된 음성은 자산 저장소에 일반 자산으로 저장 (/api/objects/<sha256> → 타임라인 / 내보내기에 그대로 사용)
+# - 외부 엔진 호출은 키 풀(key_pool)이 키를 골라 줌 → 키별 속도 제한 / 할당량 초과 시 다른 키로
+# - 클립의 음성 디렉팅(voiceDirecting)은 Azure 말투 스타일(SSML mstts:express-as)로 전달
+#   스타일 이름(cheerful 등) 또는 DIRECTING_STYLES 의 한국어 표현만 받음, 그 밖의 문장 / 다른 엔진은 400 (입력을 조용히 버리지 않음)
+# - stub 엔진: 네트워크 없이 텍스트 길이만큼의 톤 WAV 를 만듦 (WAI_TTS_STUB=1 이면 모든 엔진을 stub 으로)
+
+import base64
+import hashlib
+import json
+import math
+import os
+import sys
+import wave
+from array import array
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+import requests
+
+from jobs import PRIORITY_NORMAL, JobFailed
+from key_pool import raise_for_key_errors
+from storage import read_result, write_result
+
+TTS_DIR_NAME = os.path.join("cache", "tts")
+TTS_CACHE_VERSION = 1
+TTS_CONCURRENCY = {
+    "azure": int(os.environ.get("WAI_TTS_CONCURRENCY_AZURE", "4")),
+    "google": int(os.environ.get("WAI_TTS_CONCURRENCY_GOOGLE", "4")),
+    "eleven": int(os.environ.get("WAI_TTS_CONCURRENCY_ELEVEN", "2")),
+    "stub": 2,
+}
+USE_STUB = os.environ.get("WAI_TTS_STUB") == "1"
+TTS_MAX_ATTEMPTS = 3               # 429 / 5xx / 네트워크 오류는 작업 큐가 지수 백오프로 재시도
+REQUEST_TIMEOUT = 60
+MAX_TEXT_LENGTH = 5000
+MAX_BATCH_CLIPS = 500
+MIN_SPEED, MAX_SPEED = 0.5, 2.0
+
+AZURE_REGION = os.environ.get("WAI_AZURE_TTS_REGION", "koreacentral")
+AZURE_OUTPUT_FORMAT = "audio-24khz-96kbitrate-mono-mp3"
+ELEVEN_MODEL = os.environ.get("WAI_ELEVEN_MODEL", "eleven_multilingual_v2")
+
+# Azure 말투 스타일 (음성마다 지원하는 스타일은 다름, 지원하지 않으면 Azure 가 기본 말투로 읽음)
+AZURE_STYLES = (
+    "advertisement_upbeat", "affectionate", "angry", "assistant", "calm", "chat", "cheerful", "customerservice",
+    "depressed", "disgruntled", "documentary-narration", "embarrassed", "empathetic", "envious", "excited",
+    "fearful", "friendly", "gentle", "hopeful", "lyrical", "narration-professional", "narration-relaxed",
+    "newscast", "newscast-casual", "newscast-formal", "poetry-reading", "sad", "serious", "shouting",
+    "sports_commentary", "sports_commentary_excited", "whispering", "terrified", "unfriendly",
+)
+DIRECTING_STYLES = {
+    "밝게": "cheerful", "명랑하게": "cheerful", "신나게": "excited", "흥분해서": "excited",
+    "슬프게": "sad", "우울하게": "depressed", "화나게": "angry", "화난": "angry",
+    "차분하게": "calm", "부드럽게": "gentle", "다정하게": "affectionate", "친절하게": "friendly",
+    "진지하게": "serious", "속삭이듯": "whispering", "속삭이며": "whispering", "소리치며": "shouting",
+    "무섭게": "terrified", "겁먹은": "fearful", "희망차게": "hopeful", "공감하며": "empathetic",
+    "뉴스": "newscast", "내레이션": "narration-professional", "광고": "advertisement_upbeat",
+}
+DIRECTING_ENGINES = ("azure", "stub")    # stub 은 스타일을 소리에 반영하지 않고 캐시 키에만 (오프라인 개발용)
+
+STUB_SAMPLE_RATE = 24000
+STUB_SECONDS_PER_CHAR = 0.08
+
+
+class TTSError(Exception):
+    pass
+
+
+class TTSRequestError(Exception):
+    # 잘못된 요청 (엔진 / 속도 / 텍스트 길이) → 400
+    pass
+
+
+def raise_for_status(response, engine):
+    # 429 / 5xx 는 일시적 → 재시도, 나머지 4xx 는 다시 해도 같으므로 실패
+    if response.status_code == 429 or response.status_code >= 500:
+        raise TTSError(f"{engine} TTS HTTP {response.status_code}")
+    if response.status_code >= 400:
+        raise JobFailed(f"{engine} TTS HTTP {response.status_code}: {response.text[:300]}")
+
+
+class AzureEngine:
+    id = "azure"
+    service = "azure"              # 키 풀 서비스 id (키가 등록되지 않았으면 env_key 환경 변수 키 사용)
+    env_key = "WAI_AZURE_TTS_KEY"
+
+    def synthesize(self, text, voice, key):
+        rate = f"{(voice['speed'] - 1) * 100:+.0f}%"
+        pitch = f"{voice['pitch']:+d}Hz"
+        body = f"<prosody rate='{rate}' pitch='{pitch}'>{escape(text)}</prosody>"
+        if voice.get("style"):
+            body = f"<mstts:express-as style='{voice['style']}'>{body}</mstts:express-as>"
+        ssml = (
+            f"<speak version='1.0' xmlns='http://www.w3.org/2001/10/synthesis'"
+            f" xmlns:mstts='https://www.w3.org/2001/mstts' xml:lang='{voice['voiceId'][:5]}'>"
+            f"<voice name='{escape(voice['voiceId'])}'>{body}</voice></speak>"
+        )
+        response = requests.post(
+            f"https://{AZURE_REGION}.tts.speech.microsoft.com/cognitiveservices/v1",
+            data=ssml.encode("utf-8"), timeout=REQUEST_TIMEOUT,
+            headers={
+                "Ocp-Apim-Subscription-Key": key,
+                "Content-Type": "application/ssml+xml",
+                "X-Microsoft-OutputFormat": AZURE_OUTPUT_FORMAT,
+            },
+        )
+        raise_for_key_errors(response)
+        raise_for_status(response, self.id)
+        return response.content, ".mp3"
+
+
+class GoogleEngine:
+    id = "google"
+    service = "google"
+    env_key = "WAI_GOOGLE_TTS_KEY"
+
+    def synthesize(self, text, voice, key):
+        response = requests.post(
+            "https://texttospeech.googleapis.com/v1/text:synthesize", params={"key": key}, timeout=REQUEST_TIMEOUT,
+            json={
+                "input": {"text": text},
+                "voice": {"languageCode": voice["voiceId"][:5], "name": voice["voiceId"]},
+                "audioConfig": {"audioEncoding": "MP3", "speakingRate": voice["speed"], "pitch": voice["pitch"]},
+            },
+        )
+        raise_for_key_errors(response)
+        raise_for_status(response, self.id)
+        return base64.b64decode(response.json()["audioContent"]), ".mp3"
+
+
+class ElevenEngine:
+    id = "eleven"
+    service = "eleven"
+    env_key = "WAI_ELEVEN_API_KEY"
+
+    def synthesize(self, text, voice, key):
+        response = requests.post(
+            f"https://api.elevenlabs.io/v1/text-to-speech/{voice['voiceId']}", timeout=REQUEST_TIMEOUT,
+            headers={"xi-api-key": key, "Accept": "audio/mpeg"},
+            json={"text": text, "model_id": ELEVEN_MODEL, "voice_settings": {"speed": voice["speed"]}},
+        )
+        raise_for_key_errors(response)
+        raise_for_status(response, self.id)
+        return response.content, ".mp3"
+
+
+class StubEngine:
+    # 오프라인 개발 / 테스트용: 글자 수 × 속도에 비례하는 길이의 톤 (내용이 입력으로만 정해지므로 캐시 동작 확인 가능)
+    id = "stub"
+    service = None
+
+    def synthesize(self, text, voice, key=None):
+        seconds = max(0.5, len(text) * STUB_SECONDS_PER_CHAR / voice["speed"])
+        frequency = 220 * 2 ** (voice["pitch"] / 12)
+        samples = array("h", (
+            int(8000 * math.sin(2 * math.pi * frequency * i / STUB_SAMPLE_RATE))
+            for i in range(int(seconds * STUB_SAMPLE_RATE))
+        ))
+        if sys.byteorder == "big":
+            samples.byteswap()
+        buffer = BytesIO()
+        with wave.open(buffer, "wb") as out:
+            out.setnchannels(1)
+            out.setsampwidth(2)
+            out.setframerate(STUB_SAMPLE_RATE)
+            out.writeframes(samples.tobytes())
+        return buffer.getvalue(), ".wav"
+
+
+ENGINES = {engine.id: engine for engine in (AzureEngine(), GoogleEngine(), ElevenEngine(), StubEngine())}
+
+
+def directing_style(directing):
+    # 음성 디렉팅 → Azure 스타일 이름 ("밝게" / "cheerful" → "cheerful"), 알 수 없는 표현이면 None
+    text = directing.strip().lower()
+    if text in AZURE_STYLES:
+        return text
+    return DIRECTING_STYLES.get(text)
+
+
+def resolve_voice(global_voice, clip):
+    # 클립박스 WAICB.Resolver.resolveVoice 와 같은 규칙: 전역 음성 설정 위에 클립 override (전역 사용이 꺼진 경우)
+    voice = dict(global_voice or {})
+    if clip.get("useGlobalVoice") is False and clip.get("voiceOverride"):
+        voice.update(clip["voiceOverride"])
+    resolved = {
+        "engine": voice.get("engine") or "azure",
+        "voiceId": voice.get("voiceId") or "ko-KR-InJoonNeural",
+        "speed": float(voice.get("speed") or 1.0),
+        "pitch": int(voice.get("pitch") or 0),
+    }
+    # 디렉팅이 있을 때만 키에 넣음 → 디렉팅 없는 줄의 기존 캐시는 그대로 적중
+    directing = (clip.get("voiceDirecting") or "").strip()
+    if directing:
+        if resolved["engine"] not in DIRECTING_ENGINES:
+            raise TTSRequestError(
+                f"clip {clip.get('id')}: voice directing is not supported by the {resolved['engine']} engine"
+                f" (supported: {', '.join(DIRECTING_ENGINES)})"
+            )
+        style = directing_style(directing)
+        if style is None:
+            raise TTSRequestError(
+                f"clip {clip.get('id')}: unsupported voice directing {directing!r}"
+                f" (use an Azure style such as cheerful / sad / whispering, or one of: {', '.join(DIRECTING_STYLES)})"
+            )
+        resolved["style"] = style
+    return resolved
+
+
+def tts_key(text, voice):
+    description = dict(voice, version=TTS_CACHE_VERSION, text=text)
+    return hashlib.sha256(json.dumps(description, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class TTSGenerator:
+    def __init__(self, upload_dir, asset_store, key_pool, job_queue):
+        self.tts_dir = os.path.join(upload_dir, TTS_DIR_NAME)
+        self.asset_store = asset_store
+        self.key_pool = key_pool
+        self.job_queue = job_queue
+        for engine, concurrency in TTS_CONCURRENCY.items():
+            job_queue.register(f"tts:{engine}", self._run, max_attempts=TTS_MAX_ATTEMPTS, concurrency=concurrency)
+
+    def _base_path(self, key):
+        return os.path.join(self.tts_dir, key[:2], key)
+
+    def get_result(self, key):
+        # 캐시된 결과 (자산이 지워졌으면 없는 것으로)
+        result = read_result(self._base_path(key))
+        if result is None or not self.asset_store.has_object(result["hash"]):
+            return None
+        return result
+
+    def submit_batch(self, clips, global_voice):
+        # 반환: 클립 순서대로 {clipId, status: ready | pending | skipped, ...}
+        if len(clips) > MAX_BATCH_CLIPS:
+            raise TTSRequestError(f"at most {MAX_BATCH_CLIPS} clips per request")
+        lines = []
+        for clip in clips:
+            text = (clip.get("rawText") or "").strip()
+            if not text:
+                lines.append((clip, None, None))
+                continue
+            voice = resolve_voice(global_voice, clip)
+            if USE_STUB:
+                voice["engine"] = "stub"
+            if voice["engine"] not in TTS_CONCURRENCY:
+                raise TTSRequestError(f"unknown TTS engine: {voice['engine']!r}")
+            if not MIN_SPEED <= voice["speed"] <= MAX_SPEED:
+                raise TTSRequestError(f"speed must be in [{MIN_SPEED}, {MAX_SPEED}]")
+            if len(text) > MAX_TEXT_LENGTH:
+                raise TTSRequestError(f"clip {clip.get('id')}: text longer than {MAX_TEXT_LENGTH} characters")
+            lines.append((clip, text, voice))
+
+        results = []
+        for clip, text, voice in lines:
+            if text is None:
+                results.append({"clipId": clip.get("id"), "status": "skipped"})
+                continue
+            key = tts_key(text, voice)
+            cached = self.get_result(key)
+            if cached is not None:
+                results.append(dict(cached, clipId=clip.get("id"), status="ready"))
+                continue
+            # 같은 줄이 여러 클립에 있거나 이미 합성 중이면 같은 작업 하나로 합침 (key)
+            job, _ = self.job_queue.enqueue(
+                f"tts:{voice['engine']}", {"key": key, "text": text, "voice": voice},
+                key=f"tts:{key}", priority=PRIORITY_NORMAL,
+            )
+            results.append({"clipId": clip.get("id"), "key": key, "status": "pending", "jobId": job["id"]})
+        return results
+
+    def _run(self, job):
+        key, text, voice = job.payload["key"], job.payload["text"], job.payload["voice"]
+        cached = self.get_result(key)
+        if cached is not None:
+            return cached
+        engine = ENGINES[voice["engine"]]
+        try:
+            if engine.service is None:
+                data, ext = engine.synthesize(text, voice)
+            else:
+                data, ext = self.key_pool.call(
+                    engine.service, lambda key: engine.synthesize(text, voice, key),
+                    fallback_key=os.environ.get(engine.env_key), job=job,
+                )
+        except requests.RequestException as e:
+            raise TTSError(f"{voice['engine']} TTS request failed: {e}")
+        job.check_cancelled()
+
+        writer = self.asset_store.open_writer()
+        try:
+            writer.write(data)
+        except BaseException:
+            writer.abort()
+            raise
+        name = f"TTS_{key[:12]}{ext}"
+        asset = self.asset_store.commit(writer, name, text[:200])
+        result = {"key": key, "hash": asset["hash"], "assetId": asset["id"], "src": f"/api/objects/{asset['hash']}"}
+
+        write_result(self._base_path(key), dict(result, engine=engine.id, voiceId=voice["voiceId"]))
+        print(f"🗣️ TTS 생성 완료: {engine.id} {voice['voiceId']} ({len(text)}자) → {asset['name']}")
+        return result
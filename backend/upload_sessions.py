@@ -0,0 +1,225 @@
+# C:\wai-ui\backend\upload_sessions.py
+# 이어받기(resumable) 업로드 세션 관리
+#   1) 세션 생성 (파일명 + 전체 크기)
+#   2) 오프셋 지정 청크 PUT (병렬 / 순서 무관)
+#   3) HEAD 로 현재 오프셋 확인 → 끊긴 지점부터 재전송
+#   4) 모든 구간 수신 후 finalize → 자산 저장소로 이동
+
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+SESSION_DIR_NAME = ".sessions"
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024      # 클라이언트 권장 청크 크기 (8MB)
+SESSION_MAX_AGE = 24 * 60 * 60            # 24시간 동안 진행 없는 세션은 정리
+
+
+class UploadSessionError(Exception):
+    """세션 처리 실패 (status_code 는 그대로 HTTP 응답 코드로 사용)"""
+
+    def __init__(self, status_code, message):
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+def merge_range(ranges, start, end):
+    # [start, end) 구간을 정렬된 구간 목록에 병합
+    merged = []
+    for s, e in sorted(ranges + [[start, end]]):
+        if merged and s <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], e)
+        else:
+            merged.append([s, e])
+    return merged
+
+
+class UploadSession:
+    def __init__(self, root, session_id, filename, size, description=None,
+                 ranges=None, created_at=None, updated_at=None):
+        self.root = root
+        self.id = session_id
+        self.filename = filename
+        self.size = size
+        self.description = description
+        self.ranges = ranges or []
+        self.created_at = created_at or time.time()
+        self.updated_at = updated_at or self.created_at
+        self.finalizing = False        # finalize 중 (해시 계산 / 저장소 이동) → 청크 / 중복 finalize / 취소 거부
+
+    @property
+    def dir(self):
+        return os.path.join(self.root, self.id)
+
+    @property
+    def data_path(self):
+        return os.path.join(self.dir, "data.part")
+
+    @property
+    def meta_path(self):
+        return os.path.join(self.dir, "meta.json")
+
+    @property
+    def offset(self):
+        # 0 부터 끊김 없이 이어진 마지막 바이트 위치 (순차 업로드 클라이언트용)
+        if self.ranges and self.ranges[0][0] == 0:
+            return self.ranges[0][1]
+        return 0
+
+    @property
+    def received(self):
+        return sum(e - s for s, e in self.ranges)
+
+    @property
+    def missing(self):
+        gaps = []
+        cursor = 0
+        for s, e in self.ranges:
+            if s > cursor:
+                gaps.append([cursor, s])
+            cursor = max(cursor, e)
+        if cursor < self.size:
+            gaps.append([cursor, self.size])
+        return gaps
+
+    @property
+    def is_complete(self):
+        return self.received >= self.size
+
+    def to_dict(self):
+        return {
+            "session_id": self.id,
+            "filename": self.filename,
+            "size": self.size,
+            "description": self.description,
+            "offset": self.offset,
+            "received": self.received,
+            "ranges": self.ranges,
+            "missing": self.missing,
+            "complete": self.is_complete,
+            "chunk_size": DEFAULT_CHUNK_SIZE,
+        }
+
+    def save(self):
+        meta = {
+            "id": self.id,
+            "filename": self.filename,
+            "size": self.size,
+            "description": self.description,
+            "ranges": self.ranges,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+        }
+        tmp_path = self.meta_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, self.meta_path)
+
+    @classmethod
+    def load(cls, root, session_id):
+        meta_path = os.path.join(root, session_id, "meta.json")
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        return cls(
+            root, meta["id"], meta["filename"], meta["size"], meta.get("description"),
+            meta.get("ranges"), meta.get("created_at"), meta.get("updated_at"),
+        )
+
+
+class UploadSessionStore:
+    # 세션 메타데이터는 디스크(meta.json)에 기록 → 서버 재시작 후에도 이어받기 가능
+    def __init__(self, upload_dir):
+        self.upload_dir = upload_dir
+        self.root = os.path.join(upload_dir, SESSION_DIR_NAME)
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+    def create(self, filename, size, description=None):
+        if size < 0:
+            raise UploadSessionError(400, "size must be >= 0")
+        self.purge_expired()
+        session = UploadSession(self.root, uuid.uuid4().hex, filename, size, description)
+        os.makedirs(session.dir)
+        # 전체 크기만큼 미리 잡아두면 어떤 오프셋에서든 바로 쓸 수 있음 (sparse 파일)
+        with open(session.data_path, "wb") as f:
+            f.truncate(size)
+        with self._lock:
+            session.save()
+            self._sessions[session.id] = session
+        return session
+
+    def get(self, session_id):
+        if not session_id.isalnum():
+            raise UploadSessionError(404, "upload session not found")
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                try:
+                    session = UploadSession.load(self.root, session_id)
+                except (OSError, ValueError, KeyError):
+                    raise UploadSessionError(404, "upload session not found")
+                self._sessions[session_id] = session
+            return session
+
+    def check_chunk(self, session, offset, length=None):
+        if session.finalizing:
+            raise UploadSessionError(409, "upload is being finalized")
+        if offset < 0 or offset > session.size:
+            raise UploadSessionError(416, "offset out of range")
+        if length is not None and offset + length > session.size:
+            raise UploadSessionError(413, "chunk exceeds declared upload size")
+
+    def open_at(self, session, offset):
+        # 요청마다 별도 핸들로 열어 지정 위치에 기록 → 동시 PUT 끼리 서로 간섭하지 않음
+        f = open(session.data_path, "r+b")
+        f.seek(offset)
+        return f
+
+    def mark_received(self, session, start, end):
+        if end <= start:
+            return
+        with self._lock:
+            session.ranges = merge_range(session.ranges, start, end)
+            session.updated_at = time.time()
+            session.save()
+
+    def finalize(self, session, ingest):
+        # ingest(data_path) 가 완성된 파일을 가져간 뒤 세션 폴더 정리
+        # 해시 계산은 파일 전체를 읽으므로 락 밖에서 (락은 finalizing 표시 / 정리할 때만)
+        with self._lock:
+            if not session.is_complete:
+                raise UploadSessionError(409, "upload incomplete")
+            if session.finalizing:
+                raise UploadSessionError(409, "upload is being finalized")
+            session.finalizing = True
+        try:
+            result = ingest(session.data_path)
+        except BaseException:
+            session.finalizing = False
+            raise
+        with self._lock:
+            shutil.rmtree(session.dir, ignore_errors=True)
+            self._sessions.pop(session.id, None)
+        return result
+
+    def abort(self, session):
+        if session.finalizing:
+            raise UploadSessionError(409, "upload is being finalized")
+        with self._lock:
+            shutil.rmtree(session.dir, ignore_errors=True)
+            self._sessions.pop(session.id, None)
+
+    def purge_expired(self, max_age=SESSION_MAX_AGE):
+        now = time.time()
+        for session_id in os.listdir(self.root):
+            try:
+                session = self.get(session_id)
+            except UploadSessionError:
+                continue
+            if now - session.updated_at > max_age and not session.finalizing:
+                print(f"🧹 만료된 업로드 세션 정리: {session.filename} ({session_id})")
+                self.abort(session)